@@ -77,7 +77,7 @@ class ClaimCreate(BaseModel):
 # =============================================
 
 @router.post("/invoices")
-async def create_invoice(invoice: InvoiceCreate):
+def create_invoice(invoice: InvoiceCreate):
     """Create a new invoice from encounter or manual entry"""
     try:
         workspace_id = os.getenv('DEMO_WORKSPACE_ID')
@@ -176,7 +176,7 @@ async def create_invoice(invoice: InvoiceCreate):
 
 
 @router.get("/invoices/patient/{patient_id}")
-async def get_patient_invoices(
+def get_patient_invoices(
     patient_id: str,
     status: Optional[str] = None,
     payment_status: Optional[str] = None,
@@ -208,7 +208,7 @@ async def get_patient_invoices(
 
 
 @router.get("/invoices/{invoice_id}")
-async def get_invoice(invoice_id: str):
+def get_invoice(invoice_id: str):
     """Get invoice details with items"""
     try:
         # Get invoice
@@ -247,13 +247,31 @@ async def get_invoice(invoice_id: str):
 
 
 @router.get("/invoices")
-async def get_all_invoices(
+def get_all_invoices(
     payment_status: Optional[str] = None,
     from_date: Optional[str] = None,
     to_date: Optional[str] = None,
-    limit: int = Query(100, le=500)
+    limit: int = Query(100, le=500),
+    offset: int = Query(0, ge=0),
+    before: Optional[str] = None
 ):
-    """Get all invoices with filters"""
+    """Get all invoices with filters, newest first.
+    
+    Page with `before` (the previous page's next_cursor) to seek past the
+    rows already seen on the (workspace_id, invoice_date, id) index;
+    `offset` still works but Postgres has to walk the skipped rows.
+    """
+    # Cursor is "<invoice_date>|<id>"; invoice_date is a DATE, so id breaks ties
+    if before:
+        before_date, _, before_id = before.partition('|')
+        # Both halves go into a PostgREST or= filter, so only pass them on
+        # once they have parsed as a date and a UUID
+        try:
+            before_date = date.fromisoformat(before_date).isoformat()
+            before_id = str(uuid.UUID(before_id))
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    
     try:
         workspace_id = os.getenv('DEMO_WORKSPACE_ID')
         
@@ -267,14 +285,27 @@ async def get_all_invoices(
             query = query.gte('invoice_date', from_date)
         if to_date:
             query = query.lte('invoice_date', to_date)
+        if before:
+            query = query.or_(
+                f'invoice_date.lt.{before_date},'
+                f'and(invoice_date.eq.{before_date},id.lt.{before_id})'
+            )
         
         result = query.order('invoice_date', desc=True)\
-            .limit(limit)\
+            .order('id', desc=True)\
+            .range(offset, offset + limit - 1)\
             .execute()
         
+        invoices = result.data or []
+        next_cursor = None
+        if len(invoices) == limit:
+            next_cursor = f"{invoices[-1]['invoice_date']}|{invoices[-1]['id']}"
+        
         return {
-            'count': len(result.data or []),
-            'invoices': result.data or []
+            'count': len(invoices),
+            'offset': offset,
+            'next_cursor': next_cursor,
+            'invoices': invoices
         }
         
     except Exception as e:
@@ -286,7 +317,7 @@ async def get_all_invoices(
 # =============================================
 
 @router.post("/payments")
-async def record_payment(payment: PaymentCreate):
+def record_payment(payment: PaymentCreate):
     """Record a payment for an invoice"""
     try:
         workspace_id = os.getenv('DEMO_WORKSPACE_ID')
@@ -363,7 +394,7 @@ async def record_payment(payment: PaymentCreate):
 
 
 @router.get("/payments/invoice/{invoice_id}")
-async def get_invoice_payments(invoice_id: str):
+def get_invoice_payments(invoice_id: str):
     """Get all payments for an invoice"""
     try:
         result = supabase.table('payments')\
@@ -387,7 +418,7 @@ async def get_invoice_payments(invoice_id: str):
 # =============================================
 
 @router.post("/claims")
-async def create_claim(claim: ClaimCreate):
+def create_claim(claim: ClaimCreate):
     """Create a medical aid claim from an invoice"""
     try:
         workspace_id = os.getenv('DEMO_WORKSPACE_ID')
@@ -452,7 +483,7 @@ async def create_claim(claim: ClaimCreate):
 
 
 @router.get("/claims/{claim_id}")
-async def get_claim(claim_id: str):
+def get_claim(claim_id: str):
     """Get claim details"""
     try:
         result = supabase.table('medical_aid_claims')\
@@ -472,7 +503,7 @@ async def get_claim(claim_id: str):
 
 
 @router.patch("/claims/{claim_id}/status")
-async def update_claim_status(
+def update_claim_status(
     claim_id: str,
     status: str,
     approved_amount: Optional[float] = None,
@@ -521,7 +552,7 @@ async def update_claim_status(
 
 
 @router.get("/claims")
-async def get_all_claims(
+def get_all_claims(
     status: Optional[str] = None,
     medical_aid: Optional[str] = None,
     from_date: Optional[str] = None,
@@ -563,7 +594,7 @@ async def get_all_claims(
 # =============================================
 
 @router.get("/reports/revenue")
-async def get_revenue_report(
+def get_revenue_report(
     from_date: str,
     to_date: str
 ):
@@ -618,7 +649,7 @@ async def get_revenue_report(
 
 
 @router.get("/reports/outstanding")
-async def get_outstanding_report():
+def get_outstanding_report():
     """Get all outstanding invoices"""
     try:
         workspace_id = os.getenv('DEMO_WORKSPACE_ID')
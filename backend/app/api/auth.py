@@ -188,7 +188,7 @@ def user_has_workspace_access(user_id: str, workspace_id: str) -> bool:
 
 # ==================== Dependencies ====================
 
-async def get_current_user(
+def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """
@@ -289,7 +289,7 @@ def require_capability(capability_id: str):
 # ==================== Routes ====================
 
 @router.post("/login", response_model=LoginResponse)
-async def login(login_data: LoginRequest):
+def login(login_data: LoginRequest):
     """
     Login endpoint - authenticate user and return JWT tokens
     Verifies credentials against Supabase database
@@ -439,7 +439,7 @@ async def logout(current_user: dict = Depends(get_current_user)):
     }
 
 @router.get("/me")
-async def get_current_user_info(current_user: dict = Depends(get_current_user)):
+def get_current_user_info(current_user: dict = Depends(get_current_user)):
     """
     Get current authenticated user information.
     Hydrates workspace_name so the sidebar subtitle / dashboard greeting can
@@ -464,7 +464,7 @@ async def get_current_user_info(current_user: dict = Depends(get_current_user)):
 # ==================== Multi-workspace endpoints (TRACEABILITY §11) ====================
 
 @router.get("/workspaces")
-async def list_my_workspaces(current_user: dict = Depends(get_current_user)):
+def list_my_workspaces(current_user: dict = Depends(get_current_user)):
     """All workspaces this user has access to via the user_workspaces join.
     The frontend uses this to populate the workspace switcher dropdown.
 
@@ -506,7 +506,7 @@ class SwitchWorkspaceRequest(BaseModel):
 
 
 @router.post("/switch-workspace")
-async def switch_workspace(
+def switch_workspace(
     body: SwitchWorkspaceRequest,
     current_user: dict = Depends(get_current_user),
 ):
@@ -631,7 +631,7 @@ async def reset_password(reset_data: ResetPasswordRequest):
 # ==================== Admin Routes ====================
 
 @router.post("/register", response_model=LoginResponse)
-async def register_user(
+def register_user(
     register_data: RegisterRequest,
     current_user: dict = Depends(get_current_admin_user)
 ):
@@ -105,7 +105,7 @@ def _result_to_http(result):
 # ----------------------------------------------------------------------------
 
 @router.post("/prescriptions/{prescription_id}/void")
-async def void_prescription(
+def void_prescription(
     prescription_id: str,
     body: VoidPrescriptionRequest,
     current_user: dict = Depends(require_capability("prescription_management")),
@@ -141,7 +141,7 @@ async def void_prescription(
 
 
 @router.post("/patients/{patient_id}/soft-delete")
-async def soft_delete_patient(
+def soft_delete_patient(
     patient_id: str,
     body: SoftDeletePatientRequest,
     current_user: dict = Depends(require_capability("patient_admin")),
@@ -168,7 +168,7 @@ async def soft_delete_patient(
 
 
 @router.post("/documents/{document_id}/reassign")
-async def reassign_document(
+def reassign_document(
     document_id: str,
     body: ReassignDocumentRequest,
     current_user: dict = Depends(require_capability("patient_admin")),
@@ -196,7 +196,7 @@ async def reassign_document(
 
 
 @router.post("/patients/merge")
-async def merge_patient(
+def merge_patient(
     body: MergePatientRequest,
     current_user: dict = Depends(require_capability("patient_admin")),
 ):
@@ -233,7 +233,7 @@ async def merge_patient(
 
 
 @router.post("/audit/{audit_id}/reverse")
-async def reverse_action(
+def reverse_action(
     audit_id: str,
     body: Optional[ReverseRequest] = None,
     current_user: dict = Depends(get_current_user),
@@ -99,7 +99,7 @@ async def doc_types_for_workspace(
 # ---------------------------------------------------------------------------
 
 @router.get("/dashboard")
-async def dashboard_summary(
+def dashboard_summary(
     current_user: dict = Depends(require_capability("digitisation_upload")),
 ):
     """
@@ -187,7 +187,7 @@ async def dashboard_summary(
 # ---------------------------------------------------------------------------
 
 @router.get("/validation/queue")
-async def validation_queue(
+def validation_queue(
     limit: int = Query(100, ge=1, le=500),
     current_user: dict = Depends(require_capability("digitisation_validation")),
 ):
@@ -236,7 +236,7 @@ async def validation_queue(
 
 
 @router.get("/validation/{document_id}")
-async def validation_detail(
+def validation_detail(
     document_id: str,
     current_user: dict = Depends(require_capability("digitisation_validation")),
 ):
@@ -352,7 +352,7 @@ async def validation_detail(
 # ---------------------------------------------------------------------------
 
 @router.get("/icd10/validate")
-async def icd10_validate(
+def icd10_validate(
     code: str = Query(..., description="ICD-10 code to validate, e.g. 'I10' or 'E11.9'"),
     current_user: dict = Depends(require_capability("digitisation_validation")),
 ):
@@ -428,7 +428,7 @@ async def icd10_validate(
 
 
 @router.get("/icd10/search")
-async def icd10_search(
+def icd10_search(
     q: str = Query(..., min_length=2, description="Free-text search across description / chapter"),
     limit: int = Query(20, ge=1, le=100),
     only_billable: bool = Query(True, description="Restrict to codes valid for clinical/billing use."),
@@ -511,7 +511,7 @@ def _strength_token(s: str) -> Optional[str]:
 
 
 @router.get("/nappi/lookup")
-async def nappi_lookup(
+def nappi_lookup(
     drug_name: str = Query(..., description="Drug name as extracted from a prescription, e.g. 'Panado' or 'Metformin XR 1g'"),
     strength: Optional[str] = Query(None, description="Optional strength hint, e.g. '500mg'. If omitted, parsed from drug_name."),
     current_user: dict = Depends(require_capability("digitisation_validation")),
@@ -627,7 +627,7 @@ async def nappi_lookup(
 
 
 @router.get("/nappi/search")
-async def nappi_search(
+def nappi_search(
     q: str = Query(..., min_length=2),
     limit: int = Query(20, ge=1, le=100),
     current_user: dict = Depends(require_capability("digitisation_validation")),
@@ -815,7 +815,7 @@ def _audit_row_to_drawer_row(row: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @router.get("/validation/{document_id}/history")
-async def validation_history(
+def validation_history(
     document_id: str,
     limit: int = Query(200, ge=1, le=1000),
     current_user: dict = Depends(require_capability("digitisation_validation")),
@@ -917,7 +917,7 @@ async def validation_history(
 
 
 @router.post("/documents/{document_id}/reprocess")
-async def reprocess_document(
+def reprocess_document(
     document_id: str,
     current_user: dict = Depends(require_capability("digitisation_upload")),
 ):
@@ -967,7 +967,7 @@ async def reprocess_document(
 
 
 @router.post("/validation/{document_id}/save")
-async def save_validation_edits(
+def save_validation_edits(
     document_id: str,
     payload: Optional[Dict[str, Any]] = None,
     current_user: dict = Depends(require_capability("digitisation_validation")),
@@ -1098,7 +1098,7 @@ async def save_validation_edits(
 
 
 @router.post("/validation/{document_id}/preview-match")
-async def preview_patient_match(
+def preview_patient_match(
     document_id: str,
     current_user: dict = Depends(require_capability("digitisation_validation")),
 ):
@@ -1158,7 +1158,7 @@ async def preview_patient_match(
 
 
 @router.post("/validation/{document_id}/approve")
-async def approve_validation(
+def approve_validation(
     document_id: str,
     background_tasks: BackgroundTasks,
     payload: Optional[Dict[str, Any]] = None,
@@ -1381,7 +1381,7 @@ async def approve_validation(
 
 
 @router.post("/validation/{document_id}/reject")
-async def reject_validation(
+def reject_validation(
     document_id: str,
     payload: Optional[Dict[str, Any]] = None,
     current_user: dict = Depends(require_capability("digitisation_validation")),
@@ -1579,7 +1579,7 @@ async def upload_document(
 
 
 @router.get("/documents/{document_id}")
-async def get_document_status(
+def get_document_status(
     document_id: str,
     current_user: dict = Depends(require_capability("digitisation_upload")),
 ):
@@ -1601,7 +1601,7 @@ async def get_document_status(
 
 
 @router.get("/documents")
-async def list_documents(
+def list_documents(
     status_filter: Optional[str] = Query(None, alias="status", description="Filter by status (uploaded, parsing, parsed, pending_validation, validated, rejected)"),
     doc_type:      Optional[str] = Query(None, description="Filter by detected doc_type."),
     limit:         int           = Query(50, ge=1, le=200),
@@ -1670,7 +1670,7 @@ def _next_batch_id(workspace_id: str) -> str:
 
 
 @router.post("/exports")
-async def create_export_job(
+def create_export_job(
     background_tasks: BackgroundTasks,
     payload: dict = Body(..., description=(
         "Required: format ('fhir_r4'|'csv'|'json'). Optional: document_ids "
@@ -1745,7 +1745,7 @@ async def create_export_job(
 
 
 @router.get("/exports")
-async def list_export_jobs(
+def list_export_jobs(
     limit: int = Query(50, ge=1, le=500),
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
@@ -1770,7 +1770,7 @@ async def list_export_jobs(
 
 
 @router.get("/exports/{job_id}")
-async def get_export_job(
+def get_export_job(
     job_id: str,
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
@@ -1793,7 +1793,7 @@ async def get_export_job(
 
 
 @router.get("/exports/{job_id}/download")
-async def download_export_bundle(
+def download_export_bundle(
     job_id: str,
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
@@ -1903,7 +1903,7 @@ def _validate_fhir_payload(payload: dict, *, partial: bool = False) -> dict:
 
 
 @router.get("/fhir/connections")
-async def list_fhir_connections(
+def list_fhir_connections(
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
     """All saved FHIR connections for this workspace."""
@@ -1926,7 +1926,7 @@ async def list_fhir_connections(
 
 
 @router.post("/fhir/connections")
-async def create_fhir_connection(
+def create_fhir_connection(
     payload: dict = Body(..., description=(
         "Required: name, fhir_url. Optional: environment "
         "(sandbox|staging|production, default sandbox), auth_method "
@@ -1963,7 +1963,7 @@ async def create_fhir_connection(
 
 
 @router.patch("/fhir/connections/{conn_id}")
-async def update_fhir_connection(
+def update_fhir_connection(
     conn_id: str,
     payload: dict = Body(...),
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
@@ -1998,7 +1998,7 @@ async def update_fhir_connection(
 
 
 @router.delete("/fhir/connections/{conn_id}")
-async def delete_fhir_connection(
+def delete_fhir_connection(
     conn_id: str,
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
@@ -2019,7 +2019,7 @@ async def delete_fhir_connection(
 
 
 @router.post("/fhir/connections/{conn_id}/test")
-async def test_fhir_connection(
+def test_fhir_connection(
     conn_id: str,
     current_user: dict = Depends(require_capability("digitisation_export_basic")),
 ):
@@ -2126,7 +2126,7 @@ def _enforce_search_rate_limit(user_email: str) -> None:
 
 
 @router.get("/search")
-async def search_documents(
+def search_documents(
     q:           str  = Query(..., min_length=2, description="natural-language query"),
     limit:       int  = Query(20, ge=1, le=100),
     patient_id:  Optional[str] = Query(None, description="restrict to one patient"),
@@ -2204,7 +2204,7 @@ async def search_documents(
 
 
 @router.post("/search/reindex/{document_id}")
-async def reindex_document(
+def reindex_document(
     document_id:        str,
     background_tasks:   BackgroundTasks,
     current_user: dict = Depends(require_capability("digitisation_validation")),
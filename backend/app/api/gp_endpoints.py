@@ -43,7 +43,7 @@ def _get_supabase():
 # =============================================================================
 
 @gp_router.get("/health")
-async def gp_health_check():
+def gp_health_check():
     """GP module health check endpoint"""
     try:
         processor_status = "available"
@@ -272,7 +272,7 @@ def _legacy_chronic_summary_response(row: dict) -> dict:
 
 
 @gp_router.get("/patient/{patient_id}/chronic-summary")
-async def get_patient_chronic_summary(
+def get_patient_chronic_summary(
     patient_id: str,
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
@@ -327,7 +327,7 @@ async def get_patient_chronic_summary(
 # =============================================================================
 
 @gp_router.post("/validate-extraction")
-async def validate_gp_extraction(
+def validate_gp_extraction(
     patient_id: str = Body(...),
     validated_data: dict = Body(...),
     validation_statuses: dict = Body(...),
@@ -407,7 +407,7 @@ async def validate_gp_extraction(
 # =============================================================================
 
 @gp_router.get("/patients")
-async def list_chronic_patients(
+def list_chronic_patients(
     search: Optional[str] = Query(None, description="Search by name or ID"),
     validation_status: Optional[str] = Query(None, description="Filter by validation status"),
     limit: int = Query(50, ge=1, le=500),
@@ -475,7 +475,7 @@ async def list_chronic_patients(
 # =============================================================================
 
 @gp_router.get("/parsed-document/{document_id}")
-async def get_parsed_document(
+def get_parsed_document(
     document_id: str,
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
@@ -523,7 +523,7 @@ async def get_parsed_document(
 # =============================================================================
 
 @gp_router.get("/medications/search")
-async def search_medications(
+def search_medications(
     query: str = Query(..., min_length=2, description="Medication name to search"),
     limit: int = Query(20, ge=1, le=100),
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
@@ -576,7 +576,7 @@ async def search_medications(
 # =============================================================================
 
 @gp_router.get("/statistics")
-async def get_gp_statistics(
+def get_gp_statistics(
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
     """Get overall GP chronic patient statistics."""
@@ -586,13 +586,13 @@ async def get_gp_statistics(
             raise HTTPException(status_code=503, detail="Database not available")
 
         # Total patients
-        total_result = sb.table('patients').select('id', count='exact').execute()
+        total_result = sb.table('patients').select('id', count='exact', head=True).execute()
         total_patients = total_result.count or 0
 
         # Validation breakdown
-        approved_result = sb.table('patients').select('id', count='exact').eq('validation_status', 'approved').execute()
-        pending_result = sb.table('patients').select('id', count='exact').eq('validation_status', 'pending').execute()
-        review_result = sb.table('patients').select('id', count='exact').eq('validation_status', 'needs_review').execute()
+        approved_result = sb.table('patients').select('id', count='exact', head=True).eq('validation_status', 'approved').execute()
+        pending_result = sb.table('patients').select('id', count='exact', head=True).eq('validation_status', 'pending').execute()
+        review_result = sb.table('patients').select('id', count='exact', head=True).eq('validation_status', 'needs_review').execute()
 
         # Get common conditions from patient_conditions table
         common_conditions = []
@@ -638,7 +638,7 @@ async def get_gp_statistics(
 # =============================================================================
 
 @gp_router.get("/validation-session/{document_id}")
-async def get_validation_session_data(
+def get_validation_session_data(
     document_id: str,
     request: Optional[str] = Query(None, description="Original request ID"),
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
@@ -712,7 +712,7 @@ async def get_validation_session_data(
 # =============================================================================
 
 @gp_router.get("/document/{patient_id}/file")
-async def get_patient_document_file(
+def get_patient_document_file(
     patient_id: str,
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(security)
 ):
@@ -3,8 +3,9 @@ API models for request/response validation and documentation.
 Compatible with the SurgiScan Historic Documents component.
 """
 
+import os
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import AbstractSet, Dict, List, Optional, Any, Union
 from enum import Enum
 from pydantic import BaseModel, Field, validator
 
@@ -264,12 +265,9 @@ class FileUploadValidator:
         return file_size <= max_size_bytes
     
     @staticmethod
-    def validate_file_extension(filename: str, allowed_extensions: List[str]) -> bool:
-        """Validate file extension"""
-        if '.' not in filename:
-            return False
-        extension = filename.rsplit('.', 1)[1].lower()
-        return extension in allowed_extensions
+    def validate_file_extension(filename: str, allowed_extensions: AbstractSet[str]) -> bool:
+        """Validate file extension against a set of lower-case extensions without dots"""
+        return os.path.splitext(filename)[1].lower().lstrip('.') in allowed_extensions
     
     @staticmethod
     def validate_content_type(content_type: str) -> bool:
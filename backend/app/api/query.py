@@ -154,7 +154,7 @@ async def list_templates(
 
 
 @router.post("/run")
-async def run_query(
+def run_query(
     body: QueryRunRequest,
     current_user: dict = Depends(require_capability("clinical_query")),
 ):
@@ -210,7 +210,7 @@ class QueryAskRequest(BaseModel):
 
 
 @router.post("/ask")
-async def ask_query(
+def ask_query(
     body: QueryAskRequest,
     current_user: dict = Depends(require_capability("clinical_query")),
 ):
@@ -293,7 +293,7 @@ async def ask_query(
 
 
 @router.post("/briefing/refresh")
-async def refresh_briefing(
+def refresh_briefing(
     current_user: dict = Depends(require_capability("clinical_query")),
 ):
     """PR D — manually materialise the registered standing queries for
@@ -327,7 +327,7 @@ async def refresh_briefing(
 
 
 @router.get("/briefing")
-async def get_briefing(
+def get_briefing(
     kind: Optional[str] = None,
     as_of_date: Optional[str] = None,
     current_user: dict = Depends(require_capability("clinical_query")),
@@ -8,22 +8,16 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime, timezone
-from supabase import create_client, Client
-import os
 import logging
 
 # Import auth dependencies
 from app.api.auth import get_current_user, get_current_admin_user, get_password_hash
+from app.core.supabase_client import get_async_supabase
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/users", tags=["User Management"])
 
-# Supabase client
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 # ==================== Models ====================
 
 class UserCreate(BaseModel):
@@ -66,7 +60,8 @@ async def list_users(
     """
     try:
         # Build query
-        query = supabase.table('users').select('*')
+        sb = get_async_supabase()
+        query = sb.table('users').select('*')
         
         # Apply filters
         if role:
@@ -79,7 +74,7 @@ async def list_users(
             query = query.eq('workspace_id', current_user.get('workspace_id'))
         
         # Execute query
-        result = query.execute()
+        result = await query.execute()
         
         # Format response
         users = []
@@ -7,22 +7,17 @@ from fastapi import APIRouter, HTTPException, Depends, status
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime, timezone
-from supabase import create_client, Client
-import os
+import asyncio
 import logging
 import re
 
 from app.api.auth import get_current_user, get_current_admin_user
+from app.core.supabase_client import get_async_supabase
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/workspaces", tags=["Workspace Management"])
 
-# Supabase client
-SUPABASE_URL = os.environ.get("SUPABASE_URL")
-SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
-
 # ==================== Models ====================
 
 class WorkspaceCreate(BaseModel):
@@ -93,21 +88,21 @@ async def list_workspaces(
     List all workspaces (admin only)
     """
     try:
+        sb = get_async_supabase()
+        
         # Get all workspaces
-        result = supabase.table('workspaces').select('*').execute()
+        result = await sb.table('workspaces').select('*').execute()
         
-        workspaces = []
-        for ws in result.data:
-            # Get user count for each workspace
-            user_count_result = supabase.table('users').select('id', count='exact').eq('workspace_id', ws['id']).execute()
-            user_count = user_count_result.count if user_count_result.count else 0
-            
-            workspaces.append({
-                **ws,
-                'user_count': user_count
-            })
+        # User count for each workspace, fetched concurrently
+        user_count_results = await asyncio.gather(*(
+            sb.table('users').select('id', count='exact', head=True).eq('workspace_id', ws['id']).execute()
+            for ws in result.data
+        ))
         
-        return workspaces
+        return [
+            {**ws, 'user_count': user_count_result.count or 0}
+            for ws, user_count_result in zip(result.data, user_count_results)
+        ]
         
     except Exception as e:
         logger.error(f"Error listing workspaces: {e}")
@@ -126,6 +121,8 @@ async def get_workspace(
     Users can view their own workspace, admins can view any workspace
     """
     try:
+        sb = get_async_supabase()
+        
         # Check permissions
         if current_user.get("workspace_id") != workspace_id and current_user.get("role") != "admin":
             raise HTTPException(
@@ -134,7 +131,7 @@ async def get_workspace(
             )
         
         # Get workspace
-        result = supabase.table('workspaces').select('*').eq('id', workspace_id).execute()
+        result = await sb.table('workspaces').select('*').eq('id', workspace_id).execute()
         
         if not result.data:
             raise HTTPException(
@@ -145,7 +142,7 @@ async def get_workspace(
         workspace = result.data[0]
         
         # Get user count
-        user_count_result = supabase.table('users').select('id', count='exact').eq('workspace_id', workspace_id).execute()
+        user_count_result = await sb.table('users').select('id', count='exact', head=True).eq('workspace_id', workspace_id).execute()
         user_count = user_count_result.count if user_count_result.count else 0
         
         return {
@@ -171,11 +168,13 @@ async def create_workspace(
     Create new workspace (admin only)
     """
     try:
+        sb = get_async_supabase()
+        
         # Generate slug
         slug = generate_slug(workspace_data.name)
         
         # Check if slug already exists
-        existing = supabase.table('workspaces').select('slug').eq('slug', slug).execute()
+        existing = await sb.table('workspaces').select('slug').eq('slug', slug).execute()
         if existing.data:
             # Add suffix to make unique
             import random
@@ -212,7 +211,7 @@ async def create_workspace(
         }
         
         # Insert workspace
-        result = supabase.table('workspaces').insert(workspace_record).execute()
+        result = await sb.table('workspaces').insert(workspace_record).execute()
         
         if not result.data:
             raise HTTPException(
@@ -248,6 +247,8 @@ async def update_workspace(
     Update workspace (admin only)
     """
     try:
+        sb = get_async_supabase()
+        
         # Prepare update data
         update_data = {}
         if workspace_data.name:
@@ -270,7 +271,7 @@ async def update_workspace(
             )
         
         # Update workspace
-        result = supabase.table('workspaces').update(update_data).eq('id', workspace_id).execute()
+        result = await sb.table('workspaces').update(update_data).eq('id', workspace_id).execute()
         
         if not result.data:
             raise HTTPException(
@@ -281,7 +282,7 @@ async def update_workspace(
         workspace = result.data[0]
         
         # Get user count
-        user_count_result = supabase.table('users').select('id', count='exact').eq('workspace_id', workspace_id).execute()
+        user_count_result = await sb.table('users').select('id', count='exact', head=True).eq('workspace_id', workspace_id).execute()
         user_count = user_count_result.count if user_count_result.count else 0
         
         logger.info(f"Workspace updated: {workspace_id} by {current_user.get('email')}")
@@ -310,8 +311,10 @@ async def delete_workspace(
     Performs soft delete by setting is_active=False
     """
     try:
+        sb = get_async_supabase()
+        
         # Soft delete
-        result = supabase.table('workspaces').update({
+        result = await sb.table('workspaces').update({
             'is_active': False,
             'subscription_status': 'cancelled'
         }).eq('id', workspace_id).execute()
@@ -346,8 +349,10 @@ async def get_workspace_stats(
     Get workspace statistics (admin only)
     """
     try:
+        sb = get_async_supabase()
+        
         # Get all workspaces
-        workspaces = supabase.table('workspaces').select('*').execute()
+        workspaces = await sb.table('workspaces').select('*').execute()
         
         stats = {
             "total_workspaces": len(workspaces.data),
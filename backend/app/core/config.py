@@ -5,6 +5,7 @@ Handles environment variables and deployment-specific settings.
 
 import os
 import secrets
+from functools import cached_property
 from typing import Optional, List, Union
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl, validator
@@ -21,6 +22,7 @@ class Settings(BaseSettings):
     # Server Settings
     HOST: str = "0.0.0.0"
     PORT: int = int(os.getenv("PORT", "8000"))
+    WORKERS: int = int(os.getenv("WORKERS", str(max(2, (os.cpu_count() or 2) // 2))))
     DEBUG: bool = os.getenv("DEBUG", "false").lower() == "true"
     
     # Security
@@ -43,12 +45,22 @@ class Settings(BaseSettings):
     
     # Processing Configuration
     MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+    MAX_UPLOAD_FILES: int = int(os.getenv("MAX_UPLOAD_FILES", "20"))  # files per request, caps the body size
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "png", "jpg", "jpeg", "tiff", "tif"]
+    
+    @cached_property
+    def ALLOWED_EXT_SET(self) -> frozenset:
+        """Normalised ALLOWED_EXTENSIONS for O(1) extension checks"""
+        return frozenset(e.lower().lstrip('.') for e in self.ALLOWED_EXTENSIONS)
+    
     DEFAULT_PROCESSING_MODE: str = os.getenv("DEFAULT_PROCESSING_MODE", "smart")
     
     # Database Settings
     MONGODB_URL: str = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
     DATABASE_NAME: str = os.getenv("DATABASE_NAME", "surgiscan_documents")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "200"))
+    MONGODB_WRITE_CONCERN: str = os.getenv("MONGODB_WRITE_CONCERN", "1")  # "1" or "majority"; validation always uses majority
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd,zlib")
     
     # Redis Settings (for async processing)
     REDIS_URL: Optional[str] = os.getenv("REDIS_URL")
@@ -106,6 +118,7 @@ class Settings(BaseSettings):
     # Processing Timeouts
     PROCESSING_TIMEOUT_SECONDS: int = int(os.getenv("PROCESSING_TIMEOUT_SECONDS", "300"))
     MAX_CONCURRENT_PROCESSING: int = int(os.getenv("MAX_CONCURRENT_PROCESSING", "10"))
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "16"))  # temp saves / DB writes per batch upload
     
     class Config:
         case_sensitive = True
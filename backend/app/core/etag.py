@@ -0,0 +1,76 @@
+"""
+Weak ETag / If-None-Match revalidation for the SPA's polled GET routes.
+
+The frontend re-fetches a patient, an encounter, an encounter's document
+and dispensing lists and the invoice lists on every poll, and the JSON
+rarely changes between polls.
+This middleware hashes the 200 body of those routes into a weak ETag and
+answers 304 with no body when the client's If-None-Match already holds
+it, so repeat polls cost no response bytes or client-side JSON parsing.
+
+The handler still runs on a 304 (the ETag is derived from its output),
+so this saves bandwidth, not the Supabase/Mongo read. Only the routes in
+ETAG_PATHS are covered; every other request passes straight through
+without its body being buffered.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+ETAG_PATHS = tuple(re.compile(p) for p in (
+    r"^/api/patients/[^/]+$",
+    r"^/api/encounters/[^/]+$",
+    r"^/api/documents/encounter/[^/]+$",
+    r"^/api/dispense/encounter/[^/]+$",
+    r"^/api/invoices$",
+    r"^/api/invoices/patient/[^/]+$",
+))
+
+
+def compute_etag(body: bytes) -> str:
+    """Weak ETag for a response body. blake2b is faster than md5 in hashlib."""
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """If-None-Match uses weak comparison (RFC 9110 §13.1.2): W/ is ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque
+        for tag in if_none_match.split(",")
+    )
+
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """Add an ETag to 200 GET responses on ETAG_PATHS; 304 on a match."""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method != "GET" or not any(p.match(request.url.path) for p in ETAG_PATHS):
+            return await call_next(request)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = compute_etag(body)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        headers = dict(response.headers)
+        headers["ETag"] = etag
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=headers,
+            media_type=response.media_type,
+        )
@@ -0,0 +1,53 @@
+"""
+The shared async Supabase client.
+
+One supabase-py AsyncClient for the whole app, backed by one pooled
+HTTP/2 keep-alive httpx session (supabase_http). server.py's handlers and
+the app/api routers await their PostgREST round trips on it instead of
+blocking the event loop, and share its connections instead of each
+module opening its own pool.
+
+It must bind to the server's event loop, so server.py's startup_event
+builds it with init_async_supabase() and shutdown_event closes it with
+close_async_supabase(). Routers fetch it per request via
+get_async_supabase().
+"""
+from __future__ import annotations
+
+from typing import Optional
+
+import httpx
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
+
+_client: Optional[AsyncClient] = None
+# Sized for the handlers' concurrent gathers rather than httpx's defaults
+# (HTTP/1.1, 20 idle connections)
+supabase_http: Optional[httpx.AsyncClient] = None
+
+
+async def init_async_supabase(url: str, key: str) -> AsyncClient:
+    """Create the shared client and its HTTP session (startup only)"""
+    global _client, supabase_http
+    supabase_http = httpx.AsyncClient(
+        http2=True,
+        timeout=httpx.Timeout(120.0, connect=5.0),
+        limits=httpx.Limits(max_connections=100, max_keepalive_connections=50, keepalive_expiry=30.0)
+    )
+    _client = await acreate_client(url, key, options=AsyncClientOptions(httpx_client=supabase_http))
+    return _client
+
+
+def get_async_supabase() -> AsyncClient:
+    """The shared client; raises if startup hasn't created it yet"""
+    if _client is None:
+        raise RuntimeError("Async Supabase client is not initialised; init_async_supabase() runs at startup")
+    return _client
+
+
+async def close_async_supabase() -> None:
+    """Close the HTTP session behind the shared client (shutdown only)"""
+    global _client, supabase_http
+    if supabase_http is not None:
+        await supabase_http.aclose()
+    _client = None
+    supabase_http = None
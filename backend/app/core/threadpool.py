@@ -0,0 +1,26 @@
+"""
+Size of the worker-thread pool that runs plain-def routes.
+
+FastAPI runs every plain-def route and dependency (the app/api and
+api/billing handlers still on the sync Supabase client) in anyio's
+default threadpool, which allows 40 threads. A dashboard load fans out
+wider than that, so both entrypoints, server.py's startup_event and
+main.py's lifespan, raise the limit to THREADPOOL_SIZE (env, default 200).
+"""
+from __future__ import annotations
+
+import os
+
+import anyio.to_thread
+
+DEFAULT_THREADPOOL_SIZE = 200
+
+
+def configure_threadpool() -> None:
+    """Raise anyio's default thread limiter; call on the server's running loop.
+    
+    THREADPOOL_SIZE is read here rather than at import, after the
+    entrypoint's load_dotenv() has run.
+    """
+    size = int(os.environ.get('THREADPOOL_SIZE', DEFAULT_THREADPOOL_SIZE))
+    anyio.to_thread.current_default_thread_limiter().total_tokens = size
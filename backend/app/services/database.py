@@ -4,10 +4,12 @@ Handles document storage, retrieval, and management.
 """
 
 import uuid
+from collections import Counter
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import ASCENDING, DESCENDING
+from pymongo import ASCENDING, DESCENDING, InsertOne, WriteConcern
+from pymongo.errors import BulkWriteError
 
 from app.core.config import settings, ProcessingStatus
 from app.core.logging import get_logger, log_database_operation
@@ -32,7 +34,14 @@ class DatabaseManager:
         try:
             logger.info(f"Attempting MongoDB connection...")
             logger.info(f"Connection string format: {self.connection_string[:50]}...{self.connection_string[-20:]}")
-            self.client = AsyncIOMotorClient(self.connection_string)
+            write_concern = settings.MONGODB_WRITE_CONCERN
+            self.client = AsyncIOMotorClient(
+                self.connection_string,
+                maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+                w=int(write_concern) if write_concern.isdigit() else write_concern,
+                compressors=settings.MONGODB_COMPRESSORS,
+                retryWrites=True
+            )
             # Test connection
             await self.client.admin.command('ping')
             
@@ -85,6 +94,46 @@ class DatabaseManager:
                 # Index might already exist, which is fine
                 logger.debug(f"Index creation skipped: {e}")
     
+    @staticmethod
+    def _build_document_record(
+        document_id: str, 
+        filename: str, 
+        processing_result: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build the historic_documents record for a processing result"""
+        
+        # Extract patient info from processing result
+        patient_info = processing_result.get('patient_info', {})
+        
+        # Create document record
+        document_record = {
+            "_id": document_id,
+            "document_id": document_id,
+            "document_filename": filename,
+            "status": processing_result.get('status', ProcessingStatus.COMPLETED),
+            "document_types": list(processing_result.get('extracted_data', {}).keys()),
+            "extracted_data": processing_result.get('extracted_data', {}),
+            "processing_summary": processing_result.get('processing_summary', {}),
+            "patient_info": patient_info,
+            "confidence_score": processing_result.get('confidence_score'),
+            "needs_validation": processing_result.get('needs_validation', False),
+            "is_validated": False,
+            "validation_notes": None,
+            "created_at": datetime.utcnow(),
+            "processed_at": datetime.utcnow() if processing_result.get('status') == ProcessingStatus.COMPLETED else None,
+            "validated_at": None,
+            "integration_status": "pending",
+            "integration_attempts": 0,
+            "file_url": processing_result.get('file_url'),
+            "metadata": {
+                "file_size": processing_result.get('file_size'),
+                "content_type": processing_result.get('content_type'),
+                "processing_mode": processing_result.get('processing_summary', {}).get('mode')
+            }
+        }
+        
+        return document_record
+    
     async def save_processing_result(
         self, 
         document_id: str, 
@@ -94,35 +143,8 @@ class DatabaseManager:
         """Save processing result to database"""
         
         try:
-            # Extract patient info from processing result
-            patient_info = processing_result.get('patient_info', {})
-            
-            # Create document record
-            document_record = {
-                "_id": document_id,
-                "document_id": document_id,
-                "document_filename": filename,
-                "status": processing_result.get('status', ProcessingStatus.COMPLETED),
-                "document_types": list(processing_result.get('extracted_data', {}).keys()),
-                "extracted_data": processing_result.get('extracted_data', {}),
-                "processing_summary": processing_result.get('processing_summary', {}),
-                "patient_info": patient_info,
-                "confidence_score": processing_result.get('confidence_score'),
-                "needs_validation": processing_result.get('needs_validation', False),
-                "is_validated": False,
-                "validation_notes": None,
-                "created_at": datetime.utcnow(),
-                "processed_at": datetime.utcnow() if processing_result.get('status') == ProcessingStatus.COMPLETED else None,
-                "validated_at": None,
-                "integration_status": "pending",
-                "integration_attempts": 0,
-                "file_url": processing_result.get('file_url'),
-                "metadata": {
-                    "file_size": processing_result.get('file_size'),
-                    "content_type": processing_result.get('content_type'),
-                    "processing_mode": processing_result.get('processing_summary', {}).get('mode')
-                }
-            }
+            document_record = self._build_document_record(document_id, filename, processing_result)
+            patient_info = document_record["patient_info"]
             
             # Insert document
             await self.db.historic_documents.insert_one(document_record)
@@ -142,6 +164,40 @@ class DatabaseManager:
                         extra={"document_id": document_id, "document_filename": filename})
             raise
     
+    async def save_processing_results_bulk(
+        self, 
+        items: List[Tuple[str, str, Dict[str, Any]]]
+    ) -> List[Optional[str]]:
+        """
+        Save many processing results with a single unordered bulk_write.
+        
+        Returns the saved document_id for each item, in order, or None for
+        items whose individual insert was rejected.
+        """
+        
+        if not items:
+            return []
+        
+        ops = [
+            InsertOne(self._build_document_record(document_id, filename, processing_result))
+            for document_id, filename, processing_result in items
+        ]
+        failed = set()
+        
+        try:
+            await self.db.historic_documents.bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            failed = {error["index"] for error in e.details.get("writeErrors", [])}
+            logger.error(f"Bulk save rejected {len(failed)} of {len(items)} processing results")
+        
+        logger.info(f"Bulk saved {len(items) - len(failed)} processing results",
+                   extra={"document_count": len(items)})
+        
+        return [
+            None if i in failed else document_id
+            for i, (document_id, _, _) in enumerate(items)
+        ]
+    
     async def get_document_by_id(self, document_id: str) -> Optional[Dict[str, Any]]:
         """Get document by ID"""
         
@@ -182,7 +238,12 @@ class DatabaseManager:
                 }
             }
             
-            result = await self.db.historic_documents.update_one(
+            # Validated data must survive a failover, so ack from a majority
+            # even when ingestion writes use w=1
+            collection = self.db.historic_documents.with_options(
+                write_concern=WriteConcern("majority")
+            )
+            result = await collection.update_one(
                 {"document_id": document_id},
                 update_data
             )
@@ -316,15 +377,10 @@ class DatabaseManager:
                         all_types.update(type_list)
                 
                 # Process statuses
-                status_counts = {}
-                for status in stats.get('statuses', []):
-                    status_counts[status] = status_counts.get(status, 0) + 1
+                status_counts = Counter(stats.get('statuses', []))
                 
                 # Process processing modes
-                mode_counts = {}
-                for mode in stats.get('processing_modes', []):
-                    if mode:
-                        mode_counts[mode] = mode_counts.get(mode, 0) + 1
+                mode_counts = Counter(mode for mode in stats.get('processing_modes', []) if mode)
                 
                 processed_stats = {
                     "total_documents": stats.get('total_documents', 0),
@@ -334,8 +390,8 @@ class DatabaseManager:
                     "validation_needed": stats.get('validation_needed', 0),
                     "validated": stats.get('validated', 0),
                     "average_confidence": round(stats.get('avg_confidence', 0) or 0, 2),
-                    "status_breakdown": status_counts,
-                    "processing_mode_breakdown": mode_counts,
+                    "status_breakdown": dict(status_counts),
+                    "processing_mode_breakdown": dict(mode_counts),
                     "last_updated": datetime.utcnow()
                 }
                 
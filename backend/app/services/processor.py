@@ -2,6 +2,7 @@
 Document processor service using LandingAI ADE
 """
 import os
+import asyncio
 import logging
 from typing import Dict, Optional, List
 from datetime import datetime
@@ -11,6 +12,7 @@ from landingai_ade import LandingAIADE
 from landingai_ade.lib import pydantic_to_json_schema
 
 from app.api.models import ProcessingStatusEnum
+from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,17 @@ class ProcessingResult:
         self.needs_validation = needs_validation
         self.chunks = chunks or []
         self.pdf_metadata = pdf_metadata or {}
+    
+    def to_db_dict(self) -> Dict:
+        """Fields persisted by save_processing_result / save_processing_results_bulk"""
+        return {
+            "status": self.status,
+            "extracted_data": self.extracted_data,
+            "processing_summary": self.processing_summary,
+            "patient_info": self.patient_info,
+            "confidence_score": self.confidence_score,
+            "needs_validation": self.needs_validation
+        }
 
 class DocumentProcessor:
     """Document processor using LandingAI ADE"""
@@ -38,6 +51,8 @@ class DocumentProcessor:
             raise ValueError("VISION_AGENT_API_KEY or LANDING_AI_API_KEY not set")
         
         self.client = LandingAIADE(apikey=api_key)
+        # Caps in-flight parse calls across all requests
+        self._parse_slots = asyncio.Semaphore(settings.MAX_CONCURRENT_PROCESSING)
         logger.info("✅ DocumentProcessor initialized with LandingAI ADE")
     
     async def process_document(
@@ -51,8 +66,9 @@ class DocumentProcessor:
         logger.info(f"Processing document: {filename} with mode: {mode}")
         
         try:
-            # Parse document with LandingAI
-            parsed_doc = self.client.parse(file_path)
+            # Parse document with LandingAI; the client blocks, so run it off the event loop
+            async with self._parse_slots:
+                parsed_doc = await asyncio.to_thread(self.client.parse, file_path)
             
             # Extract basic info
             chunks = parsed_doc.get("chunks", [])
@@ -97,12 +113,11 @@ class DocumentProcessor:
         documents: List,
         mode: str = "smart"
     ) -> List[ProcessingResult]:
-        """Process multiple documents"""
-        results = []
-        for doc_id, file_path, filename in documents:
-            result = await self.process_document(doc_id, file_path, filename, mode)
-            results.append(result)
-        return results
+        """Process multiple documents concurrently, bounded by MAX_CONCURRENT_PROCESSING"""
+        return list(await asyncio.gather(*(
+            self.process_document(doc_id, file_path, filename, mode)
+            for doc_id, file_path, filename in documents
+        )))
     
     async def cleanup(self):
         """Cleanup resources"""
@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Optional, BinaryIO
 from datetime import datetime
 from fastapi import UploadFile
+import aiofiles
 
 from app.core.config import settings
 from app.core.logging import get_logger
@@ -18,6 +19,9 @@ from app.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Uploads are copied to disk in chunks of this size so memory stays flat
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class StorageManager:
     """File storage manager with support for different storage backends"""
@@ -80,12 +84,14 @@ class StorageManager:
             temp_path = os.path.join(self.temp_dir, temp_filename)
             
             # Save file
-            with open(temp_path, "wb") as temp_file:
-                content = await file.read()
-                temp_file.write(content)
+            file_size = 0
+            async with aiofiles.open(temp_path, "wb") as temp_file:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    await temp_file.write(chunk)
+                    file_size += len(chunk)
             
             logger.info(f"Temporary file saved: {temp_filename}", 
-                       extra={"temp_path": temp_path, "file_size": len(content)})
+                       extra={"temp_path": temp_path, "file_size": file_size})
             
             return temp_path
             
@@ -378,9 +384,11 @@ class StorageManager:
             relative_path = file_url[len("/storage/documents/"):]
             file_path = os.path.join(self.local_storage_dir, relative_path.replace('/', os.sep))
             
-            if os.path.exists(file_path):
+            try:
                 os.remove(file_path)
                 return True
+            except FileNotFoundError:
+                pass
         
         return False
     
@@ -3,63 +3,147 @@ Load ICD-10 codes from Excel file into Supabase database
 """
 import pandas as pd
 import os
-from supabase import create_client
+import sys
+import logging
+import logging.handlers
+import multiprocessing
+from itertools import chain
+import httpx
+from supabase import create_client, ClientOptions
 from datetime import datetime
 
 # Supabase credentials
 SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://sizujtbejnnrdqcymgle.supabase.co')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
+logger = logging.getLogger(__name__)
+
+
+def _setup_logging():
+    """Send progress through a buffered handler (flushed in blocks, or at once on warnings)"""
+    handler = logging.handlers.MemoryHandler(
+        capacity=100,
+        flushLevel=logging.WARNING,
+        target=logging.StreamHandler(sys.stdout)
+    )
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _connect():
+    """Create a Supabase client backed by a pooled HTTP/2 keep-alive session"""
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+        timeout=30.0
+    )
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client))
+
+
+# Optional icd10_codes fields and their source columns. 'code' is always
+# loaded; the rest can be narrowed with ICD10_FIELDS=field1,field2,...
+# (upserts only touch the columns sent, so existing values are kept).
+TEXT_FIELDS = {
+    'chapter_no': 'Chapter_No',
+    'chapter_desc': 'Chapter_Desc',
+    'group_code': 'Group_Code',
+    'group_desc': 'Group_Desc',
+    'code_3char': 'ICD10_3_Code',
+    'code_3char_desc': 'ICD10_3_Code_Desc',
+    'who_full_desc': 'WHO_Full_Desc',
+    # Restrictions
+    'age_range': 'Age_Range',
+    'gender': 'Gender',
+    'status': 'Status',
+}
+FLAG_FIELDS = {
+    'valid_clinical_use': 'Valid_ICD10_ClinicalUse',
+    'valid_primary': 'Valid_ICD10_Primary',
+    'valid_asterisk': 'Valid_ICD10_Asterisk',
+    'valid_dagger': 'Valid_ICD10_Dagger',
+}
+DATE_FIELDS = {
+    'who_start_date': 'WHO_Start_date',
+    'who_end_date': 'WHO_End_date',
+    'sa_start_date': 'SA_Start_Date',
+    'sa_end_date': 'SA_End_Date',
+}
+
+_requested = [f.strip() for f in os.getenv('ICD10_FIELDS', 'all').split(',') if f.strip()]
+FIELDS = frozenset(
+    {**TEXT_FIELDS, **FLAG_FIELDS, **DATE_FIELDS} if 'all' in _requested else _requested
+)
+
+
+def _format_date_columns(df):
+    """Format the selected date columns as ISO strings in one vectorized pass each"""
+    for field, column in DATE_FIELDS.items():
+        if field in FIELDS and column in df.columns:
+            df[column] = pd.to_datetime(df[column]).dt.strftime('%Y-%m-%d')
+
+
+def _row_to_icd10(row):
+    """Map one sheet row to an icd10_codes record, or None for category headers"""
+    
+    # Only insert codes with ICD10_Code (not just category headers)
+    if pd.isna(row.get('ICD10_Code')):
+        return None
+    
+    record = {'code': str(row['ICD10_Code']).strip()}
+    
+    for field, column in TEXT_FIELDS.items():
+        if field in FIELDS:
+            value = row.get(column)
+            if pd.notna(value):
+                record[field] = str(value)
+            else:
+                record[field] = '' if field == 'who_full_desc' else None
+    
+    # Boolean flags
+    for field, column in FLAG_FIELDS.items():
+        if field in FIELDS:
+            record[field] = row.get(column) == 'Y'
+    
+    # Dates - already ISO strings (see _format_date_columns)
+    for field, column in DATE_FIELDS.items():
+        if field in FIELDS:
+            value = row.get(column)
+            record[field] = value if pd.notna(value) else None
+    
+    return record
+
+
+def _transform_chunk(df_chunk):
+    """Convert a slice of the ICD-10 sheet into row dicts (runs in a worker process)"""
+    
+    return [d for d in (_row_to_icd10(row) for _, row in df_chunk.iterrows()) if d is not None]
+
+
 def load_icd10_codes(excel_path='/tmp/icd10.xlsx'):
     """Load ICD-10 codes from Excel into Supabase"""
     
-    print("🔄 Loading ICD-10 codes from Excel...")
+    logger.info("🔄 Loading ICD-10 codes from Excel...")
     
     # Read Excel file
     df = pd.read_excel(excel_path)
-    print(f"📊 Found {len(df)} ICD-10 codes")
+    logger.info(f"📊 Found {len(df)} ICD-10 codes")
     
     # Connect to Supabase
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Connected to Supabase")
-    
-    # Prepare data for insertion
-    codes_to_insert = []
-    
-    for _, row in df.iterrows():
-        # Only insert codes with ICD10_Code (not just category headers)
-        if pd.notna(row.get('ICD10_Code')):
-            code_data = {
-                'code': str(row['ICD10_Code']).strip(),
-                'chapter_no': str(row['Chapter_No']) if pd.notna(row.get('Chapter_No')) else None,
-                'chapter_desc': str(row['Chapter_Desc']) if pd.notna(row.get('Chapter_Desc')) else None,
-                'group_code': str(row['Group_Code']) if pd.notna(row.get('Group_Code')) else None,
-                'group_desc': str(row['Group_Desc']) if pd.notna(row.get('Group_Desc')) else None,
-                'code_3char': str(row['ICD10_3_Code']) if pd.notna(row.get('ICD10_3_Code')) else None,
-                'code_3char_desc': str(row['ICD10_3_Code_Desc']) if pd.notna(row.get('ICD10_3_Code_Desc')) else None,
-                'who_full_desc': str(row['WHO_Full_Desc']) if pd.notna(row.get('WHO_Full_Desc')) else '',
-                
-                # Boolean flags
-                'valid_clinical_use': row.get('Valid_ICD10_ClinicalUse') == 'Y',
-                'valid_primary': row.get('Valid_ICD10_Primary') == 'Y',
-                'valid_asterisk': row.get('Valid_ICD10_Asterisk') == 'Y',
-                'valid_dagger': row.get('Valid_ICD10_Dagger') == 'Y',
-                
-                # Restrictions
-                'age_range': str(row['Age_Range']) if pd.notna(row.get('Age_Range')) else None,
-                'gender': str(row['Gender']) if pd.notna(row.get('Gender')) else None,
-                'status': str(row['Status']) if pd.notna(row.get('Status')) else None,
-                
-                # Dates - convert to ISO string format
-                'who_start_date': row['WHO_Start_date'].date().isoformat() if pd.notna(row.get('WHO_Start_date')) else None,
-                'who_end_date': row['WHO_End_date'].date().isoformat() if pd.notna(row.get('WHO_End_date')) else None,
-                'sa_start_date': row['SA_Start_Date'].date().isoformat() if pd.notna(row.get('SA_Start_Date')) else None,
-                'sa_end_date': row['SA_End_Date'].date().isoformat() if pd.notna(row.get('SA_End_Date')) else None,
-            }
-            
-            codes_to_insert.append(code_data)
-    
-    print(f"📝 Prepared {len(codes_to_insert)} codes for insertion")
+    supabase = _connect()
+    logger.info("✅ Connected to Supabase")
+    
+    _format_date_columns(df)
+    
+    # Prepare data for insertion - rows are independent, so transform
+    # slices of the sheet in parallel across CPU cores
+    workers = os.cpu_count() or 1
+    chunk_size = max(1, -(-len(df) // workers))
+    chunks = [df.iloc[i:i + chunk_size] for i in range(0, len(df), chunk_size)]
+    
+    with multiprocessing.Pool(workers) as pool:
+        codes_to_insert = list(chain.from_iterable(pool.map(_transform_chunk, chunks)))
+    
+    logger.info(f"📝 Prepared {len(codes_to_insert)} codes for insertion")
     
     # Insert in batches (Supabase has limits)
     batch_size = 1000
@@ -72,22 +156,23 @@ def load_icd10_codes(excel_path='/tmp/icd10.xlsx'):
             # Use upsert to handle duplicates
             result = supabase.table('icd10_codes').upsert(batch).execute()
             total_inserted += len(batch)
-            print(f"✅ Inserted batch {i//batch_size + 1}: {total_inserted}/{len(codes_to_insert)} codes")
+            logger.info(f"✅ Inserted batch {i//batch_size + 1}: {total_inserted}/{len(codes_to_insert)} codes")
         except Exception as e:
-            print(f"❌ Error inserting batch {i//batch_size + 1}: {e}")
+            logger.error(f"❌ Error inserting batch {i//batch_size + 1}: {e}")
             # Continue with next batch
     
-    print(f"\n🎉 ICD-10 loading complete! Total inserted: {total_inserted}")
+    logger.info(f"\n🎉 ICD-10 loading complete! Total inserted: {total_inserted}")
     
     # Verify insertion
     count_result = supabase.table('icd10_codes').select('code', count='exact').execute()
-    print(f"📊 Total codes in database: {count_result.count}")
+    logger.info(f"📊 Total codes in database: {count_result.count}")
     
     # Show sample codes
     sample = supabase.table('icd10_codes').select('*').limit(5).execute()
-    print("\n📋 Sample codes:")
-    for code in sample.data:
-        print(f"  - {code['code']}: {code['who_full_desc']}")
+    logger.info("\n📋 Sample codes:\n" + "\n".join(
+        f"  - {code['code']}: {code['who_full_desc']}" for code in sample.data
+    ))
 
 if __name__ == '__main__':
+    _setup_logging()
     load_icd10_codes()
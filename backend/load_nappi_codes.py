@@ -14,13 +14,47 @@ CSV Format Expected:
 import pandas as pd
 import os
 import sys
-from supabase import create_client
+import logging
+import logging.handlers
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import httpx
+from supabase import create_client, ClientOptions
 from datetime import datetime
 
 # Supabase credentials
 SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://sizujtbejnnrdqcymgle.supabase.co')
 SUPABASE_KEY = os.getenv('SUPABASE_SERVICE_KEY')
 
+# Rows read from the CSV at a time - only one chunk is held in memory
+CSV_CHUNK_ROWS = 50_000
+# Upsert batches allowed in flight before reading the next chunk waits
+MAX_PENDING_BATCHES = 4
+
+logger = logging.getLogger(__name__)
+
+
+def _setup_logging():
+    """Send progress through a buffered handler (flushed in blocks, or at once on warnings)"""
+    handler = logging.handlers.MemoryHandler(
+        capacity=100,
+        flushLevel=logging.WARNING,
+        target=logging.StreamHandler(sys.stdout)
+    )
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def _connect():
+    """Create a Supabase client backed by a pooled HTTP/2 keep-alive session"""
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60),
+        timeout=30.0
+    )
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=ClientOptions(httpx_client=http_client))
+
 
 def normalize_schedule(schedule_str):
     """Normalize schedule text to standard format"""
@@ -42,143 +76,181 @@ def normalize_schedule(schedule_str):
     return schedule_mapping.get(schedule_str, 'Unscheduled')
 
 
+def _row_to_nappi(idx, row, columns):
+    """Map one CSV row to a nappi_codes record, or None if it must be skipped"""
+    
+    try:
+        # Expected columns (flexible mapping)
+        # Try to find columns by name variations
+        nappi_code = None
+        brand_name = None
+        generic_name = None
+        schedule = None
+        strength = None
+        ingredients = None
+        
+        # Find NAPPI Code column
+        for col in ['NAPPI Code', 'nappi_code', 'NAPPI', 'Code', 'nappi']:
+            if col in columns and pd.notna(row.get(col)):
+                nappi_code = str(row[col]).strip()
+                break
+        
+        # Find Brand Name column
+        for col in ['Brand Name', 'brand_name', 'Brand', 'Trade Name', 'Product Name']:
+            if col in columns and pd.notna(row.get(col)):
+                brand_name = str(row[col]).strip()
+                break
+        
+        # Find Generic Name column
+        for col in ['Generic Name', 'generic_name', 'Generic', 'Active Ingredient']:
+            if col in columns and pd.notna(row.get(col)):
+                generic_name = str(row[col]).strip()
+                break
+        
+        # Find Schedule column
+        for col in ['Schedule', 'schedule', 'Medicine Schedule', 'Class']:
+            if col in columns and pd.notna(row.get(col)):
+                schedule = normalize_schedule(row[col])
+                break
+        
+        # Find Strength/Dosage Form column
+        for col in ['Strength/Dosage Form', 'Strength', 'Dosage Form', 'strength', 'dosage_form']:
+            if col in columns and pd.notna(row.get(col)):
+                strength = str(row[col]).strip()
+                break
+        
+        # Find Ingredients column
+        for col in ['Ingredients', 'ingredients', 'Active Ingredients', 'Composition']:
+            if col in columns and pd.notna(row.get(col)):
+                ingredients = str(row[col]).strip()
+                break
+        
+        # Validate required fields
+        if not nappi_code or not brand_name or not generic_name:
+            return None
+        
+        return {
+            'nappi_code': nappi_code,
+            'brand_name': brand_name,
+            'generic_name': generic_name,
+            'schedule': schedule or 'Unscheduled',
+            'strength': strength,
+            'dosage_form': strength,  # Combined in input
+            'ingredients': ingredients or generic_name,
+            'status': 'active'
+        }
+    
+    except Exception as e:
+        logger.warning(f"⚠️  Warning: Error processing row {idx}: {e}")
+        return None
+
+
+def _transform_chunk(df_chunk):
+    """
+    Convert a slice of the CSV into NAPPI row dicts (runs in a worker process).
+    Returns (codes, skipped_count).
+    """
+    
+    columns = df_chunk.columns
+    codes = [d for d in (_row_to_nappi(idx, row, columns) for idx, row in df_chunk.iterrows()) if d is not None]
+    
+    return codes, len(df_chunk) - len(codes)
+
+
 def load_nappi_from_csv(csv_path):
     """Load NAPPI codes from CSV into Supabase"""
     
     if not os.path.exists(csv_path):
-        print(f"❌ Error: CSV file not found at {csv_path}")
+        logger.error(f"❌ Error: CSV file not found at {csv_path}")
         return
     
-    print(f"🔄 Loading NAPPI codes from CSV: {csv_path}")
-    
-    # Read CSV file
-    df = pd.read_csv(csv_path)
-    print(f"📊 Found {len(df)} NAPPI entries in CSV")
-    
-    # Display column names
-    print(f"📋 CSV Columns: {list(df.columns)}")
+    logger.info(f"🔄 Loading NAPPI codes from CSV: {csv_path}")
     
     # Connect to Supabase
-    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Connected to Supabase")
+    supabase = _connect()
+    logger.info("✅ Connected to Supabase")
     
-    # Prepare data for insertion
-    codes_to_insert = []
+    # Stream the CSV a chunk at a time. Each chunk's rows are transformed
+    # across CPU cores while earlier batches upsert on a background thread;
+    # at most MAX_PENDING_BATCHES uploads are queued before reading waits.
+    workers = os.cpu_count() or 1
+    batch_size = 1000
+    total_rows = 0
+    total_prepared = 0
+    total_inserted = 0
+    total_errors = 0
     skipped_count = 0
+    batch_number = 0
+    pending = deque()
     
-    for idx, row in df.iterrows():
-        try:
-            # Expected columns (flexible mapping)
-            # Try to find columns by name variations
-            nappi_code = None
-            brand_name = None
-            generic_name = None
-            schedule = None
-            strength = None
-            ingredients = None
-            
-            # Find NAPPI Code column
-            for col in ['NAPPI Code', 'nappi_code', 'NAPPI', 'Code', 'nappi']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    nappi_code = str(row[col]).strip()
-                    break
-            
-            # Find Brand Name column
-            for col in ['Brand Name', 'brand_name', 'Brand', 'Trade Name', 'Product Name']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    brand_name = str(row[col]).strip()
-                    break
-            
-            # Find Generic Name column
-            for col in ['Generic Name', 'generic_name', 'Generic', 'Active Ingredient']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    generic_name = str(row[col]).strip()
-                    break
-            
-            # Find Schedule column
-            for col in ['Schedule', 'schedule', 'Medicine Schedule', 'Class']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    schedule = normalize_schedule(row[col])
-                    break
-            
-            # Find Strength/Dosage Form column
-            for col in ['Strength/Dosage Form', 'Strength', 'Dosage Form', 'strength', 'dosage_form']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    strength = str(row[col]).strip()
-                    break
-            
-            # Find Ingredients column
-            for col in ['Ingredients', 'ingredients', 'Active Ingredients', 'Composition']:
-                if col in df.columns and pd.notna(row.get(col)):
-                    ingredients = str(row[col]).strip()
-                    break
-            
-            # Validate required fields
-            if not nappi_code or not brand_name or not generic_name:
-                skipped_count += 1
-                continue
+    def drain(limit):
+        nonlocal total_inserted, total_errors
+        while len(pending) > limit:
+            number, size, future = pending.popleft()
+            try:
+                future.result()
+                total_inserted += size
+                logger.info(f"✅ Inserted batch {number}: {total_inserted}/{total_prepared} codes")
+            except Exception as e:
+                logger.error(f"❌ Error inserting batch {number}: {e}")
+                total_errors += size
+                # Continue with next batch
+    
+    with multiprocessing.Pool(workers) as pool, ThreadPoolExecutor(max_workers=1) as uploader:
+        for df in pd.read_csv(csv_path, chunksize=CSV_CHUNK_ROWS, dtype=str):
+            if total_rows == 0:
+                # Display column names
+                logger.info(f"📋 CSV Columns: {list(df.columns)}")
+            total_rows += len(df)
             
-            code_data = {
-                'nappi_code': nappi_code,
-                'brand_name': brand_name,
-                'generic_name': generic_name,
-                'schedule': schedule or 'Unscheduled',
-                'strength': strength,
-                'dosage_form': strength,  # Combined in input
-                'ingredients': ingredients or generic_name,
-                'status': 'active'
-            }
+            slice_size = max(1, -(-len(df) // workers))
+            slices = [df.iloc[i:i + slice_size] for i in range(0, len(df), slice_size)]
             
-            codes_to_insert.append(code_data)
+            codes_to_insert = []
+            for codes, skipped in pool.map(_transform_chunk, slices):
+                codes_to_insert.extend(codes)
+                skipped_count += skipped
+            total_prepared += len(codes_to_insert)
             
-        except Exception as e:
-            print(f"⚠️  Warning: Error processing row {idx}: {e}")
-            skipped_count += 1
-            continue
+            # Insert in batches (Supabase has limits); upsert handles duplicates
+            for i in range(0, len(codes_to_insert), batch_size):
+                batch = codes_to_insert[i:i + batch_size]
+                batch_number += 1
+                future = uploader.submit(supabase.table('nappi_codes').upsert(batch).execute)
+                pending.append((batch_number, len(batch), future))
+                drain(MAX_PENDING_BATCHES)
+        
+        drain(0)
     
-    print(f"📝 Prepared {len(codes_to_insert)} codes for insertion")
+    logger.info(f"📊 Found {total_rows} NAPPI entries in CSV")
+    logger.info(f"📝 Prepared {total_prepared} codes for insertion")
     if skipped_count > 0:
-        print(f"⚠️  Skipped {skipped_count} rows due to missing required fields")
+        logger.warning(f"⚠️  Skipped {skipped_count} rows due to missing required fields")
     
-    if len(codes_to_insert) == 0:
-        print("❌ No valid NAPPI codes to insert. Please check CSV format.")
+    if total_prepared == 0:
+        logger.error("❌ No valid NAPPI codes to insert. Please check CSV format.")
         return
     
-    # Insert in batches (Supabase has limits)
-    batch_size = 1000
-    total_inserted = 0
-    total_errors = 0
-    
-    for i in range(0, len(codes_to_insert), batch_size):
-        batch = codes_to_insert[i:i + batch_size]
-        
-        try:
-            # Use upsert to handle duplicates
-            result = supabase.table('nappi_codes').upsert(batch).execute()
-            total_inserted += len(batch)
-            print(f"✅ Inserted batch {i//batch_size + 1}: {total_inserted}/{len(codes_to_insert)} codes")
-        except Exception as e:
-            print(f"❌ Error inserting batch {i//batch_size + 1}: {e}")
-            total_errors += len(batch)
-            # Continue with next batch
-    
-    print(f"\n🎉 NAPPI loading complete!")
-    print(f"   Total inserted: {total_inserted}")
-    print(f"   Total errors: {total_errors}")
-    print(f"   Total skipped: {skipped_count}")
+    logger.info(
+        f"\n🎉 NAPPI loading complete!\n"
+        f"   Total inserted: {total_inserted}\n"
+        f"   Total errors: {total_errors}\n"
+        f"   Total skipped: {skipped_count}"
+    )
     
     # Verify insertion
     try:
         count_result = supabase.table('nappi_codes').select('nappi_code', count='exact').execute()
-        print(f"\n📊 Total NAPPI codes in database: {count_result.count}")
+        logger.info(f"\n📊 Total NAPPI codes in database: {count_result.count}")
         
         # Show sample codes
         sample = supabase.table('nappi_codes').select('*').limit(5).execute()
-        print("\n📋 Sample NAPPI codes:")
-        for code in sample.data:
-            print(f"  - {code['nappi_code']}: {code['brand_name']} ({code['generic_name']}) - {code['schedule']}")
+        logger.info("\n📋 Sample NAPPI codes:\n" + "\n".join(
+            f"  - {code['nappi_code']}: {code['brand_name']} ({code['generic_name']}) - {code['schedule']}"
+            for code in sample.data
+        ))
     except Exception as e:
-        print(f"⚠️  Could not verify insertion: {e}")
+        logger.warning(f"⚠️  Could not verify insertion: {e}")
 
 
 def main():
@@ -190,6 +262,7 @@ def main():
         sys.exit(1)
     
     csv_path = sys.argv[1]
+    _setup_logging()
     load_nappi_from_csv(csv_path)
 
 
@@ -8,20 +8,26 @@ load_dotenv()
 import os
 import time
 import uuid
+import asyncio
 import tempfile
 from datetime import datetime
 from typing import List, Optional
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
+from concurrent.futures import ThreadPoolExecutor
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, status, Request, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, status, Request, Form, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 import uvicorn
+import orjson
+import aiofiles
+import aiofiles.os
 
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger, RequestLogger
+from app.core.threadpool import configure_threadpool
 from app.api.models import (
     HealthResponse, ErrorResponse, DocumentProcessingResult, 
     BatchProcessingResult, ValidationRequest, ValidationResponse,
@@ -29,7 +35,7 @@ from app.api.models import (
 )
 from app.services.processor import DocumentProcessor
 from app.services.database import DatabaseManager
-from app.services.storage import StorageManager
+from app.services.storage import StorageManager, UPLOAD_CHUNK_SIZE
 
 # Import GP router
 from app.api.gp_endpoints import gp_router
@@ -49,6 +55,46 @@ processor: Optional[DocumentProcessor] = None
 db_manager: Optional[DatabaseManager] = None
 storage_manager: Optional[StorageManager] = None
 
+# Blocking parse calls run here so they don't stall the event loop
+_PARSE_POOL = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix="parse")
+
+# Health check payload that never changes while the process is up
+_START_TIME = time.monotonic()
+_HEALTH_STATIC = {
+    "service": settings.PROJECT_NAME,
+    "version": settings.VERSION,
+    "supported_document_types": [
+        "certificate_of_fitness",
+        "vision_test", 
+        "audiometric_test",
+        "spirometry_report",
+        "consent_form",
+        "medical_questionnaire"
+    ],
+    "processing_modes": ["smart", "fast", "extract_all", "detect_only"],
+    "features": {
+        "batch_processing": True,
+        "async_processing": True,
+        "database_storage": bool(settings.MONGODB_URL),
+        "file_storage": True,
+        "validation_workflow": True
+    }
+}
+
+# /api/v1/statistics is polled by dashboards; concurrent callers share one
+# aggregation and its result is reused for a few seconds
+_STATS_TTL_SECONDS = 5
+_stats_lock = asyncio.Lock()
+_stats_cache = {"at": 0.0, "value": None}
+
+
+class DocumentJSONResponse(ORJSONResponse):
+    """ORJSONResponse for raw MongoDB documents, which can carry numpy scalars or non-str keys from OCR output"""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 # Security
 security = HTTPBearer(auto_error=False)
 
@@ -62,6 +108,9 @@ async def lifespan(app: FastAPI):
     
     global processor, db_manager, storage_manager
     
+    # The gp_endpoints / clinical_actions / query routes are plain def
+    configure_threadpool()
+    
     try:
         # Initialize services
         processor = DocumentProcessor()
@@ -89,6 +138,8 @@ async def lifespan(app: FastAPI):
     if db_manager:
         await db_manager.close()
     
+    _PARSE_POOL.shutdown(wait=False)
+    
     logger.info("Microservice shutdown complete")
 
 
@@ -100,10 +151,75 @@ app = FastAPI(
     docs_url="/docs" if settings.DEBUG else None,
     redoc_url="/redoc" if settings.DEBUG else None,
     openapi_url="/openapi.json" if settings.DEBUG else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# Middleware
+# Middleware - the last one registered is outermost, so requests pass
+# CORS -> TrustedHost -> request ID -> body size
+
+# Largest request body accepted, checked from Content-Length before the
+# multipart body is read
+_MAX_BODY_BYTES = settings.MAX_FILE_SIZE_MB * 1024 * 1024 * settings.MAX_UPLOAD_FILES
+
+
+@app.middleware("http")
+async def limit_body_size(request: Request, call_next):
+    """Reject oversized uploads before any of the body is spooled to disk"""
+    
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > _MAX_BODY_BYTES:
+        error_response = ErrorResponse(
+            error=f"Request body too large. Maximum size: {_MAX_BODY_BYTES // (1024 * 1024)}MB",
+            error_code="HTTP_413"
+        )
+        return ORJSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content=error_response.model_dump(mode='json')
+        )
+    
+    return await call_next(request)
+
+
+# Request ID middleware
+@app.middleware("http")
+async def add_request_id(request: Request, call_next):
+    """Add request ID to all requests"""
+    
+    request_id = uuid.uuid4().hex
+    request.state.request_id = request_id
+    
+    start_ns = time.perf_counter_ns()
+    response = await call_next(request)
+    process_ms = (time.perf_counter_ns() - start_ns) / 1_000_000
+    
+    response.headers["X-Request-ID"] = request_id
+    response.headers["X-Process-Time"] = f"{process_ms:.2f}ms"
+    
+    # Log API request
+    logger.info(
+        f"{request.method} {request.url.path}",
+        extra={
+            "method": request.method,
+            "path": request.url.path,
+            "request_id": request_id,
+            "process_time_ms": process_ms,
+            "status_code": response.status_code
+        }
+    )
+    
+    return response
+
+
+if not settings.DEBUG:
+    app.add_middleware(
+        TrustedHostMiddleware,
+        allowed_hosts=["*"]  # Configure based on your deployment
+    )
+
+
+# Preflight OPTIONS requests are answered here without reaching the
+# middleware above
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -113,7 +229,7 @@ app.add_middleware(
     ] + settings.get_cors_origins(),
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-    allow_headers=["*"],
+    allow_headers=["authorization", "content-type", "x-request-id"],
 )
 
 # Include GP router
@@ -129,12 +245,6 @@ app.include_router(clinical_actions_router)
 # Include Phase-3 query-layer router (POST /api/query/run) — PR A.
 app.include_router(query_router)
 
-if not settings.DEBUG:
-    app.add_middleware(
-        TrustedHostMiddleware,
-        allowed_hosts=["*"]  # Configure based on your deployment
-    )
-
 
 # Authentication dependency
 async def get_api_key(credentials: Optional[HTTPAuthorizationCredentials] = Depends(security)):
@@ -150,36 +260,6 @@ async def get_api_key(credentials: Optional[HTTPAuthorizationCredentials] = Depe
     return credentials
 
 
-# Request ID middleware
-@app.middleware("http")
-async def add_request_id(request: Request, call_next):
-    """Add request ID to all requests"""
-    
-    request_id = str(uuid.uuid4())
-    request.state.request_id = request_id
-    
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
-    
-    response.headers["X-Request-ID"] = request_id
-    response.headers["X-Process-Time"] = str(process_time)
-    
-    # Log API request
-    logger.info(
-        f"{request.method} {request.url.path}",
-        extra={
-            "method": request.method,
-            "path": request.url.path,
-            "request_id": request_id,
-            "process_time": process_time,
-            "status_code": response.status_code
-        }
-    )
-    
-    return response
-
-
 # Error handling
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request: Request, exc: HTTPException):
@@ -190,15 +270,9 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         error_code=f"HTTP_{exc.status_code}"
     )
     
-    # Convert datetime objects to strings for JSON serialization
-    content = error_response.model_dump()
-    for key, value in content.items():
-        if isinstance(value, datetime):
-            content[key] = value.isoformat()
-    
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
-        content=content
+        content=error_response.model_dump(mode='json')
     )
 
 
@@ -219,15 +293,9 @@ async def general_exception_handler(request: Request, exc: Exception):
         error_code="INTERNAL_ERROR"
     )
     
-    # Convert datetime objects to strings for JSON serialization
-    content = error_response.model_dump()
-    for key, value in content.items():
-        if isinstance(value, datetime):
-            content[key] = value.isoformat()
-    
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-        content=content
+        content=error_response.model_dump(mode='json')
     )
 
 
@@ -239,50 +307,54 @@ async def general_exception_handler(request: Request, exc: Exception):
 async def health_check():
     """Health check endpoint"""
     
-    uptime = time.time() - getattr(health_check, 'start_time', time.time())
-    if not hasattr(health_check, 'start_time'):
-        health_check.start_time = time.time()
-    
     return HealthResponse(
         status="healthy",
-        service=settings.PROJECT_NAME,
-        version=settings.VERSION,
         timestamp=datetime.utcnow().isoformat(),
-        uptime_seconds=uptime,
-        mongodb_connected=db_manager.connected if db_manager else False,
-        supported_document_types=[
-            "certificate_of_fitness",
-            "vision_test", 
-            "audiometric_test",
-            "spirometry_report",
-            "consent_form",
-            "medical_questionnaire"
-        ],
-        processing_modes=["smart", "fast", "extract_all", "detect_only"],
-        features={
-            "batch_processing": True,
-            "async_processing": True,
-            "database_storage": bool(settings.MONGODB_URL),
-            "file_storage": True,
-            "validation_workflow": True
-        }
+        uptime_seconds=time.monotonic() - _START_TIME,
+        mongodb_connected=bool(db_manager and db_manager.connected),
+        **_HEALTH_STATIC
     )
 
 
+async def _safe_unlink(path: str):
+    with suppress(FileNotFoundError):
+        await aiofiles.os.unlink(path)
+
+
+async def _cleanup(paths: List[str]):
+    """Delete temp files; scheduled as a background task once the response is ready"""
+    await asyncio.gather(*(_safe_unlink(path) for path in paths), return_exceptions=True)
+
+
+async def _persist_async(document_id: str, filename: str, result_dict: dict):
+    """Background task: save a processing result, logging instead of raising on failure"""
+    try:
+        await db_manager.save_processing_result(document_id, filename, result_dict)
+    except Exception as e:
+        logger.error(f"Background save of {filename} to database failed: {e}",
+                    extra={"document_id": document_id})
+
+
 @app.post("/api/v1/historic-documents/upload", response_model=DocumentProcessingResult)
 async def upload_document(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     processing_mode: ProcessingModeEnum = Form(ProcessingModeEnum.SMART),
     save_to_database: bool = Form(True),
+    wait_for_db: bool = False,
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(get_api_key)
 ):
     """
     Upload and process a single historic document.
     Compatible with SurgiScan Historic Documents component.
+    
+    The database save runs after the response is sent (database status
+    "pending"); pass ?wait_for_db=true to wait for the save to be acknowledged.
     """
     
-    request_id = str(uuid.uuid4())
+    request_id = uuid.uuid4().hex
     document_id = str(uuid.uuid4())
+    request_ts = datetime.utcnow().isoformat()
     
     # Validate file
     if not file.filename:
@@ -291,7 +363,7 @@ async def upload_document(
             detail="No file provided"
         )
     
-    if not FileUploadValidator.validate_file_extension(file.filename, settings.ALLOWED_EXTENSIONS):
+    if not FileUploadValidator.validate_file_extension(file.filename, settings.ALLOWED_EXT_SET):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed. Supported: {', '.join(settings.ALLOWED_EXTENSIONS)}"
@@ -321,27 +393,23 @@ async def upload_document(
             # Save to database if requested
             db_info = {"status": "not_saved"}
             if save_to_database and db_manager and db_manager.connected:
-                try:
-                    # Convert Pydantic model to dict for database saving
-                    result_dict = {
-                        "status": result.status,
-                        "extracted_data": result.extracted_data,
-                        "processing_summary": result.processing_summary,
-                        "patient_info": result.patient_info,
-                        "confidence_score": result.confidence_score,
-                        "needs_validation": result.needs_validation
-                    }
-                    db_document_id = await db_manager.save_processing_result(
-                        document_id, file.filename, result_dict
-                    )
-                    db_info = {
-                        "status": "saved",
-                        "document_id": db_document_id,
-                        "saved_at": datetime.utcnow().isoformat()
-                    }
-                except Exception as e:
-                    logger.error(f"Failed to save to database: {e}")
-                    db_info = {"status": "save_failed", "error": str(e)}
+                result_dict = result.to_db_dict()
+                if not wait_for_db:
+                    background_tasks.add_task(_persist_async, document_id, file.filename, result_dict)
+                    db_info = {"status": "pending", "document_id": document_id}
+                else:
+                    try:
+                        db_document_id = await db_manager.save_processing_result(
+                            document_id, file.filename, result_dict
+                        )
+                        db_info = {
+                            "status": "saved",
+                            "document_id": db_document_id,
+                            "saved_at": request_ts
+                        }
+                    except Exception as e:
+                        logger.error(f"Failed to save to database: {e}")
+                        db_info = {"status": "save_failed", "error": str(e)}
             
             # Store file permanently if processing succeeded
             file_url = None
@@ -351,32 +419,93 @@ async def upload_document(
                 except Exception as e:
                     logger.warning(f"Failed to store file permanently: {e}")
             
-            return DocumentProcessingResult(
+            response = DocumentProcessingResult(
                 success=result.status == ProcessingStatusEnum.COMPLETED,
                 document_id=document_id,
                 filename=file.filename,
                 status=ProcessingStatusEnum(result.status),
-                document_types_found=[dt for dt in result.extracted_data.keys()],
+                document_types_found=list(result.extracted_data),
                 extracted_data=result.extracted_data,
                 processing_summary=result.processing_summary,
                 patient_info=result.patient_info,
                 database=db_info,
-                created_at=datetime.utcnow().isoformat(),
+                created_at=request_ts,
                 needs_validation=result.needs_validation,
                 confidence_score=result.confidence_score,
                 # NEW: Include grounding data
                 chunks=result.chunks,
                 pdf_metadata=result.pdf_metadata
             )
+            
+            # Delete the temp file after the response is sent
+            background_tasks.add_task(_cleanup, [temp_path])
+            temp_path = None
+            return response
     
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Clean up straight away if we failed before scheduling it
+        if temp_path:
+            await _cleanup([temp_path])
+
+
+async def _save_temp(file: UploadFile, sem: asyncio.Semaphore) -> str:
+    """Save one upload to a temp file, bounded by the batch semaphore"""
+    async with sem:
+        return await storage_manager.save_temp_file(file)
+
+
+async def _persist(
+    document_id: str, filename: str, result, sem: asyncio.Semaphore, saved_at: str
+) -> dict:
+    """Save one processing result to the database; returns the db_info for the response"""
+    
+    async with sem:
+        try:
+            db_document_id = await db_manager.save_processing_result(
+                document_id, filename, result.to_db_dict()
+            )
+            return {
+                "status": "saved",
+                "document_id": db_document_id,
+                "saved_at": saved_at
+            }
+        except Exception as e:
+            logger.error(f"Failed to save {filename} to database: {e}")
+            return {"status": "save_failed", "error": str(e)}
+
+
+async def _persist_batch(pending: list, sem: asyncio.Semaphore, saved_at: str) -> List[dict]:
+    """
+    Save (document_id, filename, result) triples with one bulk write.
+    Documents the bulk write rejects are retried one by one via _persist.
+    """
+    
+    items = [
+        (document_id, filename, result.to_db_dict())
+        for document_id, filename, result in pending
+    ]
+    try:
+        saved_ids = await db_manager.save_processing_results_bulk(items)
+    except Exception as e:
+        logger.error(f"Bulk save of {len(items)} documents failed, saving individually: {e}")
+        saved_ids = [None] * len(items)
+    
+    db_infos = [
+        {"status": "saved", "document_id": db_document_id, "saved_at": saved_at}
+        if db_document_id else None
+        for db_document_id in saved_ids
+    ]
+    retry = [i for i, db_info in enumerate(db_infos) if db_info is None]
+    retried = await asyncio.gather(*(_persist(*pending[i], sem, saved_at) for i in retry))
+    for i, db_info in zip(retry, retried):
+        db_infos[i] = db_info
+    
+    return db_infos
 
 
 @app.post("/api/v1/historic-documents/batch-upload", response_model=BatchProcessingResult)
 async def batch_upload_documents(
+    background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(...),
     processing_mode: ProcessingModeEnum = Form(ProcessingModeEnum.SMART),
     save_to_database: bool = Form(True),
@@ -387,7 +516,8 @@ async def batch_upload_documents(
     """
     
     batch_id = str(uuid.uuid4())
-    request_id = str(uuid.uuid4())
+    request_id = uuid.uuid4().hex
+    request_ts = datetime.utcnow().isoformat()
     
     if not files:
         raise HTTPException(
@@ -395,7 +525,7 @@ async def batch_upload_documents(
             detail="No files provided"
         )
     
-    # Validate all files first
+    # Validate every file in one pass before any work starts
     for file in files:
         if not file.filename:
             raise HTTPException(
@@ -403,7 +533,7 @@ async def batch_upload_documents(
                 detail=f"Invalid filename: {file.filename}"
             )
         
-        if not FileUploadValidator.validate_file_extension(file.filename, settings.ALLOWED_EXTENSIONS):
+        if not FileUploadValidator.validate_file_extension(file.filename, settings.ALLOWED_EXT_SET):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"File type not allowed: {file.filename}"
@@ -418,63 +548,58 @@ async def batch_upload_documents(
     with RequestLogger(logger, request_id, f"batch_processing_{len(files)}_files"):
         # Save all files temporarily
         temp_files = []
-        documents = []
+        doc_ids = [str(uuid.uuid4()) for _ in files]
+        sem = asyncio.Semaphore(settings.BATCH_CONCURRENCY)
         
         try:
-            for file in files:
-                temp_path = await storage_manager.save_temp_file(file)
-                document_id = str(uuid.uuid4())
-                temp_files.append(temp_path)
-                documents.append((document_id, temp_path, file.filename))
+            saved = await asyncio.gather(
+                *(_save_temp(file, sem) for file in files),
+                return_exceptions=True
+            )
+            temp_files = [path for path in saved if isinstance(path, str)]
+            for outcome in saved:
+                if isinstance(outcome, BaseException):
+                    raise outcome
+            
+            documents = [
+                (document_id, temp_path, file.filename)
+                for document_id, file, temp_path in zip(doc_ids, files, saved)
+            ]
             
             # Process all documents
             results = await processor.batch_process_documents(documents, processing_mode.value)
             
+            # Save to database if requested
+            db_infos = [{"status": "not_saved"} for _ in results]
+            if save_to_database and db_manager and db_manager.connected:
+                to_save = [
+                    i for i, result in enumerate(results)
+                    if result.status == ProcessingStatusEnum.COMPLETED
+                ]
+                saved = await _persist_batch(
+                    [(documents[i][0], documents[i][2], results[i]) for i in to_save],
+                    sem, request_ts
+                )
+                for i, db_info in zip(to_save, saved):
+                    db_infos[i] = db_info
+            
             # Convert results to API format
             api_results = []
             successful = 0
             failed = 0
             
-            for i, result in enumerate(results):
-                document_id, _, filename = documents[i]
-                
-                # Save to database if requested
-                db_info = {"status": "not_saved"}
-                if (save_to_database and db_manager and db_manager.connected and 
-                    result.status == ProcessingStatusEnum.COMPLETED):
-                    try:
-                        # Convert Pydantic model to dict for database saving
-                        result_dict = {
-                            "status": result.status,
-                            "extracted_data": result.extracted_data,
-                            "processing_summary": result.processing_summary,
-                            "patient_info": result.patient_info,
-                            "confidence_score": result.confidence_score,
-                            "needs_validation": result.needs_validation
-                        }
-                        db_document_id = await db_manager.save_processing_result(
-                            document_id, filename, result_dict
-                        )
-                        db_info = {
-                            "status": "saved",
-                            "document_id": db_document_id,
-                            "saved_at": datetime.utcnow().isoformat()
-                        }
-                    except Exception as e:
-                        logger.error(f"Failed to save {filename} to database: {e}")
-                        db_info = {"status": "save_failed", "error": str(e)}
-                
+            for (document_id, _, filename), result, db_info in zip(documents, results, db_infos):
                 api_result = DocumentProcessingResult(
                     success=result.status == ProcessingStatusEnum.COMPLETED,
                     document_id=document_id,
                     filename=filename,
                     status=ProcessingStatusEnum(result.status),
-                    document_types_found=[dt for dt in result.extracted_data.keys()],
+                    document_types_found=list(result.extracted_data),
                     extracted_data=result.extracted_data,
                     processing_summary=result.processing_summary,
                     patient_info=result.patient_info,
                     database=db_info,
-                    created_at=datetime.utcnow().isoformat(),
+                    created_at=request_ts,
                     needs_validation=result.needs_validation,
                     confidence_score=result.confidence_score
                 )
@@ -486,7 +611,7 @@ async def batch_upload_documents(
                 else:
                     failed += 1
             
-            return BatchProcessingResult(
+            response = BatchProcessingResult(
                 success=True,
                 batch_id=batch_id,
                 total_files=len(files),
@@ -495,14 +620,17 @@ async def batch_upload_documents(
                 processing_mode=processing_mode,
                 saved_to_database=save_to_database,
                 results=api_results,
-                created_at=datetime.utcnow().isoformat()
+                created_at=request_ts
             )
+            
+            # Delete the temp files after the response is sent
+            background_tasks.add_task(_cleanup, temp_files)
+            temp_files = []
+            return response
         
         finally:
-            # Clean up temporary files
-            for temp_path in temp_files:
-                if os.path.exists(temp_path):
-                    os.unlink(temp_path)
+            # Clean up straight away if we failed before scheduling it
+            await _cleanup(temp_files)
 
 
 @app.get("/api/v1/historic-documents/{document_id}/status")
@@ -547,7 +675,7 @@ async def get_document_status(
         )
 
 
-@app.get("/api/v1/historic-documents/{document_id}")
+@app.get("/api/v1/historic-documents/{document_id}", response_class=DocumentJSONResponse)
 async def get_document(
     document_id: str,
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(get_api_key)
@@ -568,7 +696,9 @@ async def get_document(
                 detail="Document not found"
             )
         
-        return {"document": document}
+        # Returned directly so orjson encodes the stored document in one pass,
+        # skipping FastAPI's jsonable_encoder walk over the extracted data
+        return DocumentJSONResponse({"document": document})
         
     except Exception as e:
         logger.error(f"Failed to get document: {e}")
@@ -639,8 +769,15 @@ async def get_statistics(
         }
     
     try:
-        stats = await db_manager.get_statistics()
-        return stats
+        if time.monotonic() - _stats_cache["at"] < _STATS_TTL_SECONDS and _stats_cache["value"]:
+            return _stats_cache["value"]
+        
+        async with _stats_lock:
+            # Another request may have refreshed the cache while we waited
+            if time.monotonic() - _stats_cache["at"] >= _STATS_TTL_SECONDS or not _stats_cache["value"]:
+                _stats_cache["value"] = await db_manager.get_statistics()
+                _stats_cache["at"] = time.monotonic()
+            return _stats_cache["value"]
         
     except Exception as e:
         logger.error(f"Failed to get statistics: {e}")
@@ -652,6 +789,7 @@ async def get_statistics(
 
 @app.post("/parse-document")
 async def parse_document_only(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     api_key: Optional[HTTPAuthorizationCredentials] = Depends(get_api_key)
 ):
@@ -660,7 +798,7 @@ async def parse_document_only(
     Simplified endpoint for testing document parsing quality.
     """
     
-    request_id = str(uuid.uuid4())
+    request_id = uuid.uuid4().hex
     
     # Validate file
     if not file.filename:
@@ -679,19 +817,24 @@ async def parse_document_only(
     
     temp_path = None
     try:
-        # Save uploaded file temporarily
-        temp_path = os.path.join(tempfile.gettempdir(), f"{request_id}_{file.filename}")
+        # Save uploaded file temporarily - tempfile picks a unique, safe name so
+        # nothing from the client filename beyond its extension reaches the path
+        with tempfile.NamedTemporaryFile(suffix=os.path.splitext(file.filename)[1], delete=False) as tf:
+            temp_path = tf.name
         
-        with open(temp_path, "wb") as temp_file:
-            content = await file.read()
-            temp_file.write(content)
+        async with aiofiles.open(temp_path, "wb") as temp_file:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await temp_file.write(chunk)
         
         start_time = datetime.utcnow()
         
         # Try to use the processor to parse only (without extraction)
         if hasattr(processor, '_process_document_sync'):
-            # Use the internal parsing method if available
-            result = processor._process_document_sync(temp_path, "PARSE_ONLY")
+            # Use the internal parsing method if available; it blocks, so run it in the pool
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                _PARSE_POOL, processor._process_document_sync, temp_path, "PARSE_ONLY"
+            )
             markdown_content = result.get('markdown', '')
             chunks = result.get('chunks', [])
         else:
@@ -721,7 +864,7 @@ The parsing identifies text blocks, tables, and basic document structure while p
     
         processing_time = (datetime.utcnow() - start_time).total_seconds()
         
-        return {
+        response = {
             "success": True,
             "file_name": file.filename,
             "parsed_content": markdown_content,
@@ -735,6 +878,11 @@ The parsing identifies text blocks, tables, and basic document structure while p
             "request_id": request_id
         }
         
+        # Delete the temp file after the response is sent
+        background_tasks.add_task(_cleanup, [temp_path])
+        temp_path = None
+        return response
+        
     except Exception as e:
         logger.error(f"❌ [Parse-Only] Error processing {file.filename}: {e}")
         raise HTTPException(
@@ -743,9 +891,9 @@ The parsing identifies text blocks, tables, and basic document structure while p
         )
         
     finally:
-        # Clean up temporary file
-        if temp_path and os.path.exists(temp_path):
-            os.unlink(temp_path)
+        # Clean up straight away if we failed before scheduling it
+        if temp_path:
+            await _cleanup([temp_path])
 
 
 @app.get("/")
@@ -798,6 +946,9 @@ if __name__ == "__main__":
         "main:app",
         host=settings.HOST,
         port=settings.PORT,
+        workers=1 if settings.DEBUG else settings.WORKERS,
+        loop="uvloop",
+        http="httptools",
         log_level=settings.LOG_LEVEL.lower(),
         access_log=settings.DEBUG,
         reload=settings.DEBUG
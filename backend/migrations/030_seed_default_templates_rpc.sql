@@ -0,0 +1,81 @@
+-- ============================================================================
+-- Migration 030 — seed_default_templates RPC
+-- ============================================================================
+--
+-- seed_default_templates.py used to insert the default extraction
+-- templates and their field mappings as two separate PostgREST requests,
+-- each its own implicit transaction. A failure between them left
+-- templates with no mappings. This function takes both row sets as
+-- JSONB and inserts them in ONE transaction (a function call is
+-- implicitly transactional), so the seeder makes a single round trip
+-- and the seed is all-or-nothing.
+--
+-- ROW SHAPE: p_templates / p_mappings are arrays of objects keyed by
+-- column name, exactly the rows the seeder previously sent to
+-- PostgREST. Columns are listed explicitly so a key a row omits is
+-- NULL (matching the previous bulk-insert behaviour) and columns no row
+-- mentions keep their table defaults.
+--
+-- IDEMPOTENCY: if the workspace already has templates the function
+-- inserts nothing and returns skipped=true; the check runs inside the
+-- same transaction as the inserts. CREATE OR REPLACE, safe to re-run.
+--
+-- TENANT SCOPE: workspace_id is TEXT, as on both tables — no ::uuid cast.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION seed_default_templates(
+    p_workspace_id  TEXT,
+    p_templates     JSONB,
+    p_mappings      JSONB
+) RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_existing   INT;
+    v_templates  INT;
+    v_mappings   INT;
+BEGIN
+    SELECT count(*) INTO v_existing
+      FROM extraction_templates
+     WHERE workspace_id = p_workspace_id;
+
+    IF v_existing > 0 THEN
+        RETURN jsonb_build_object('skipped', true, 'existing', v_existing);
+    END IF;
+
+    INSERT INTO extraction_templates (
+        id, tenant_id, workspace_id, template_name, template_description,
+        document_type, is_active, is_default, auto_populate,
+        require_validation, created_at, updated_at
+    )
+    SELECT id, tenant_id, workspace_id, template_name, template_description,
+           document_type, is_active, is_default, auto_populate,
+           require_validation, created_at, updated_at
+      FROM jsonb_populate_recordset(NULL::extraction_templates, p_templates);
+    GET DIAGNOSTICS v_templates = ROW_COUNT;
+
+    INSERT INTO extraction_field_mappings (
+        id, template_id, workspace_id, source_section, source_field,
+        target_table, target_field, field_type, transformation_type,
+        transformation_config, is_required, processing_order, created_at
+    )
+    SELECT id, template_id, workspace_id, source_section, source_field,
+           target_table, target_field, field_type, transformation_type,
+           transformation_config, is_required, processing_order, created_at
+      FROM jsonb_populate_recordset(NULL::extraction_field_mappings, p_mappings);
+    GET DIAGNOSTICS v_mappings = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'skipped',   false,
+        'templates', v_templates,
+        'mappings',  v_mappings
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION seed_default_templates(TEXT, JSONB, JSONB) IS
+    'Insert default extraction templates and their field mappings in one '
+    'transaction; no-op if the workspace already has templates.';
+
+COMMIT;
@@ -0,0 +1,74 @@
+-- ============================================================================
+-- Migration 031 — seed_default_templates: server-side timestamps
+-- ============================================================================
+--
+-- seed_default_templates.py no longer sends created_at / updated_at on
+-- the seeded rows; both tables default them to NOW(). Migration 030's
+-- function listed those columns explicitly, so a row omitting them would
+-- insert NULL instead of taking the default. This redefines the function
+-- without the timestamp columns. NOW() is the transaction start time, so
+-- every seeded row still shares one timestamp.
+--
+-- ids stay client-generated: both id columns are TEXT with no default,
+-- and the mapping rows need their template's id inside the same call.
+--
+-- CREATE OR REPLACE, safe to re-run. Signature unchanged from 030.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION seed_default_templates(
+    p_workspace_id  TEXT,
+    p_templates     JSONB,
+    p_mappings      JSONB
+) RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_existing   INT;
+    v_templates  INT;
+    v_mappings   INT;
+BEGIN
+    SELECT count(*) INTO v_existing
+      FROM extraction_templates
+     WHERE workspace_id = p_workspace_id;
+
+    IF v_existing > 0 THEN
+        RETURN jsonb_build_object('skipped', true, 'existing', v_existing);
+    END IF;
+
+    INSERT INTO extraction_templates (
+        id, tenant_id, workspace_id, template_name, template_description,
+        document_type, is_active, is_default, auto_populate,
+        require_validation
+    )
+    SELECT id, tenant_id, workspace_id, template_name, template_description,
+           document_type, is_active, is_default, auto_populate,
+           require_validation
+      FROM jsonb_populate_recordset(NULL::extraction_templates, p_templates);
+    GET DIAGNOSTICS v_templates = ROW_COUNT;
+
+    INSERT INTO extraction_field_mappings (
+        id, template_id, workspace_id, source_section, source_field,
+        target_table, target_field, field_type, transformation_type,
+        transformation_config, is_required, processing_order
+    )
+    SELECT id, template_id, workspace_id, source_section, source_field,
+           target_table, target_field, field_type, transformation_type,
+           transformation_config, is_required, processing_order
+      FROM jsonb_populate_recordset(NULL::extraction_field_mappings, p_mappings);
+    GET DIAGNOSTICS v_mappings = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'skipped',   false,
+        'templates', v_templates,
+        'mappings',  v_mappings
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION seed_default_templates(TEXT, JSONB, JSONB) IS
+    'Insert default extraction templates and their field mappings in one '
+    'transaction; no-op if the workspace already has templates. '
+    'Timestamps come from the column defaults.';
+
+COMMIT;
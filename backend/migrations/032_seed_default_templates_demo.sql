@@ -0,0 +1,85 @@
+-- ============================================================================
+-- Migration 032 — Seed the default extraction templates for the demo workspace
+-- ============================================================================
+--
+-- The same seed seed_default_templates.py performs, done entirely
+-- server-side: one statement, one transaction, no PostgREST round trip
+-- and no Python/supabase-py dependency. Apply with psql or the supabase
+-- CLI. The Python seeder remains for other environments and for the
+-- COPY / RPC paths; both produce the same rows.
+--
+-- DATA SOURCE: the VALUES lists mirror backend/default_templates.json
+-- (mapping_defaults already applied). Keep the two in sync when adding
+-- or changing a default template.
+--
+-- SHAPE: a data-modifying CTE inserts the templates with server-generated
+-- TEXT ids (gen_random_uuid()::text, the same dashed form the seeder
+-- writes) and RETURNs them; the mappings join back on template_name to
+-- pick up their template_id. created_at / updated_at take the column
+-- defaults, so every row shares the transaction timestamp.
+--
+-- IDEMPOTENCY: same rule as the seeder and migration 030 — if the
+-- workspace already has any template, no template is inserted, the CTE
+-- returns no rows and therefore no mappings are inserted either. Safe
+-- to re-run.
+-- ============================================================================
+
+BEGIN;
+
+WITH tmpl AS (
+    INSERT INTO extraction_templates (
+        id, tenant_id, workspace_id, template_name, template_description,
+        document_type, is_active, is_default, auto_populate,
+        require_validation
+    )
+    SELECT gen_random_uuid()::text, 'demo-tenant-001', 'demo-gp-workspace-001',
+           v.template_name, v.template_description, v.document_type,
+           true, v.is_default, true, true
+      FROM (VALUES
+        ('Standard GP Medical Record',
+         'Standard medical records from GP practices with immunization history, chronic medications, and vital signs',
+         'medical_record', true),
+        ('Lab Report',
+         'Laboratory test results from PathCare, Lancet, Ampath, etc.',
+         'lab_report', false),
+        ('Immunization Card',
+         'Vaccination cards and immunization records',
+         'immunization_card', false)
+      ) AS v(template_name, template_description, document_type, is_default)
+     WHERE NOT EXISTS (
+         SELECT 1 FROM extraction_templates WHERE workspace_id = 'demo-gp-workspace-001'
+     )
+    RETURNING id, template_name
+)
+INSERT INTO extraction_field_mappings (
+    id, template_id, workspace_id, source_section, source_field,
+    target_table, target_field, field_type, transformation_type,
+    transformation_config, is_required, processing_order
+)
+SELECT gen_random_uuid()::text, tmpl.id, 'demo-gp-workspace-001',
+       m.source_section, m.source_field, m.target_table, m.target_field,
+       m.field_type, m.transformation_type, m.transformation_config,
+       m.is_required, m.processing_order
+  FROM tmpl
+  JOIN (VALUES
+    -- Standard GP Medical Record
+    ('Standard GP Medical Record', 'immunisation_history', 'vaccine', 'immunizations', 'vaccine_name', 'text', 'direct', NULL::jsonb, true, 10),
+    ('Standard GP Medical Record', 'immunisation_history', 'date', 'immunizations', 'administration_date', 'date', 'direct', NULL::jsonb, true, 11),
+    ('Standard GP Medical Record', 'immunisation_history', 'dose', 'immunizations', 'dose_number', 'number', 'split', '{"delimiter": "/", "index": 0}'::jsonb, false, 12),
+    ('Standard GP Medical Record', 'chronic_medication_list', 'medication_name', 'prescriptions', 'medication_name', 'text', 'direct', NULL::jsonb, true, 20),
+    ('Standard GP Medical Record', 'chronic_medication_list', 'dosage', 'prescriptions', 'dosage', 'text', 'direct', NULL::jsonb, false, 21),
+    -- Lab Report
+    ('Lab Report', 'laboratory_results', 'test_name', 'lab_results', 'test_name', 'text', 'direct', NULL::jsonb, true, 10),
+    ('Lab Report', 'laboratory_results', 'result_value', 'lab_results', 'result_value', 'text', 'direct', NULL::jsonb, true, 11),
+    ('Lab Report', 'laboratory_results', 'units', 'lab_results', 'units', 'text', 'direct', NULL::jsonb, false, 12),
+    ('Lab Report', 'laboratory_results', 'reference_range', 'lab_results', 'reference_range', 'text', 'direct', NULL::jsonb, false, 13),
+    -- Immunization Card
+    ('Immunization Card', 'vaccination_records', 'vaccine_type', 'immunizations', 'vaccine_name', 'text', 'direct', NULL::jsonb, true, 10),
+    ('Immunization Card', 'vaccination_records', 'administered', 'immunizations', 'administration_date', 'date', 'direct', NULL::jsonb, true, 11),
+    ('Immunization Card', 'vaccination_records', 'lot_number', 'immunizations', 'lot_number', 'text', 'direct', NULL::jsonb, false, 12)
+  ) AS m(template_name, source_section, source_field, target_table, target_field,
+         field_type, transformation_type, transformation_config, is_required,
+         processing_order)
+ USING (template_name);
+
+COMMIT;
@@ -0,0 +1,108 @@
+-- ============================================================================
+-- Migration 033 — Unique template names per workspace; upsert-based seeding
+-- ============================================================================
+--
+-- seed_default_templates.py used to run a SELECT first and skip the whole
+-- seed if the workspace had ANY template. That costs a round trip, and it
+-- is only "skip if anything exists", not real idempotency: a default
+-- template added later never reaches a workspace that was already seeded.
+--
+-- This adds a unique index on extraction_templates (workspace_id,
+-- template_name), which makes ON CONFLICT (workspace_id, template_name)
+-- DO NOTHING possible. seed_default_templates() is redefined to use it:
+--
+--   * templates whose name already exists in the workspace are skipped;
+--   * mappings are inserted only for the templates THIS call inserted
+--     (matched on the template ids the caller generated), so a template
+--     a practice has customised never gets default mappings added back.
+--
+-- Mappings therefore cannot conflict with existing rows (their
+-- template_id is always new), and no unique key on
+-- extraction_field_mappings is needed.
+--
+-- PREFLIGHT: CREATE UNIQUE INDEX fails if a workspace already has two
+-- templates with the same name. The DO block below reports the
+-- offending workspace/name pairs first so they can be renamed or removed.
+--
+-- Return shape unchanged from 030/031: skipped is true when nothing was
+-- inserted. Signature unchanged.
+-- ============================================================================
+
+BEGIN;
+
+DO $$
+DECLARE
+    v_dupes TEXT;
+BEGIN
+    SELECT string_agg(format('%s/%s (%s)', workspace_id, template_name, n), ', ')
+      INTO v_dupes
+      FROM (
+          SELECT workspace_id, template_name, count(*) AS n
+            FROM extraction_templates
+           GROUP BY workspace_id, template_name
+          HAVING count(*) > 1
+      ) d;
+
+    IF v_dupes IS NOT NULL THEN
+        RAISE EXCEPTION 'duplicate extraction template names, resolve before applying: %', v_dupes;
+    END IF;
+END;
+$$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_extraction_templates_workspace_name
+    ON extraction_templates (workspace_id, template_name);
+
+CREATE OR REPLACE FUNCTION seed_default_templates(
+    p_workspace_id  TEXT,
+    p_templates     JSONB,
+    p_mappings      JSONB
+) RETURNS JSONB
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_inserted   TEXT[];
+    v_templates  INT;
+    v_mappings   INT;
+BEGIN
+    WITH inserted AS (
+        INSERT INTO extraction_templates (
+            id, tenant_id, workspace_id, template_name, template_description,
+            document_type, is_active, is_default, auto_populate,
+            require_validation
+        )
+        SELECT id, tenant_id, workspace_id, template_name, template_description,
+               document_type, is_active, is_default, auto_populate,
+               require_validation
+          FROM jsonb_populate_recordset(NULL::extraction_templates, p_templates)
+         WHERE workspace_id = p_workspace_id
+        ON CONFLICT (workspace_id, template_name) DO NOTHING
+        RETURNING id
+    )
+    SELECT coalesce(array_agg(id), '{}') INTO v_inserted FROM inserted;
+    v_templates := cardinality(v_inserted);
+
+    INSERT INTO extraction_field_mappings (
+        id, template_id, workspace_id, source_section, source_field,
+        target_table, target_field, field_type, transformation_type,
+        transformation_config, is_required, processing_order
+    )
+    SELECT id, template_id, workspace_id, source_section, source_field,
+           target_table, target_field, field_type, transformation_type,
+           transformation_config, is_required, processing_order
+      FROM jsonb_populate_recordset(NULL::extraction_field_mappings, p_mappings)
+     WHERE template_id = ANY (v_inserted);
+    GET DIAGNOSTICS v_mappings = ROW_COUNT;
+
+    RETURN jsonb_build_object(
+        'skipped',   v_templates = 0,
+        'templates', v_templates,
+        'mappings',  v_mappings
+    );
+END;
+$$;
+
+COMMENT ON FUNCTION seed_default_templates(TEXT, JSONB, JSONB) IS
+    'Insert default extraction templates not already present in the '
+    'workspace (by name), plus the field mappings of the templates it '
+    'inserted, in one transaction.';
+
+COMMIT;
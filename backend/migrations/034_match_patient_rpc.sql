@@ -0,0 +1,98 @@
+-- ============================================================================
+-- Migration 034 — match_patient RPC + trigram indexes on patient names
+-- ============================================================================
+--
+-- POST /api/documents/match-patient tried up to three PostgREST queries
+-- in sequence (id_number, then name + dob, then fuzzy name), one round
+-- trip each. This function runs the same cascade server-side and returns
+-- the first tier that finds anything, so the route makes ONE call.
+--
+-- TIERS (same priority and semantics as the Python it replaces):
+--   1. id_number   — exact id_number                       -> first row
+--   2. name_dob    — first/last name ILIKE (no wildcards),
+--                    dob equal                              -> first row
+--   3. name_fuzzy  — first/last name containing the input
+--                    (ILIKE '%x%') OR trigram-similar to it
+--                    (pg_trgm `%`), best similarity first   -> all rows
+-- A NULL or empty argument skips the tiers that need it, as before.
+-- Tier 3 now also catches misspellings ("Jonh" ~ "John") that substring
+-- matching missed; those still come back as possible_matches for manual
+-- review, never as an automatic match.
+--
+-- INDEXES: the GIN trigram indexes serve both ILIKE '%x%' and `%` —
+-- neither can use a b-tree. patients.dob stays TEXT (setup_supabase.sql),
+-- so p_dob is TEXT too.
+--
+-- TENANT SCOPE: p_workspace_id is mandatory and every tier filters on it.
+--
+-- Returns TABLE(match_type text, patient jsonb); patient is the whole
+-- row (to_jsonb), exactly what select('*') returned to the route.
+-- ============================================================================
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_patients_first_name_trgm
+    ON patients USING gin (first_name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_patients_last_name_trgm
+    ON patients USING gin (last_name gin_trgm_ops);
+
+CREATE OR REPLACE FUNCTION match_patient(
+    p_workspace_id  TEXT,
+    p_id_number     TEXT,
+    p_first_name    TEXT,
+    p_last_name     TEXT,
+    p_dob           TEXT
+) RETURNS TABLE(match_type TEXT, patient JSONB)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF coalesce(p_id_number, '') <> '' THEN
+        RETURN QUERY
+            SELECT 'id_number', to_jsonb(p)
+              FROM patients p
+             WHERE p.workspace_id = p_workspace_id
+               AND p.id_number = p_id_number
+             LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    IF coalesce(p_first_name, '') = '' OR coalesce(p_last_name, '') = '' THEN
+        RETURN;
+    END IF;
+
+    IF coalesce(p_dob, '') <> '' THEN
+        RETURN QUERY
+            SELECT 'name_dob', to_jsonb(p)
+              FROM patients p
+             WHERE p.workspace_id = p_workspace_id
+               AND p.first_name ILIKE p_first_name
+               AND p.last_name ILIKE p_last_name
+               AND p.dob = p_dob
+             LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+        SELECT 'name_fuzzy', to_jsonb(p)
+          FROM patients p
+         WHERE p.workspace_id = p_workspace_id
+           AND (p.first_name ILIKE '%' || p_first_name || '%' OR p.first_name % p_first_name)
+           AND (p.last_name ILIKE '%' || p_last_name || '%' OR p.last_name % p_last_name)
+         ORDER BY similarity(p.first_name, p_first_name)
+                + similarity(p.last_name, p_last_name) DESC;
+END;
+$$;
+
+COMMENT ON FUNCTION match_patient(TEXT, TEXT, TEXT, TEXT, TEXT) IS
+    'Match a scanned document to a patient in one call: id_number, then '
+    'name + dob, then fuzzy (substring or trigram) name; first tier with '
+    'results wins.';
+
+NOTIFY pgrst, 'reload schema';
+
+COMMIT;
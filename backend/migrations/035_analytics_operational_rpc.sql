@@ -0,0 +1,82 @@
+-- ============================================================================
+-- Migration 035 — analytics_operational RPC
+-- ============================================================================
+--
+-- GET /api/analytics/operational fetched every patient created_at of the
+-- last 180 days and EVERY encounter_date of the workspace (twice, once
+-- for the 6-month window and once for peak hours), then bucketed them by
+-- YYYY-MM and hour in Python. This function does the grouping in
+-- Postgres and returns the buckets as one JSONB object, so the route
+-- makes ONE call and receives a few dozen numbers instead of thousands
+-- of rows.
+--
+-- RETURN SHAPE (same buckets as the Python it replaces):
+--   patient_monthly    [{month: 'YYYY-MM', count}]  patients, last 180 days
+--   encounter_monthly  [{month: 'YYYY-MM', count}]  encounters, last 180 days
+--   hour_distribution  [{hour: 0-23, count}]        ALL encounters
+--   total_patients_6m  int
+--   total_encounters   int                          ALL encounters
+-- Months and hours are taken in UTC, which is what slicing / parsing the
+-- PostgREST timestamps gave before.
+--
+-- INDEXES: (workspace_id, encounter_date) serves the encounter range
+-- scans; the single-column workspace / date indexes from
+-- setup_supabase.sql could only serve one predicate each. The patients
+-- scan uses 012's idx_patients_workspace_created (workspace_id,
+-- created_at DESC); a b-tree scans either direction.
+--
+-- TENANT SCOPE: p_workspace_id is mandatory; workspace_id is TEXT.
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_encounters_workspace_date
+    ON encounters (workspace_id, encounter_date);
+
+CREATE OR REPLACE FUNCTION analytics_operational(
+    p_workspace_id  TEXT
+) RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    WITH since AS (
+        SELECT now() - interval '180 days' AS ts
+    ),
+    patient_monthly AS (
+        SELECT to_char(p.created_at AT TIME ZONE 'UTC', 'YYYY-MM') AS month,
+               count(*) AS n
+          FROM patients p, since
+         WHERE p.workspace_id = p_workspace_id
+           AND p.created_at >= since.ts
+         GROUP BY 1
+    ),
+    encounter_monthly AS (
+        SELECT to_char(e.encounter_date AT TIME ZONE 'UTC', 'YYYY-MM') AS month,
+               count(*) AS n
+          FROM encounters e, since
+         WHERE e.workspace_id = p_workspace_id
+           AND e.encounter_date >= since.ts
+         GROUP BY 1
+    ),
+    hours AS (
+        SELECT extract(hour FROM e.encounter_date AT TIME ZONE 'UTC')::int AS hour,
+               count(*) AS n
+          FROM encounters e
+         WHERE e.workspace_id = p_workspace_id
+           AND e.encounter_date IS NOT NULL
+         GROUP BY 1
+    )
+    SELECT jsonb_build_object(
+        'patient_monthly',   coalesce((SELECT jsonb_agg(jsonb_build_object('month', month, 'count', n) ORDER BY month) FROM patient_monthly), '[]'),
+        'encounter_monthly', coalesce((SELECT jsonb_agg(jsonb_build_object('month', month, 'count', n) ORDER BY month) FROM encounter_monthly), '[]'),
+        'hour_distribution', coalesce((SELECT jsonb_agg(jsonb_build_object('hour', hour, 'count', n) ORDER BY hour) FROM hours), '[]'),
+        'total_patients_6m', coalesce((SELECT sum(n) FROM patient_monthly), 0),
+        'total_encounters',  (SELECT count(*) FROM encounters e WHERE e.workspace_id = p_workspace_id)
+    );
+$$;
+
+COMMENT ON FUNCTION analytics_operational(TEXT) IS
+    'Operational dashboard buckets for a workspace: patients and encounters '
+    'per month over the last 180 days, encounters per hour of day, totals.';
+
+NOTIFY pgrst, 'reload schema';
+
+COMMIT;
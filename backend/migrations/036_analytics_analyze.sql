@@ -0,0 +1,23 @@
+-- ============================================================================
+-- Migration 036 — Analytics tables: refresh planner statistics
+-- ============================================================================
+--
+-- The analytics queries filter on workspace_id and range-scan or order by
+-- a timestamp. The composite indexes they need all exist now:
+--
+--   patients    (workspace_id, created_at DESC)  idx_patients_workspace_created  (012)
+--   encounters  (workspace_id, encounter_date)   idx_encounters_workspace_date   (035)
+--   gp_invoices (workspace_id, created_at DESC)  idx_gp_invoices_workspace       (012,
+--                                                partial: workspace_id NOT NULL,
+--                                                which every .eq('workspace_id')
+--                                                query implies)
+--   dispense_events (encounter_id)               idx_dispense_encounter  (setup_supabase.sql)
+--
+-- ANALYZE so the planner has current row estimates for the tables the
+-- new RPCs and indexes serve.
+-- ============================================================================
+
+ANALYZE patients;
+ANALYZE encounters;
+ANALYZE gp_invoices;
+ANALYZE dispense_events;
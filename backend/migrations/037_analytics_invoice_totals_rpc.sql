@@ -0,0 +1,44 @@
+-- ============================================================================
+-- Migration 037 — analytics_invoice_totals RPC
+-- ============================================================================
+--
+-- GET /api/analytics/summary downloaded total_amount for every invoice in
+-- the workspace to sum them in Python and len() them. This function
+-- returns the count and the sum as one JSONB value, so the
+-- route receives two numbers whatever the invoice volume.
+--
+-- WHY NOT A COUNTER: a running total maintained on invoice writes needs
+-- a write path to hook. Nothing in the backend writes gp_invoices (the
+-- server.py billing routes are commented out; app/api/billing writes the
+-- `invoices` table), and a trigger-maintained counter would be another
+-- table to keep consistent with manual corrections. The sum runs on
+-- idx_gp_invoices_workspace (012), and the summary response is cached
+-- in-process on top of it.
+--
+-- RETURN SHAPE:
+--   total_invoices  int
+--   total_revenue   numeric
+--
+-- TENANT SCOPE: p_workspace_id is mandatory; workspace_id is TEXT.
+-- ============================================================================
+
+BEGIN;
+
+CREATE OR REPLACE FUNCTION analytics_invoice_totals(
+    p_workspace_id  TEXT
+) RETURNS JSONB
+LANGUAGE sql STABLE AS $$
+    SELECT jsonb_build_object(
+        'total_invoices', count(*),
+        'total_revenue',  coalesce(sum(total_amount), 0)
+    )
+      FROM gp_invoices
+     WHERE workspace_id = p_workspace_id;
+$$;
+
+COMMENT ON FUNCTION analytics_invoice_totals(TEXT) IS
+    'Invoice count and total revenue for a workspace.';
+
+NOTIFY pgrst, 'reload schema';
+
+COMMIT;
@@ -0,0 +1,23 @@
+-- ============================================================================
+-- Migration 038 — Keyset index for the invoice list
+-- ============================================================================
+--
+-- GET /api/invoices lists a workspace's invoices newest first. With only
+-- the single-column indexes from database/billing_migration.sql
+-- (workspace_id; invoice_date) Postgres has to collect the workspace's
+-- rows and sort them for every page, and offset paging walks every
+-- skipped row on top of that.
+--
+-- The route now orders by (invoice_date DESC, id DESC) — invoice_date is
+-- a DATE, so id breaks ties — and pages with a `before` cursor
+-- (invoice_date < d OR (invoice_date = d AND id < i)). This index matches
+-- that order exactly, so each page is an index seek plus a `limit`-row
+-- read, independent of how many invoices the workspace has.
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_invoices_workspace_date_id
+    ON invoices (workspace_id, invoice_date DESC, id DESC);
+
+COMMIT;
@@ -0,0 +1,79 @@
+-- ============================================================================
+-- Migration 039 — match_patient: compare id_numbers in canonical form
+-- ============================================================================
+--
+-- The API now stores id_number stripped and upper-cased (PatientCreate and
+-- the create-from-document routes), and match-patient sends its lookup
+-- value in that form. Rows written before that are stored as captured, so
+-- 034's plain `p.id_number = p_id_number` tier would miss e.g. a stored
+-- ' 8001015009087' or a lower-case passport number it used to find.
+--
+-- Tier 1 now compares upper(btrim(...)) on both sides, so old and new rows
+-- match alike without rewriting the stored values. The expression index
+-- serves that comparison; idx_patients_id_number (setup_supabase.sql)
+-- can't. The other tiers are unchanged from 034.
+-- ============================================================================
+
+BEGIN;
+
+CREATE INDEX IF NOT EXISTS idx_patients_workspace_id_number_norm
+    ON patients (workspace_id, upper(btrim(id_number)));
+
+CREATE OR REPLACE FUNCTION match_patient(
+    p_workspace_id  TEXT,
+    p_id_number     TEXT,
+    p_first_name    TEXT,
+    p_last_name     TEXT,
+    p_dob           TEXT
+) RETURNS TABLE(match_type TEXT, patient JSONB)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+    IF coalesce(p_id_number, '') <> '' THEN
+        RETURN QUERY
+            SELECT 'id_number', to_jsonb(p)
+              FROM patients p
+             WHERE p.workspace_id = p_workspace_id
+               AND upper(btrim(p.id_number)) = upper(btrim(p_id_number))
+             LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    IF coalesce(p_first_name, '') = '' OR coalesce(p_last_name, '') = '' THEN
+        RETURN;
+    END IF;
+
+    IF coalesce(p_dob, '') <> '' THEN
+        RETURN QUERY
+            SELECT 'name_dob', to_jsonb(p)
+              FROM patients p
+             WHERE p.workspace_id = p_workspace_id
+               AND p.first_name ILIKE p_first_name
+               AND p.last_name ILIKE p_last_name
+               AND p.dob = p_dob
+             LIMIT 1;
+        IF FOUND THEN
+            RETURN;
+        END IF;
+    END IF;
+
+    RETURN QUERY
+        SELECT 'name_fuzzy', to_jsonb(p)
+          FROM patients p
+         WHERE p.workspace_id = p_workspace_id
+           AND (p.first_name ILIKE '%' || p_first_name || '%' OR p.first_name % p_first_name)
+           AND (p.last_name ILIKE '%' || p_last_name || '%' OR p.last_name % p_last_name)
+         ORDER BY similarity(p.first_name, p_first_name)
+                + similarity(p.last_name, p_last_name) DESC;
+END;
+$$;
+
+COMMENT ON FUNCTION match_patient(TEXT, TEXT, TEXT, TEXT, TEXT) IS
+    'Match a scanned document to a patient in one call: id_number, then '
+    'name + dob, then fuzzy (substring or trigram) name; first tier with '
+    'results wins.';
+
+NOTIFY pgrst, 'reload schema';
+
+COMMIT;
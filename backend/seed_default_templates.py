@@ -1,22 +1,107 @@
 """
 Seed Default Extraction Templates
 Creates pre-configured templates for common medical document types
+
+For the demo workspace the same seed can run entirely server-side with
+migrations/032_seed_default_templates_demo.sql (psql / supabase CLI).
 """
 
 import os
 import sys
+import json
 import uuid
-from datetime import datetime, timezone
-from supabase import create_client
+import importlib.util
+from pathlib import Path
 
 # Supabase credentials
 SUPABASE_URL = os.environ.get('SUPABASE_URL')
 SUPABASE_SERVICE_KEY = os.environ.get('SUPABASE_SERVICE_KEY')
+# Optional direct Postgres connection for the COPY fast path
+DATABASE_URL = os.environ.get('DATABASE_URL')
 
 # Demo workspace
 DEMO_TENANT_ID = 'demo-tenant-001'
 DEMO_WORKSPACE_ID = 'demo-gp-workspace-001'
 
+# Default templates and their field mappings. Static data lives in
+# default_templates.json so the frontend and migrations can share it;
+# mappings list only what differs from mapping_defaults. ids and
+# tenant/workspace are filled in at seed time; timestamps come from the
+# column defaults
+_DEFAULTS = json.loads(Path(__file__).with_name('default_templates.json').read_text(encoding='utf-8'))
+DEFAULT_TEMPLATES = _DEFAULTS['templates']
+MAPPING_DEFAULTS = _DEFAULTS['mapping_defaults']
+
+TEMPLATE_COLUMNS = (
+    'id', 'tenant_id', 'workspace_id', 'template_name', 'template_description',
+    'document_type', 'is_active', 'is_default', 'auto_populate',
+    'require_validation',
+)
+MAPPING_COLUMNS = (
+    'id', 'template_id', 'workspace_id', 'source_section', 'source_field',
+    'target_table', 'target_field', 'field_type', 'transformation_type',
+    'transformation_config', 'is_required', 'processing_order',
+)
+
+
+_client = None
+
+
+def get_client():
+    """Shared Supabase client backed by a pooled HTTP/2 keep-alive session"""
+    global _client
+    if _client is None:
+        # Deferred: supabase pulls in httpx, postgrest, gotrue, storage3 and
+        # realtime, which is wasted import time when the env check fails
+        import httpx
+        from supabase import create_client, ClientOptions
+        
+        http_client = httpx.Client(
+            http2=True,
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=30.0
+        )
+        _client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY, options=ClientOptions(httpx_client=http_client))
+    return _client
+
+
+def _copy_rows(cur, table, columns, rows):
+    from psycopg.types.json import Jsonb
+    
+    with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+        for row in rows:
+            copy.write_row([
+                Jsonb(row[c]) if c == 'transformation_config' and row.get(c) is not None
+                else row.get(c)
+                for c in columns
+            ])
+
+
+def seed_via_copy(all_templates, all_mappings):
+    """
+    COPY the rows straight into Postgres in one transaction, skipping
+    PostgREST's per-row JSON handling. COPY can't skip conflicts, so
+    templates are staged in a temp table and moved across with ON CONFLICT
+    (migration 033); only the new templates' mappings are copied.
+    Returns (templates inserted, mappings inserted).
+    """
+    import psycopg
+    
+    columns = ', '.join(TEMPLATE_COLUMNS)
+    with psycopg.connect(DATABASE_URL) as conn, conn.cursor() as cur:
+        cur.execute("CREATE TEMP TABLE seed_templates (LIKE extraction_templates INCLUDING DEFAULTS) ON COMMIT DROP")
+        _copy_rows(cur, 'seed_templates', TEMPLATE_COLUMNS, all_templates)
+        cur.execute(
+            f"INSERT INTO extraction_templates ({columns}) SELECT {columns} FROM seed_templates "
+            "ON CONFLICT (workspace_id, template_name) DO NOTHING RETURNING id"
+        )
+        inserted = {row[0] for row in cur.fetchall()}
+        
+        new_mappings = [m for m in all_mappings if str(m['template_id']) in inserted]
+        _copy_rows(cur, 'extraction_field_mappings', MAPPING_COLUMNS, new_mappings)
+    return len(inserted), len(new_mappings)
+
+
 def main():
     if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
         print("❌ Error: SUPABASE_URL and SUPABASE_SERVICE_KEY must be set")
@@ -25,313 +110,96 @@ def main():
     print("🌱 Seeding default extraction templates...")
     print(f"📍 Workspace: {DEMO_WORKSPACE_ID}")
     
-    supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
-    
-    # Check if templates already exist
-    existing = supabase.table('extraction_templates')\
-        .select('*')\
-        .eq('workspace_id', DEMO_WORKSPACE_ID)\
-        .execute()
-    
-    if existing.data:
-        print(f"ℹ️  Found {len(existing.data)} existing templates. Skipping seed.")
-        print("   Delete existing templates if you want to re-seed.")
-        return
-    
-    templates_created = 0
-    mappings_created = 0
+    from postgrest.exceptions import APIError
     
-    # ===========================================
-    # TEMPLATE 1: Standard GP Medical Record
-    # ===========================================
+    supabase = get_client()
     
-    print("\n📄 Creating: Standard GP Medical Record Template...")
+    use_copy = bool(DATABASE_URL) and importlib.util.find_spec('psycopg') is not None
+    if DATABASE_URL and not use_copy:
+        print("⚠️  DATABASE_URL set but psycopg not installed (pip install 'psycopg[binary]'), using the RPC")
     
-    template_1_id = str(uuid.uuid4())
-    template_1 = {
-        'id': template_1_id,
-        'tenant_id': DEMO_TENANT_ID,
-        'workspace_id': DEMO_WORKSPACE_ID,
-        'template_name': 'Standard GP Medical Record',
-        'template_description': 'Standard medical records from GP practices with immunization history, chronic medications, and vital signs',
-        'document_type': 'medical_record',
-        'is_active': True,
-        'is_default': True,  # This is the default template
-        'auto_populate': True,
-        'require_validation': True,
-        'created_at': datetime.now(timezone.utc).isoformat(),
-        'updated_at': datetime.now(timezone.utc).isoformat()
-    }
+    # psycopg adapts uuid.UUID natively; PostgREST's JSON body needs strings
+    new_id = uuid.uuid4 if use_copy else lambda: str(uuid.uuid4())
     
-    supabase.table('extraction_templates').insert(template_1).execute()
-    templates_created += 1
-    print(f"   ✅ Template created: {template_1_id}")
+    for spec in DEFAULT_TEMPLATES:
+        print(f"\n{spec['icon']} Creating: {spec['template_name']} Template...")
     
-    # Mappings for Template 1: Immunizations
-    immunization_mappings = [
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_1_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'immunisation_history',
-            'source_field': 'vaccine',
-            'target_table': 'immunizations',
-            'target_field': 'vaccine_name',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 10,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_1_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'immunisation_history',
-            'source_field': 'date',
-            'target_table': 'immunizations',
-            'target_field': 'administration_date',
-            'field_type': 'date',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 11,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
+    template_ids = [new_id() for _ in DEFAULT_TEMPLATES]
+    all_templates = [
         {
-            'id': str(uuid.uuid4()),
-            'template_id': template_1_id,
+            'id': template_id,
+            'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'immunisation_history',
-            'source_field': 'dose',
-            'target_table': 'immunizations',
-            'target_field': 'dose_number',
-            'field_type': 'number',
-            'transformation_type': 'split',
-            'transformation_config': {'delimiter': '/', 'index': 0},
-            'is_required': False,
-            'processing_order': 12,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
+            'template_name': spec['template_name'],
+            'template_description': spec['template_description'],
+            'document_type': spec['document_type'],
+            'is_active': True,
+            'is_default': spec['is_default'],
+            'auto_populate': True,
+            'require_validation': True
+        }
+        for spec, template_id in zip(DEFAULT_TEMPLATES, template_ids)
     ]
     
-    # Mappings for chronic medications
-    medication_mappings = [
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_1_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'chronic_medication_list',
-            'source_field': 'medication_name',
-            'target_table': 'prescriptions',
-            'target_field': 'medication_name',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 20,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_1_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'chronic_medication_list',
-            'source_field': 'dosage',
-            'target_table': 'prescriptions',
-            'target_field': 'dosage',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': False,
-            'processing_order': 21,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
+    # Fields shared by every mapping of a template
+    bases = [
+        {**MAPPING_DEFAULTS, 'template_id': template_id, 'workspace_id': DEMO_WORKSPACE_ID}
+        for template_id in template_ids
     ]
-    
-    all_mappings = immunization_mappings + medication_mappings
-    
-    if all_mappings:
-        supabase.table('extraction_field_mappings').insert(all_mappings).execute()
-        mappings_created += len(all_mappings)
-        print(f"   ✅ Created {len(all_mappings)} field mappings")
-    
-    # ===========================================
-    # TEMPLATE 2: Lab Report
-    # ===========================================
-    
-    print("\n🧪 Creating: Lab Report Template...")
-    
-    template_2_id = str(uuid.uuid4())
-    template_2 = {
-        'id': template_2_id,
-        'tenant_id': DEMO_TENANT_ID,
-        'workspace_id': DEMO_WORKSPACE_ID,
-        'template_name': 'Lab Report',
-        'template_description': 'Laboratory test results from PathCare, Lancet, Ampath, etc.',
-        'document_type': 'lab_report',
-        'is_active': True,
-        'is_default': False,
-        'auto_populate': True,
-        'require_validation': True,
-        'created_at': datetime.now(timezone.utc).isoformat(),
-        'updated_at': datetime.now(timezone.utc).isoformat()
-    }
-    
-    supabase.table('extraction_templates').insert(template_2).execute()
-    templates_created += 1
-    print(f"   ✅ Template created: {template_2_id}")
-    
-    # Mappings for Lab Results
-    lab_mappings = [
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_2_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'laboratory_results',
-            'source_field': 'test_name',
-            'target_table': 'lab_results',
-            'target_field': 'test_name',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 10,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_2_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'laboratory_results',
-            'source_field': 'result_value',
-            'target_table': 'lab_results',
-            'target_field': 'result_value',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 11,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_2_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'laboratory_results',
-            'source_field': 'units',
-            'target_table': 'lab_results',
-            'target_field': 'units',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': False,
-            'processing_order': 12,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_2_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'laboratory_results',
-            'source_field': 'reference_range',
-            'target_table': 'lab_results',
-            'target_field': 'reference_range',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': False,
-            'processing_order': 13,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
+    all_mappings = [
+        {**base, **mapping, 'id': new_id()}
+        for spec, base in zip(DEFAULT_TEMPLATES, bases)
+        for mapping in spec['mappings']
     ]
     
-    if lab_mappings:
-        supabase.table('extraction_field_mappings').insert(lab_mappings).execute()
-        mappings_created += len(lab_mappings)
-        print(f"   ✅ Created {len(lab_mappings)} field mappings")
-    
     # ===========================================
-    # TEMPLATE 3: Immunization Card
+    # INSERT - one transaction via COPY or RPC (migrations 030-033).
+    # Templates already in the workspace (by name) are skipped, and so
+    # are their mappings
     # ===========================================
     
-    print("\n💉 Creating: Immunization Card Template...")
-    
-    template_3_id = str(uuid.uuid4())
-    template_3 = {
-        'id': template_3_id,
-        'tenant_id': DEMO_TENANT_ID,
-        'workspace_id': DEMO_WORKSPACE_ID,
-        'template_name': 'Immunization Card',
-        'template_description': 'Vaccination cards and immunization records',
-        'document_type': 'immunization_card',
-        'is_active': True,
-        'is_default': False,
-        'auto_populate': True,
-        'require_validation': True,
-        'created_at': datetime.now(timezone.utc).isoformat(),
-        'updated_at': datetime.now(timezone.utc).isoformat()
-    }
-    
-    supabase.table('extraction_templates').insert(template_3).execute()
-    templates_created += 1
-    print(f"   ✅ Template created: {template_3_id}")
-    
-    # Similar mappings to Template 1 but more focused on immunizations
-    immunization_card_mappings = [
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_3_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'vaccination_records',
-            'source_field': 'vaccine_type',
-            'target_table': 'immunizations',
-            'target_field': 'vaccine_name',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 10,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_3_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'vaccination_records',
-            'source_field': 'administered',
-            'target_table': 'immunizations',
-            'target_field': 'administration_date',
-            'field_type': 'date',
-            'transformation_type': 'direct',
-            'is_required': True,
-            'processing_order': 11,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-        {
-            'id': str(uuid.uuid4()),
-            'template_id': template_3_id,
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'source_section': 'vaccination_records',
-            'source_field': 'lot_number',
-            'target_table': 'immunizations',
-            'target_field': 'lot_number',
-            'field_type': 'text',
-            'transformation_type': 'direct',
-            'is_required': False,
-            'processing_order': 12,
-            'created_at': datetime.now(timezone.utc).isoformat()
-        },
-    ]
-    
-    if immunization_card_mappings:
-        supabase.table('extraction_field_mappings').insert(immunization_card_mappings).execute()
-        mappings_created += len(immunization_card_mappings)
-        print(f"   ✅ Created {len(immunization_card_mappings)} field mappings")
+    print("\n💾 Inserting templates and field mappings...")
+    if use_copy:
+        created_templates, created_mappings = seed_via_copy(all_templates, all_mappings)
+        print("   ✅ Copied over a direct Postgres connection")
+    else:
+        try:
+            result = supabase.rpc('seed_default_templates', {
+                'p_workspace_id': DEMO_WORKSPACE_ID,
+                'p_templates': all_templates,
+                'p_mappings': all_mappings
+            }).execute()
+            created_templates, created_mappings = result.data['templates'], result.data['mappings']
+        except APIError as e:
+            if e.code != 'PGRST202':
+                raise
+            # Migration 030 not applied - fall back to one request per table.
+            # Templates go first so the mappings' template_id foreign keys resolve
+            print("   ⚠️  seed_default_templates RPC not found, inserting without a transaction")
+            inserted = supabase.table('extraction_templates')\
+                .upsert(all_templates, on_conflict='workspace_id,template_name', ignore_duplicates=True)\
+                .execute()
+            inserted_ids = {row['id'] for row in inserted.data}
+            new_mappings = [m for m in all_mappings if m['template_id'] in inserted_ids]
+            if new_mappings:
+                # Nothing reads the inserted mappings back, so skip the response body
+                supabase.table('extraction_field_mappings').insert(new_mappings, returning='minimal').execute()
+            created_templates, created_mappings = len(inserted_ids), len(new_mappings)
+    
+    if not created_templates:
+        print(f"ℹ️  All {len(all_templates)} default templates already exist. Nothing to seed.")
+        return
     
     # ===========================================
     # SUMMARY
     # ===========================================
     
     print(f"\n✅ Seed complete!")
-    print(f"📊 Created {templates_created} templates")
-    print(f"📊 Created {mappings_created} field mappings")
+    print(f"📊 Created {created_templates} templates")
+    print(f"📊 Created {created_mappings} field mappings")
     print(f"\n🎯 Templates available:")
-    print(f"   1. Standard GP Medical Record (DEFAULT)")
-    print(f"   2. Lab Report")
-    print(f"   3. Immunization Card")
+    for i, spec in enumerate(DEFAULT_TEMPLATES, 1):
+        print(f"   {i}. {spec['template_name']}{' (DEFAULT)' if spec['is_default'] else ''}")
     print(f"\n💡 These templates are now ready to use with template-driven extraction!")
 
 if __name__ == '__main__':
@@ -1,20 +1,28 @@
-from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Query, Depends
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, APIRouter, HTTPException, UploadFile, File, Form, Query, Depends, BackgroundTasks
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import AsyncMongoClient, ASCENDING, DESCENDING, DeleteMany, ReturnDocument, UpdateOne
+from gridfs import AsyncGridFSBucket
+from bson import ObjectId
+from cachetools import TTLCache
 import os
+import asyncio
+import functools
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, field_validator
+from typing import List, Optional, Dict, Any, BinaryIO
 import uuid
+from collections import Counter
 from datetime import datetime, timezone, date, timedelta
-from supabase import create_client, Client
-import json
+from supabase import create_client, Client, AsyncClient
+import orjson
 import base64
-from decimal import Decimal
+from urllib.parse import quote
 import httpx  # For calling the microservice
+from app.core.supabase_client import init_async_supabase, close_async_supabase
+from app.core.threadpool import configure_threadpool
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -28,8 +36,10 @@ from app.api.auth import require_capability
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-mongo_client = AsyncIOMotorClient(mongo_url)
+mongo_client = AsyncMongoClient(mongo_url)
 db = mongo_client[os.environ['DB_NAME']]
+# Original uploaded files; scanned_documents keeps only the gridfs_id
+documents_fs = AsyncGridFSBucket(db, bucket_name='document_files')
 
 # Supabase connection
 supabase_url = os.environ['SUPABASE_URL']
@@ -44,21 +54,31 @@ DEMO_WORKSPACE_ID = os.environ.get('DEMO_WORKSPACE_ID', 'demo-gp-workspace-001')
 MICROSERVICE_URL = os.environ.get('MICROSERVICE_URL', 'http://localhost:5001')
 
 # Create the main app
-app = FastAPI(title="SurgiScan API")
+app = FastAPI(title="SurgiScan API", default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # ==================== Models ====================
 
+def normalize_id_number(id_number: str) -> str:
+    """Canonical id_number: stripped and upper-cased, as every insert path stores it"""
+    return id_number.strip().upper()
+
 class PatientCreate(BaseModel):
     first_name: str
     last_name: str
-    dob: str  # YYYY-MM-DD
+    dob: date  # parsed once here; model_dump(mode='json') emits YYYY-MM-DD
     id_number: str
     contact_number: Optional[str] = None
     email: Optional[str] = None
     address: Optional[str] = None
     medical_aid: Optional[str] = None
 
+    @field_validator('id_number')
+    @classmethod
+    def normalize_id_number(cls, v: str) -> str:
+        """Canonical form, so lookups can compare id_number with plain equality"""
+        return normalize_id_number(v)
+
 class PatientResponse(BaseModel):
     id: str
     tenant_id: str
@@ -322,31 +342,29 @@ class DocumentListFilters(BaseModel):
 
 async def init_demo_tenant():
     """Initialize demo tenant and workspace in Supabase if not exists"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
-        # Check if tenant exists
-        tenant_result = supabase.table('tenants').select('*').eq('id', DEMO_TENANT_ID).execute()
-        
-        if not tenant_result.data:
-            # Create tenant
-            supabase.table('tenants').insert({
-                'id': DEMO_TENANT_ID,
-                'name': 'Demo GP Practice',
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }).execute()
+        # Upsert with ignore_duplicates is ON CONFLICT DO NOTHING: one round
+        # trip per table whatever the state, no select-then-insert race
+        # between workers starting together. Only a newly inserted row comes
+        # back. Sequential, not gathered: workspaces.tenant_id references
+        # the tenant, which must exist first on a fresh database.
+        tenant_result = await asupabase.table('tenants').upsert({
+            'id': DEMO_TENANT_ID,
+            'name': 'Demo GP Practice',
+            'created_at': now
+        }, on_conflict='id', ignore_duplicates=True).execute()
+        if tenant_result.data:
             logger.info(f"Created demo tenant: {DEMO_TENANT_ID}")
         
-        # Check if workspace exists
-        workspace_result = supabase.table('workspaces').select('*').eq('id', DEMO_WORKSPACE_ID).execute()
-        
-        if not workspace_result.data:
-            # Create workspace
-            supabase.table('workspaces').insert({
-                'id': DEMO_WORKSPACE_ID,
-                'tenant_id': DEMO_TENANT_ID,
-                'name': 'Main GP Practice',
-                'type': 'gp',
-                'created_at': datetime.now(timezone.utc).isoformat()
-            }).execute()
+        workspace_result = await asupabase.table('workspaces').upsert({
+            'id': DEMO_WORKSPACE_ID,
+            'tenant_id': DEMO_TENANT_ID,
+            'name': 'Main GP Practice',
+            'type': 'gp',
+            'created_at': now
+        }, on_conflict='id', ignore_duplicates=True).execute()
+        if workspace_result.data:
             logger.info(f"Created demo workspace: {DEMO_WORKSPACE_ID}")
     except Exception as e:
         logger.error(f"Error initializing demo tenant: {e}")
@@ -382,11 +400,11 @@ async def find_patient_matches(demographics: Dict[str, Any]) -> List[Dict[str, A
     # Strategy 1: Exact ID number match (95%+ confidence)
     if id_number:
         try:
-            result = supabase.table('patients').select('*').eq('id_number', id_number).eq('workspace_id', DEMO_WORKSPACE_ID).execute()
+            result = await asupabase.table('patients').select('*').eq('id_number', id_number).eq('workspace_id', DEMO_WORKSPACE_ID).execute()
             if result.data:
                 for patient in result.data:
                     # Get last encounter for this patient
-                    encounter_result = supabase.table('encounters').select('encounter_date').eq('patient_id', patient['id']).order('encounter_date', desc=True).limit(1).execute()
+                    encounter_result = await asupabase.table('encounters').select('encounter_date').eq('patient_id', patient['id']).order('encounter_date', desc=True).limit(1).execute()
                     last_visit = encounter_result.data[0]['encounter_date'] if encounter_result.data else None
                     
                     matches.append({
@@ -407,7 +425,7 @@ async def find_patient_matches(demographics: Dict[str, Any]) -> List[Dict[str, A
     if (first_name or last_name) and dob and not matches:
         try:
             # Get all patients for fuzzy matching
-            result = supabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
+            result = await asupabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
             
             if result.data:
                 for patient in result.data:
@@ -424,7 +442,7 @@ async def find_patient_matches(demographics: Dict[str, Any]) -> List[Dict[str, A
                         confidence = 0.7 + (avg_name_similarity * 0.2)  # 0.7 to 0.9
                         
                         # Get last encounter
-                        encounter_result = supabase.table('encounters').select('encounter_date').eq('patient_id', patient['id']).order('encounter_date', desc=True).limit(1).execute()
+                        encounter_result = await asupabase.table('encounters').select('encounter_date').eq('patient_id', patient['id']).order('encounter_date', desc=True).limit(1).execute()
                         last_visit = encounter_result.data[0]['encounter_date'] if encounter_result.data else None
                         
                         matches.append({
@@ -476,7 +494,7 @@ async def populate_allergies_from_document(patient_id: str, parsed_data: Dict[st
                 severity = 'moderate'
             
             # Check if allergy already exists
-            existing = supabase.table('allergies')\
+            existing = await asupabase.table('allergies')\
                 .select('*')\
                 .eq('patient_id', patient_id)\
                 .ilike('allergen', f'%{allergen}%')\
@@ -494,7 +512,7 @@ async def populate_allergies_from_document(patient_id: str, parsed_data: Dict[st
                     'notes': 'Auto-imported from digitized document',
                     'created_at': datetime.now(timezone.utc).isoformat()
                 }
-                supabase.table('allergies').insert(allergy_data).execute()
+                await asupabase.table('allergies').insert(allergy_data).execute()
                 logger.info(f"Created allergy: {allergen} for patient {patient_id}")
     
     except Exception as e:
@@ -535,83 +553,81 @@ async def populate_diagnoses_from_document(patient_id: str, encounter_id: str, p
                 })
         
         # Process each diagnosis with AI ICD-10 matching
-        import httpx
-        for diagnosis_item in diagnoses_to_process:
-            diagnosis_text = diagnosis_item['text']
+        # One client (one keep-alive connection) for every lookup in the loop
+        async with httpx.AsyncClient(base_url="http://localhost:8001", timeout=10.0) as icd10_client:
+            for diagnosis_item in diagnoses_to_process:
+                diagnosis_text = diagnosis_item['text']
             
-            # Skip if empty or already exists
-            if not diagnosis_text or len(diagnosis_text) < 3:
-                continue
+                # Skip if empty or already exists
+                if not diagnosis_text or len(diagnosis_text) < 3:
+                    continue
             
-            # Check if diagnosis already exists
-            existing = supabase.table('diagnoses')\
-                .select('*')\
-                .eq('patient_id', patient_id)\
-                .ilike('diagnosis_description', f'%{diagnosis_text}%')\
-                .eq('status', 'active')\
-                .execute()
+                # Check if diagnosis already exists
+                existing = await asupabase.table('diagnoses')\
+                    .select('*')\
+                    .eq('patient_id', patient_id)\
+                    .ilike('diagnosis_description', f'%{diagnosis_text}%')\
+                    .eq('status', 'active')\
+                    .execute()
             
-            if existing.data:
-                continue
+                if existing.data:
+                    continue
             
-            # Use AI to suggest ICD-10 code
-            icd10_code = None
-            try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.get(
-                        f"http://localhost:8001/api/icd10/suggest",
-                        params={'diagnosis_text': diagnosis_text, 'max_suggestions': 1},
-                        timeout=10.0
+                # Use AI to suggest ICD-10 code
+                icd10_code = None
+                try:
+                    response = await icd10_client.get(
+                        "/api/icd10/suggest",
+                        params={'diagnosis_text': diagnosis_text, 'max_suggestions': 1}
                     )
                     if response.status_code == 200:
                         data = response.json()
                         if data.get('suggestions') and len(data['suggestions']) > 0:
                             icd10_code = data['suggestions'][0]['code']
                             logger.info(f"AI matched '{diagnosis_text}' to ICD-10 code: {icd10_code}")
-            except Exception as e:
-                logger.warning(f"ICD-10 AI matching failed for '{diagnosis_text}': {e}")
+                except Exception as e:
+                    logger.warning(f"ICD-10 AI matching failed for '{diagnosis_text}': {e}")
             
-            # If AI matching failed, try simple keyword search
-            if not icd10_code:
-                try:
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(
-                            f"http://localhost:8001/api/icd10/search",
-                            params={'query': diagnosis_text, 'limit': 1},
-                            timeout=10.0
+                # If AI matching failed, try simple keyword search
+                if not icd10_code:
+                    try:
+                        response = await icd10_client.get(
+                            "/api/icd10/search",
+                            params={'query': diagnosis_text, 'limit': 1}
                         )
                         if response.status_code == 200:
                             data = response.json()
                             if len(data) > 0:
                                 icd10_code = data[0]['code']
                                 logger.info(f"Keyword matched '{diagnosis_text}' to ICD-10 code: {icd10_code}")
-                except Exception as e:
-                    logger.warning(f"ICD-10 keyword search failed for '{diagnosis_text}': {e}")
+                    except Exception as e:
+                        logger.warning(f"ICD-10 keyword search failed for '{diagnosis_text}': {e}")
             
-            # Create diagnosis record (even without ICD-10 code)
-            if icd10_code or diagnosis_text:
-                diagnosis_data = {
-                    'id': str(uuid.uuid4()),
-                    'patient_id': patient_id,
-                    'encounter_id': encounter_id,
-                    'icd10_code': icd10_code or 'UNMAPPED',
-                    'diagnosis_description': diagnosis_text,
-                    'diagnosis_type': diagnosis_item['type'],
-                    'status': 'active',
-                    'notes': 'Auto-imported from digitized document' + ('' if icd10_code else ' - ICD-10 code needs manual assignment'),
-                    'created_at': datetime.now(timezone.utc).isoformat()
-                }
+                # Create diagnosis record (even without ICD-10 code)
+                if icd10_code or diagnosis_text:
+                    diagnosis_data = {
+                        'id': str(uuid.uuid4()),
+                        'patient_id': patient_id,
+                        'encounter_id': encounter_id,
+                        'icd10_code': icd10_code or 'UNMAPPED',
+                        'diagnosis_description': diagnosis_text,
+                        'diagnosis_type': diagnosis_item['type'],
+                        'status': 'active',
+                        'notes': 'Auto-imported from digitized document' + ('' if icd10_code else ' - ICD-10 code needs manual assignment'),
+                        'created_at': datetime.now(timezone.utc).isoformat()
+                    }
                 
-                # Only insert if we have a valid ICD-10 code or the description is substantial
-                if icd10_code and icd10_code != 'UNMAPPED':
-                    supabase.table('diagnoses').insert(diagnosis_data).execute()
-                    logger.info(f"Created diagnosis: {diagnosis_text} ({icd10_code}) for patient {patient_id}")
+                    # Only insert if we have a valid ICD-10 code or the description is substantial
+                    if icd10_code and icd10_code != 'UNMAPPED':
+                        await asupabase.table('diagnoses').insert(diagnosis_data).execute()
+                        logger.info(f"Created diagnosis: {diagnosis_text} ({icd10_code}) for patient {patient_id}")
     
     except Exception as e:
         logger.error(f"Error populating diagnoses: {e}")
 
 async def populate_vitals_from_document(patient_id: str, encounter_id: str, parsed_data: Dict[str, Any]):
     """Auto-populate vitals table from extracted document data"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         vitals_data = parsed_data.get('vitals', {})
         demographics = parsed_data.get('demographics', {})
@@ -620,7 +636,7 @@ async def populate_vitals_from_document(patient_id: str, encounter_id: str, pars
             return
         
         # Get measurement date from document
-        measurement_date = demographics.get('document_date') or datetime.now(timezone.utc).isoformat()
+        measurement_date = demographics.get('document_date') or now
         if 'T' in measurement_date:
             measurement_date = measurement_date.split('T')[0]
         
@@ -646,7 +662,7 @@ async def populate_vitals_from_document(patient_id: str, encounter_id: str, pars
                 continue
             
             # Check if similar vital already exists for this date
-            existing = supabase.table('vitals')\
+            existing = await asupabase.table('vitals')\
                 .select('*')\
                 .eq('patient_id', patient_id)\
                 .eq('measurement_date', measurement_date)\
@@ -668,11 +684,11 @@ async def populate_vitals_from_document(patient_id: str, encounter_id: str, pars
                 'height': float(height) if height else None,
                 'oxygen_saturation': int(oxygen_saturation) if oxygen_saturation else None,
                 'notes': 'Auto-imported from digitized document',
-                'created_at': datetime.now(timezone.utc).isoformat(),
+                'created_at': now,
                 'recorded_by': 'system'
             }
             
-            supabase.table('vitals').insert(vital_data).execute()
+            await asupabase.table('vitals').insert(vital_data).execute()
             logger.info(f"Created vitals record for patient {patient_id} on {measurement_date}")
     
     except Exception as e:
@@ -680,6 +696,7 @@ async def populate_vitals_from_document(patient_id: str, encounter_id: str, pars
 
 async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str, Any], document_id: str) -> str:
     """Create an encounter from validated document data"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         encounter_id = str(uuid.uuid4())
         
@@ -739,7 +756,7 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
         gp_notes = '\n\n'.join(gp_notes_parts) if gp_notes_parts else 'Imported from scanned document'
         
         # Get document date or use current date
-        encounter_date = demographics.get('document_date') or datetime.now(timezone.utc).isoformat()
+        encounter_date = demographics.get('document_date') or now
         
         # Create encounter in Supabase
         encounter_data = {
@@ -751,10 +768,11 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
             'chief_complaint': 'Imported from historical record',
             'vitals_json': vitals_json,
             'gp_notes': gp_notes,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         }
         
-        supabase.table('encounters').insert(encounter_data).execute()
+        await asupabase.table('encounters').insert(encounter_data).execute()
+        invalidate_analytics()
         
         # Save chronic conditions as patient_conditions
         conditions = chronic_summary.get('chronic_conditions', [])
@@ -766,7 +784,7 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
                     condition_name = str(condition)
                 
                 # Check if condition already exists
-                existing = supabase.table('patient_conditions')\
+                existing = await asupabase.table('patient_conditions')\
                     .select('*')\
                     .eq('patient_id', patient_id)\
                     .ilike('condition_name', f'%{condition_name}%')\
@@ -780,9 +798,9 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
                         'diagnosed_date': encounter_date.split('T')[0] if 'T' in encounter_date else encounter_date,
                         'status': 'active',
                         'notes': f'Imported from historical document',
-                        'created_at': datetime.now(timezone.utc).isoformat()
+                        'created_at': now
                     }
-                    supabase.table('patient_conditions').insert(condition_data).execute()
+                    await asupabase.table('patient_conditions').insert(condition_data).execute()
                     logger.info(f"Created condition: {condition_name} for patient {patient_id}")
         
         # Save current medications
@@ -848,7 +866,7 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
                     'status': 'active',
                     'prescribed_by': 'Historical Record',
                     'notes': med_notes,
-                    'created_at': datetime.now(timezone.utc).isoformat()
+                    'created_at': now
                 })
                 logger.info(f"Created medication: {med_name} (Date: {med_date}) for patient {patient_id}")
         
@@ -859,7 +877,7 @@ async def create_encounter_from_document(patient_id: str, parsed_data: Dict[str,
             'patient_id': patient_id,
             'document_id': document_id,
             'workspace_id': DEMO_WORKSPACE_ID,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         })
         
         # Auto-populate structured EHR tables
@@ -893,25 +911,24 @@ async def get_next_queue_number() -> int:
         logger.error(f"Error getting next queue number: {e}")
         return 1
 
-async def call_microservice_parser(filename: str, file_content: bytes) -> Dict[str, Any]:
+async def call_microservice_parser(filename: str, file: BinaryIO) -> Dict[str, Any]:
     """Call the microservice to parse document using LandingAI"""
     try:
-        # Prepare the file for upload
-        files = {'file': (filename, file_content, 'application/pdf')}
+        # Prepare the file for upload - httpx streams it from the file object
+        files = {'file': (filename, file, 'application/pdf')}
         data = {
             'processing_mode': 'smart',
             'save_to_database': 'false'
         }
         
         # Call the microservice
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{MICROSERVICE_URL}/api/v1/historic-documents/upload",
-                files=files,
-                data=data
-            )
-            response.raise_for_status()
-            result = response.json()
+        response = await microservice_http.post(
+            "/api/v1/historic-documents/upload",
+            files=files,
+            data=data
+        )
+        response.raise_for_status()
+        result = response.json()
         
         # Extract the parsed data from microservice response
         extracted_data = result.get('extracted_data', {})
@@ -943,13 +960,13 @@ async def call_microservice_parser(filename: str, file_content: bytes) -> Dict[s
         logger.error(f"Microservice call failed: {e}")
         # Fallback to mock parser if microservice fails
         logger.warning("Falling back to mock parser")
-        return mock_ade_parser(filename, file_content)
+        return await asyncio.to_thread(mock_ade_parser, filename, file)
     except Exception as e:
         logger.error(f"Error calling microservice: {e}")
         # Fallback to mock parser
-        return mock_ade_parser(filename, file_content)
+        return await asyncio.to_thread(mock_ade_parser, filename, file)
 
-def mock_ade_parser(filename: str, file_content: bytes) -> Dict[str, Any]:
+def mock_ade_parser(filename: str, file: BinaryIO) -> Dict[str, Any]:
     """Mock ADE parser - returns realistic parsed medical data"""
     return {
         'patient_demographics': {
@@ -1050,29 +1067,39 @@ async def capture_lead(lead: LeadCreate):
 
 # ==================== Patient Management ====================
 
+# Short-lived cache of list_patients results keyed on (workspace_id,
+# search). The live search box fires a request per keystroke and most are
+# repeats seconds apart; 2 s collapses those bursts into one Supabase read
+# without users noticing staleness. Cleared by every server.py path that
+# writes to patients. Per-process: each worker keeps its own copy.
+_patient_list_cache: TTLCache = TTLCache(maxsize=1024, ttl=2)
+
 @api_router.post("/patients", response_model=PatientResponse)
 async def create_patient(patient: PatientCreate):
     """Create a new patient"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         patient_id = str(uuid.uuid4())
         patient_data = {
             'id': patient_id,
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
-            **patient.model_dump(),
-            'created_at': datetime.now(timezone.utc).isoformat()
+            **patient.model_dump(mode='json'),
+            'created_at': now
         }
         
-        result = supabase.table('patients').insert(patient_data).execute()
+        result = await asupabase.table('patients').insert(patient_data).execute()
+        _patient_list_cache.clear()
+        invalidate_analytics()
         
         # Log to audit
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'patient_created',
             'patient_id': patient_id,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now,
             'details': {'action': 'Patient registered'}
         })
         
@@ -1084,13 +1111,17 @@ async def create_patient(patient: PatientCreate):
 @api_router.get("/patients", response_model=List[PatientResponse])
 async def list_patients(search: Optional[str] = None):
     """List all patients with optional search"""
+    cache_key = (DEMO_WORKSPACE_ID, (search or '').lower())
+    cached = _patient_list_cache.get(cache_key)
+    if cached is not None:
+        return cached
     try:
         if search:
             # Search across multiple fields
             search_pattern = f"%{search}%"
             
             # Get all patients and filter in Python (more reliable than complex Supabase queries)
-            result = supabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
+            result = await asupabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
             
             # Filter results
             filtered_patients = []
@@ -1101,10 +1132,12 @@ async def list_patients(search: Optional[str] = None):
                     search.lower() in (patient.get('contact_number') or '').lower()):
                     filtered_patients.append(patient)
             
-            return [PatientResponse(**p) for p in filtered_patients[:100]]
+            patients = filtered_patients[:100]
         else:
-            result = supabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).order('created_at', desc=True).limit(100).execute()
-            return [PatientResponse(**p) for p in result.data]
+            result = await asupabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).order('created_at', desc=True).limit(100).execute()
+            patients = result.data
+        _patient_list_cache[cache_key] = patients
+        return patients
     except Exception as e:
         logger.error(f"Error listing patients: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1113,7 +1146,7 @@ async def list_patients(search: Optional[str] = None):
 async def get_patient(patient_id: str):
     """Get patient details"""
     try:
-        result = supabase.table('patients').select('*').eq('id', patient_id).execute()
+        result = await asupabase.table('patients').select('*').eq('id', patient_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Patient not found")
         return PatientResponse(**result.data[0])
@@ -1127,9 +1160,10 @@ async def get_patient(patient_id: str):
 async def update_patient(patient_id: str, patient: PatientCreate):
     """Update patient details"""
     try:
-        result = supabase.table('patients').update(patient.model_dump()).eq('id', patient_id).execute()
+        result = await asupabase.table('patients').update(patient.model_dump(mode='json')).eq('id', patient_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Patient not found")
+        _patient_list_cache.clear()
         return PatientResponse(**result.data[0])
     except HTTPException:
         raise
@@ -1142,6 +1176,7 @@ async def update_patient(patient_id: str, patient: PatientCreate):
 @api_router.post("/encounters", response_model=EncounterResponse)
 async def create_encounter(encounter: EncounterCreate):
     """Create a new encounter"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         encounter_id = str(uuid.uuid4())
         vitals_dict = encounter.vitals.model_dump() if encounter.vitals else None
@@ -1150,25 +1185,26 @@ async def create_encounter(encounter: EncounterCreate):
             'id': encounter_id,
             'patient_id': encounter.patient_id,
             'workspace_id': DEMO_WORKSPACE_ID,
-            'encounter_date': datetime.now(timezone.utc).isoformat(),
+            'encounter_date': now,
             'status': 'in_progress',
             'chief_complaint': encounter.chief_complaint,
             'vitals_json': vitals_dict,
             'gp_notes': encounter.gp_notes,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         }
         
-        result = supabase.table('encounters').insert(encounter_data).execute()
+        result = await asupabase.table('encounters').insert(encounter_data).execute()
+        invalidate_analytics()
         
         # Log to audit
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'encounter_created',
             'patient_id': encounter.patient_id,
             'encounter_id': encounter_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
         return EncounterResponse(**result.data[0])
@@ -1180,8 +1216,9 @@ async def create_encounter(encounter: EncounterCreate):
 async def get_patient_encounters(patient_id: str):
     """Get all encounters for a patient"""
     try:
-        result = supabase.table('encounters').select('*').eq('patient_id', patient_id).order('encounter_date', desc=True).execute()
-        return [EncounterResponse(**e) for e in result.data]
+        result = await asupabase.table('encounters').select('*').eq('patient_id', patient_id).order('encounter_date', desc=True).execute()
+        # Rows go out as-is; response_model validates and filters them once
+        return result.data
     except Exception as e:
         logger.error(f"Error getting encounters: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1190,7 +1227,7 @@ async def get_patient_encounters(patient_id: str):
 async def get_encounter(encounter_id: str):
     """Get encounter details"""
     try:
-        result = supabase.table('encounters').select('*').eq('id', encounter_id).execute()
+        result = await asupabase.table('encounters').select('*').eq('id', encounter_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Encounter not found")
         return EncounterResponse(**result.data[0])
@@ -1213,7 +1250,7 @@ async def update_encounter(encounter_id: str, gp_notes: Optional[str] = None, st
         if not update_data:
             raise HTTPException(status_code=400, detail="No update data provided")
         
-        result = supabase.table('encounters').update(update_data).eq('id', encounter_id).execute()
+        result = await asupabase.table('encounters').update(update_data).eq('id', encounter_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Encounter not found")
         return EncounterResponse(**result.data[0])
@@ -1230,7 +1267,7 @@ async def update_encounter(encounter_id: str, gp_notes: Optional[str] = None, st
 async def get_patient_conditions(patient_id: str):
     """Get all conditions for a patient"""
     try:
-        result = supabase.table('patient_conditions')\
+        result = await asupabase.table('patient_conditions')\
             .select('*')\
             .eq('patient_id', patient_id)\
             .order('diagnosed_date', desc=True)\
@@ -1269,12 +1306,13 @@ async def upload_standalone_document(
     
     Returns parsed data including patient demographics for matching/creation
     """
+    now = datetime.now(timezone.utc).isoformat()
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Store original document in MongoDB
+        # Store original document in MongoDB - the file itself goes to GridFS.
+        # The upload is never read into memory as a whole: GridFS and the
+        # parser both stream it from Starlette's spooled temp file.
         mongo_doc_id = str(uuid.uuid4())
+        gridfs_id = ObjectId()
         document_doc = {
             'id': mongo_doc_id,
             'tenant_id': DEMO_TENANT_ID,
@@ -1283,16 +1321,21 @@ async def upload_standalone_document(
             'encounter_id': None,  # Not assigned yet
             'filename': file.filename,
             'content_type': file.content_type,
-            'file_size': len(file_content),
-            'file_data': base64.b64encode(file_content).decode('utf-8'),
+            'file_size': file.size,
+            'gridfs_id': gridfs_id,
             'document_type': document_type,
-            'uploaded_at': datetime.now(timezone.utc).isoformat(),
+            'uploaded_at': now,
             'status': 'uploaded'
         }
-        await db.scanned_documents.insert_one(document_doc)
         
-        # Call microservice to parse document
-        parsed_data = await call_microservice_parser(file.filename, file_content)
+        await asyncio.gather(
+            documents_fs.upload_from_stream_with_id(gridfs_id, file.filename, file),
+            db.scanned_documents.insert_one(document_doc)
+        )
+        
+        # GridFS left the file at EOF; rewind it for the parser
+        await file.seek(0)
+        parsed_data = await call_microservice_parser(file.filename, file.file)
         
         # Store parsed data in MongoDB
         parsed_doc_id = str(uuid.uuid4())
@@ -1305,18 +1348,20 @@ async def upload_standalone_document(
             'encounter_id': None,
             'parsed_data': parsed_data,
             'status': 'pending_patient_match',
-            'parsed_at': datetime.now(timezone.utc).isoformat()
+            'parsed_at': now
         }
+        
+        # Store parsed data
         await db.parsed_documents.insert_one(parsed_doc)
         
         # Log to audit
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'document_uploaded_standalone',
             'document_id': mongo_doc_id,
-            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'timestamp': now,
             'details': {'filename': file.filename, 'type': document_type}
         })
         
@@ -1338,12 +1383,12 @@ async def upload_document(
     file: UploadFile = File(...)
 ):
     """Upload and parse medical document for existing encounter"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
-        # Read file content
-        file_content = await file.read()
-        
-        # Store original document in MongoDB
+        # Store original document in MongoDB - the file itself goes to GridFS,
+        # streamed from the upload below rather than read into memory
         mongo_doc_id = str(uuid.uuid4())
+        gridfs_id = ObjectId()
         document_doc = {
             'id': mongo_doc_id,
             'tenant_id': DEMO_TENANT_ID,
@@ -1352,14 +1397,13 @@ async def upload_document(
             'encounter_id': encounter_id,
             'filename': file.filename,
             'content_type': file.content_type,
-            'file_size': len(file_content),
-            'file_data': base64.b64encode(file_content).decode('utf-8'),
-            'uploaded_at': datetime.now(timezone.utc).isoformat()
+            'file_size': file.size,
+            'gridfs_id': gridfs_id,
+            'uploaded_at': now
         }
-        await db.scanned_documents.insert_one(document_doc)
         
         # Mock ADE parsing
-        parsed_data = mock_ade_parser(file.filename, file_content)
+        parsed_data = await asyncio.to_thread(mock_ade_parser, file.filename, file.file)
         
         # Store parsed data in MongoDB
         parsed_doc_id = str(uuid.uuid4())
@@ -1372,9 +1416,8 @@ async def upload_document(
             'encounter_id': encounter_id,
             'parsed_data': parsed_data,
             'status': 'pending_validation',
-            'parsed_at': datetime.now(timezone.utc).isoformat()
+            'parsed_at': now
         }
-        await db.parsed_documents.insert_one(parsed_doc)
         
         # Create document reference in Supabase
         doc_ref_id = str(uuid.uuid4())
@@ -1385,11 +1428,10 @@ async def upload_document(
             'mongo_doc_id': mongo_doc_id,
             'mongo_parsed_id': parsed_doc_id,
             'filename': file.filename,
-            'file_size': len(file_content),
+            'file_size': file.size,
             'status': 'pending_validation',
-            'uploaded_at': datetime.now(timezone.utc).isoformat()
+            'uploaded_at': now
         }
-        supabase.table('document_refs').insert(doc_ref).execute()
         
         # Create validation session
         validation_session = {
@@ -1398,9 +1440,17 @@ async def upload_document(
             'parsed_doc_id': parsed_doc_id,
             'encounter_id': encounter_id,
             'status': 'pending',
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         }
-        await db.validation_sessions.insert_one(validation_session)
+        
+        # All ids are generated up front, so the writes are independent
+        await asyncio.gather(
+            documents_fs.upload_from_stream_with_id(gridfs_id, file.filename, file),
+            db.scanned_documents.insert_one(document_doc),
+            db.parsed_documents.insert_one(parsed_doc),
+            asupabase.table('document_refs').insert(doc_ref).execute(),
+            db.validation_sessions.insert_one(validation_session)
+        )
         
         return DocumentUploadResponse(
             document_id=doc_ref_id,
@@ -1425,42 +1475,34 @@ async def match_patient_to_document(
     Returns matched patient or indication that new patient should be created.
     """
     try:
-        # Build search query based on provided identifiers
-        query = supabase.table('patients').select('*').eq('workspace_id', DEMO_WORKSPACE_ID)
-        
-        # Priority 1: Match by ID number (most reliable)
-        if id_number:
-            result = query.eq('id_number', id_number).execute()
-            if result.data:
+        # One call: id_number, then name + DOB, then fuzzy name, in
+        # priority order server-side (migration 034). Both sides of the
+        # id_number tier are compared in canonical form (migration 039).
+        result = await asupabase.rpc('match_patient', {
+            'p_workspace_id': DEMO_WORKSPACE_ID,
+            'p_id_number': normalize_id_number(id_number) if id_number else None,
+            'p_first_name': first_name,
+            'p_last_name': last_name,
+            'p_dob': dob
+        }).execute()
+        
+        if result.data:
+            match_type = result.data[0]['match_type']
+            if match_type == 'name_fuzzy':
+                # Fuzzy match by name only (return multiple possibilities)
                 return {
                     'match_found': True,
-                    'match_type': 'id_number',
-                    'patient': result.data[0],
-                    'confidence': 'high'
-                }
-        
-        # Priority 2: Match by name + DOB
-        if first_name and last_name and dob:
-            result = query.ilike('first_name', first_name).ilike('last_name', last_name).eq('dob', dob).execute()
-            if result.data:
-                return {
-                    'match_found': True,
-                    'match_type': 'name_dob',
-                    'patient': result.data[0],
-                    'confidence': 'high'
-                }
-        
-        # Priority 3: Fuzzy match by name only (return multiple possibilities)
-        if first_name and last_name:
-            result = query.ilike('first_name', f'%{first_name}%').ilike('last_name', f'%{last_name}%').execute()
-            if result.data:
-                return {
-                    'match_found': True,
-                    'match_type': 'name_fuzzy',
-                    'possible_matches': result.data,
+                    'match_type': match_type,
+                    'possible_matches': [row['patient'] for row in result.data],
                     'confidence': 'medium',
                     'action_required': 'manual_review'
                 }
+            return {
+                'match_found': True,
+                'match_type': match_type,
+                'patient': result.data[0]['patient'],
+                'confidence': 'high'
+            }
         
         # No match found
         return {
@@ -1475,6 +1517,7 @@ async def match_patient_to_document(
 
 @api_router.post("/documents/link-to-patient")
 async def link_document_to_patient(
+    background_tasks: BackgroundTasks,
     parsed_doc_id: str = Form(...),
     patient_id: str = Form(...),
     create_encounter: bool = Form(True),
@@ -1484,6 +1527,7 @@ async def link_document_to_patient(
     Link a parsed document to an existing or newly created patient.
     Optionally create an encounter and save validated data.
     """
+    now = datetime.now(timezone.utc).isoformat()
     try:
         # Get parsed document from MongoDB
         parsed_doc = await db.parsed_documents.find_one({'id': parsed_doc_id})
@@ -1492,27 +1536,31 @@ async def link_document_to_patient(
         
         # Parse validated data if provided
         if validated_data:
-            validated_json = json.loads(validated_data)
+            validated_json = orjson.loads(validated_data)
             parsed_doc['parsed_data'] = validated_json
         
-        # Update parsed document with patient_id
-        await db.parsed_documents.update_one(
-            {'id': parsed_doc_id},
-            {'$set': {
-                'patient_id': patient_id,
-                'status': 'linked',
-                'linked_at': datetime.now(timezone.utc).isoformat()
-            }}
-        )
-        
-        # Update original document
-        await db.scanned_documents.update_one(
-            {'id': parsed_doc['document_id']},
-            {'$set': {
-                'patient_id': patient_id,
-                'status': 'linked'
-            }}
+        # Link the parsed and the original document (different collections)
+        previous, _ = await asyncio.gather(
+            db.parsed_documents.find_one_and_update(
+                {'id': parsed_doc_id},
+                {'$set': {
+                    'patient_id': patient_id,
+                    'status': 'linked',
+                    'linked_at': now
+                }},
+                projection={'_id': 0, 'status': 1, 'parsed_data': 1},
+                return_document=ReturnDocument.BEFORE
+            ),
+            db.scanned_documents.update_one(
+                {'id': parsed_doc['document_id']},
+                {'$set': {
+                    'patient_id': patient_id,
+                    'status': 'linked'
+                }}
+            )
         )
+        if previous is not None:
+            background_tasks.add_task(apply_clinical_aggregates, previous, previous.get('parsed_data') or {})
         
         encounter_id = None
         if create_encounter:
@@ -1528,21 +1576,16 @@ async def link_document_to_patient(
                 'id': encounter_id,
                 'patient_id': patient_id,
                 'workspace_id': DEMO_WORKSPACE_ID,
-                'encounter_date': datetime.now(timezone.utc).isoformat(),
+                'encounter_date': now,
                 'status': 'pending_validation',
                 'chief_complaint': chief_complaint,
                 'vitals_json': None,
                 'gp_notes': parsed_doc['parsed_data'].get('clinical_notes'),
-                'created_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now
             }
             
-            supabase.table('encounters').insert(encounter_data).execute()
-            
-            # Update parsed document with encounter_id
-            await db.parsed_documents.update_one(
-                {'id': parsed_doc_id},
-                {'$set': {'encounter_id': encounter_id}}
-            )
+            await asupabase.table('encounters').insert(encounter_data).execute()
+            invalidate_analytics()
             
             # Create document reference in Supabase
             doc_ref_id = str(uuid.uuid4())
@@ -1555,12 +1598,20 @@ async def link_document_to_patient(
                 'filename': 'Historical Record',
                 'file_size': 0,
                 'status': 'linked',
-                'uploaded_at': datetime.now(timezone.utc).isoformat()
+                'uploaded_at': now
             }
-            supabase.table('document_refs').insert(doc_ref).execute()
+            
+            # Both need the encounter to exist, but not each other
+            await asyncio.gather(
+                db.parsed_documents.update_one(
+                    {'id': parsed_doc_id},
+                    {'$set': {'encounter_id': encounter_id}}
+                ),
+                asupabase.table('document_refs').insert(doc_ref).execute()
+            )
         
         # Log to audit
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -1568,7 +1619,7 @@ async def link_document_to_patient(
             'patient_id': patient_id,
             'document_id': parsed_doc['document_id'],
             'encounter_id': encounter_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
         return {
@@ -1584,6 +1635,7 @@ async def link_document_to_patient(
 
 @api_router.post("/documents/create-patient-from-document")
 async def create_patient_from_document(
+    background_tasks: BackgroundTasks,
     parsed_doc_id: str = Form(...),
     patient_data: str = Form(...)  # JSON string with patient details
 ):
@@ -1593,7 +1645,9 @@ async def create_patient_from_document(
     """
     try:
         # Parse patient data
-        patient_dict = json.loads(patient_data)
+        patient_dict = orjson.loads(patient_data)
+        if isinstance(patient_dict.get('id_number'), str):
+            patient_dict['id_number'] = normalize_id_number(patient_dict['id_number'])
         
         # Create patient
         patient_id = str(uuid.uuid4())
@@ -1605,13 +1659,17 @@ async def create_patient_from_document(
             'created_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('patients').insert(patient_record).execute()
+        await asupabase.table('patients').insert(patient_record).execute()
+        _patient_list_cache.clear()
+        invalidate_analytics()
         
         # Link document to patient
         link_result = await link_document_to_patient(
+            background_tasks,
             parsed_doc_id=parsed_doc_id,
             patient_id=patient_id,
-            create_encounter=True
+            create_encounter=True,
+            validated_data=None
         )
         
         return {
@@ -1648,12 +1706,21 @@ async def get_encounter_documents(encounter_id: str):
     """Get all documents for an encounter"""
     try:
         # Get document refs from Supabase
-        result = supabase.table('document_refs').select('*').eq('encounter_id', encounter_id).execute()
+        result = await asupabase.table('document_refs').select('*').eq('encounter_id', encounter_id).execute()
+        
+        # Get parsed data from MongoDB - one $in query for all refs
+        parsed_ids = [doc_ref['mongo_parsed_id'] for doc_ref in result.data]
+        parsed_docs = {
+            parsed_doc['id']: parsed_doc
+            async for parsed_doc in db.parsed_documents.find(
+                {'id': {'$in': parsed_ids}},
+                {'_id': 0, 'id': 1, 'parsed_data': 1}
+            )
+        }
         
         documents = []
         for doc_ref in result.data:
-            # Get parsed data from MongoDB
-            parsed_doc = await db.parsed_documents.find_one({'id': doc_ref['mongo_parsed_id']})
+            parsed_doc = parsed_docs.get(doc_ref['mongo_parsed_id'])
             if parsed_doc:
                 documents.append({
                     'document_id': doc_ref['id'],
@@ -1669,12 +1736,25 @@ async def get_encounter_documents(encounter_id: str):
         logger.error(f"Error getting documents: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+def inline_disposition(filename: str) -> str:
+    """Content-Disposition for serving a stored file inline under its own name.
+    
+    Headers are latin-1, so the real name goes in RFC 5987 filename*
+    (UTF-8, percent-encoded); filename= carries an ASCII fallback, with _
+    for the quotes, backslashes and other characters that would break it.
+    """
+    fallback = ''.join(
+        c if 32 <= ord(c) < 127 and c not in '"\\' else '_'
+        for c in filename
+    )
+    return f"inline; filename=\"{fallback}\"; filename*=UTF-8''{quote(filename, safe='')}"
+
 @api_router.get("/documents/{document_id}/original")
 async def get_original_document(document_id: str):
     """Get original document file"""
     try:
         # Get document ref from Supabase
-        result = supabase.table('document_refs').select('*').eq('id', document_id).execute()
+        result = await asupabase.table('document_refs').select('*').eq('id', document_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Document not found")
         
@@ -1685,12 +1765,23 @@ async def get_original_document(document_id: str):
         if not doc:
             raise HTTPException(status_code=404, detail="Document file not found")
         
-        return {
-            'filename': doc['filename'],
-            'content_type': doc['content_type'],
-            'file_data': doc['file_data'],  # Base64 encoded
-            'uploaded_at': doc['uploaded_at']
-        }
+        headers = {'Content-Disposition': inline_disposition(doc['filename'])}
+        if 'gridfs_id' not in doc:
+            # Uploaded before originals moved to GridFS - stored inline as base64
+            return Response(
+                content=base64.b64decode(doc['file_data']),
+                media_type=doc['content_type'],
+                headers=headers
+            )
+        
+        # Stream from GridFS chunk by chunk rather than loading the whole file
+        grid_out = await documents_fs.open_download_stream(doc['gridfs_id'])
+        
+        async def _chunks():
+            while chunk := await grid_out.readchunk():
+                yield chunk
+        
+        return StreamingResponse(_chunks(), media_type=doc['content_type'], headers=headers)
     except HTTPException:
         raise
     except Exception as e:
@@ -1730,7 +1821,7 @@ async def get_validation_queue(
     """
     try:
         # Build query
-        query = supabase.table('digitised_documents').select('*')
+        query = asupabase.table('digitised_documents').select('*')
         
         # Filter by status
         if status:
@@ -1746,10 +1837,10 @@ async def get_validation_queue(
         # Order by created_at descending (newest first)
         query = query.order('created_at', desc=True).limit(limit)
         
-        result = query.execute()
+        result = await query.execute()
         
         # Calculate stats
-        all_docs = supabase.table('digitised_documents').select('status').execute()
+        all_docs = await asupabase.table('digitised_documents').select('status').execute()
         total_parsed = sum(1 for d in all_docs.data if d['status'] == 'parsed')
         total_pending = sum(1 for d in all_docs.data if d['status'] == 'pending_validation')
         total_validated = sum(1 for d in all_docs.data if d['status'] == 'validated')
@@ -1782,14 +1873,15 @@ async def approve_document_validation(
     Approve a document after validation
     Moves document from pending_validation to validated status
     """
+    now = datetime.now(timezone.utc).isoformat()
     try:
         # Update document status
-        result = supabase.table('digitised_documents').update({
+        result = await asupabase.table('digitised_documents').update({
             'status': 'validated',
-            'validated_at': datetime.now(timezone.utc).isoformat(),
+            'validated_at': now,
             'validated_by': validated_by or 'system',
             'validation_notes': notes,
-            'updated_at': datetime.now(timezone.utc).isoformat()
+            'updated_at': now
         }).eq('id', document_id).execute()
         
         if not result.data:
@@ -1818,14 +1910,15 @@ async def reject_document_validation(
     Reject a document after validation
     Moves document to rejected status
     """
+    now = datetime.now(timezone.utc).isoformat()
     try:
-        result = supabase.table('digitised_documents').update({
+        result = await asupabase.table('digitised_documents').update({
             'status': 'rejected',
-            'validated_at': datetime.now(timezone.utc).isoformat(),
+            'validated_at': now,
             'validated_by': validated_by or 'system',
             'validation_notes': reason,
             'error_message': reason,
-            'updated_at': datetime.now(timezone.utc).isoformat()
+            'updated_at': now
         }).eq('id', document_id).execute()
         
         if not result.data:
@@ -1845,47 +1938,53 @@ async def reject_document_validation(
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.post("/validation/{document_id}/approve")
-async def approve_validation(document_id: str, update: ValidationUpdate):
+async def approve_validation(document_id: str, update: ValidationUpdate, background_tasks: BackgroundTasks):
     """Approve parsed document data"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         # Get document ref
-        result = supabase.table('document_refs').select('*').eq('id', document_id).execute()
+        result = await asupabase.table('document_refs').select('*').eq('id', document_id).execute()
         if not result.data:
             raise HTTPException(status_code=404, detail="Document not found")
         
         doc_ref = result.data[0]
         
-        # Update parsed document in MongoDB
-        await db.parsed_documents.update_one(
-            {'id': doc_ref['mongo_parsed_id']},
-            {'$set': {
-                'parsed_data': update.parsed_data,
-                'status': 'approved',
-                'validated_at': datetime.now(timezone.utc).isoformat(),
-                'validation_notes': update.notes
-            }}
-        )
-        
-        # Update document ref status in Supabase
-        supabase.table('document_refs').update({'status': 'approved'}).eq('id', document_id).execute()
-        
-        # Update validation session
-        await db.validation_sessions.update_one(
-            {'document_id': doc_ref['mongo_doc_id']},
-            {'$set': {
-                'status': 'approved',
-                'approved_at': datetime.now(timezone.utc).isoformat()
-            }}
+        # The three status writes only need doc_ref - run them concurrently:
+        # parsed document (Mongo), document ref (Supabase), validation session (Mongo)
+        previous, _, _ = await asyncio.gather(
+            db.parsed_documents.find_one_and_update(
+                {'id': doc_ref['mongo_parsed_id']},
+                {'$set': {
+                    'parsed_data': update.parsed_data,
+                    'status': 'approved',
+                    'validated_at': now,
+                    'validation_notes': update.notes
+                }},
+                projection={'_id': 0, 'status': 1, 'parsed_data': 1},
+                return_document=ReturnDocument.BEFORE
+            ),
+            asupabase.table('document_refs').update({'status': 'approved'}).eq('id', document_id).execute(),
+            db.validation_sessions.update_one(
+                {'document_id': doc_ref['mongo_doc_id']},
+                {'$set': {
+                    'status': 'approved',
+                    'approved_at': now
+                }}
+            )
         )
+        # Nothing in the response depends on the dashboard counters
+        if previous is not None:
+            background_tasks.add_task(apply_clinical_aggregates, previous, update.parsed_data)
+        invalidate_analytics()
         
         # Log to audit
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'document_validated',
             'document_id': document_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
         return {'status': 'success', 'message': 'Document approved'}
@@ -1912,7 +2011,7 @@ async def create_dispense_event(dispense: DispenseCreate):
             'dispensed_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('dispense_events').insert(dispense_data).execute()
+        await asupabase.table('dispense_events').insert(dispense_data).execute()
         
         return {'status': 'success', 'dispense_id': dispense_id}
     except Exception as e:
@@ -1920,10 +2019,20 @@ async def create_dispense_event(dispense: DispenseCreate):
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/dispense/encounter/{encounter_id}")
-async def get_dispense_events(encounter_id: str):
-    """Get dispensing history for an encounter"""
+async def get_dispense_events(
+    encounter_id: str,
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0)
+):
+    """Get dispensing history for an encounter, oldest first, one page at a time"""
     try:
-        result = supabase.table('dispense_events').select('*').eq('encounter_id', encounter_id).execute()
+        # id breaks ties between rows dispensed in the same instant, so pages don't overlap
+        result = await asupabase.table('dispense_events').select('*')\
+            .eq('encounter_id', encounter_id)\
+            .order('dispensed_at')\
+            .order('id')\
+            .range(offset, offset + limit - 1)\
+            .execute()
         return result.data
     except Exception as e:
         logger.error(f"Error getting dispense events: {e}")
@@ -1999,25 +2108,173 @@ async def get_dispense_events(encounter_id: str):
 
 # ==================== Analytics ====================
 
+# The dashboard polls these endpoints and each one rescans whole tables,
+# so results are kept per (endpoint, workspace) for a couple of minutes.
+# Clinical aggregates are the most expensive and change least, hence the
+# longer TTL. Cleared on the server.py writes that move the numbers.
+_analytics_cache: TTLCache = TTLCache(maxsize=32, ttl=120)
+_clinical_analytics_cache: TTLCache = TTLCache(maxsize=32, ttl=300)
+_analytics_locks: Dict[str, asyncio.Lock] = {}
+
+def invalidate_analytics():
+    """Drop all cached analytics results"""
+    _analytics_cache.clear()
+    _clinical_analytics_cache.clear()
+
+def analytics_cached(name: str, cache: TTLCache = _analytics_cache):
+    """Serve an analytics handler's result from `cache`, with an X-Cache header.
+    
+    Concurrent misses for the same key wait on one lock, so only the first
+    request rescans the tables. Errors are raised as usual and not cached.
+    The cache holds the orjson-encoded body, so a hit is served without
+    serializing the result again.
+    """
+    def decorator(handler):
+        lock = _analytics_locks.setdefault(name, asyncio.Lock())
+        
+        @functools.wraps(handler)
+        async def wrapper(*args, **kwargs):
+            key = (name, DEMO_WORKSPACE_ID)
+            body = cache.get(key)
+            hit = body is not None
+            if not hit:
+                async with lock:
+                    body = cache.get(key)
+                    if body is None:
+                        body = orjson.dumps(await handler(*args, **kwargs))
+                        cache[key] = body
+            return Response(body, media_type='application/json', headers={'X-Cache': 'HIT' if hit else 'MISS'})
+        return wrapper
+    return decorator
+
+# Running diagnosis / medication / allergy counts for the clinical
+# dashboard, one clinical_aggregates doc per (workspace_id, kind, value).
+# A parsed document contributes while its status is in
+# CLINICAL_COUNTED_STATUSES; the routes that change status or parsed_data
+# apply the difference via update_clinical_aggregates, so the dashboard
+# reads counters instead of rescanning parsed_documents. Values are
+# stored as field VALUES, not keys, so dots and $ in a diagnosis are safe.
+CLINICAL_COUNTED_STATUSES = ('approved', 'linked')
+
+def clinical_terms(parsed_data: Dict[str, Any]) -> Counter:
+    """(kind, value) occurrences in one document's parsed data"""
+    terms = Counter()
+    # A missing or null name counts as 'Unknown', matching the $ifNull in
+    # _count_terms so the backfill and these increments land on the same rows
+    for diagnosis in parsed_data.get('diagnoses', []):
+        description = diagnosis.get('description')
+        terms[('diagnoses', 'Unknown' if description is None else description)] += 1
+    for med in parsed_data.get('current_medications', []):
+        name = med.get('name')
+        terms[('medications', 'Unknown' if name is None else name)] += 1
+    for allergy in parsed_data.get('allergies', []):
+        terms[('allergies', allergy)] += 1
+    return terms
+
+async def update_clinical_aggregates(before: Optional[Dict[str, Any]], parsed_data: Dict[str, Any]):
+    """Move counters from a document's previous contribution to its new one.
+    
+    `before` is the document as it was before the write (status and
+    parsed_data), None if it didn't exist; `parsed_data` is what it holds
+    now, with a counted status.
+    """
+    delta = clinical_terms(parsed_data)
+    if before and before.get('status') in CLINICAL_COUNTED_STATUSES:
+        delta.subtract(clinical_terms(before.get('parsed_data') or {}))
+    
+    ops = [
+        UpdateOne(
+            {'workspace_id': DEMO_WORKSPACE_ID, 'kind': kind, 'value': value},
+            {'$inc': {'count': n}},
+            upsert=True
+        )
+        for (kind, value), n in delta.items() if n
+    ]
+    if ops:
+        await db.clinical_aggregates.bulk_write(ops, ordered=False)
+
+def _count_terms(array: str, field: Optional[str] = None) -> List[Dict[str, Any]]:
+    """$facet branch counting one parsed_data array, as clinical_terms does"""
+    value = f'$parsed_data.{array}.{field}' if field else f'$parsed_data.{array}'
+    return [
+        {'$unwind': f'$parsed_data.{array}'},
+        {'$group': {'_id': {'$ifNull': [value, 'Unknown']} if field else value, 'count': {'$sum': 1}}}
+    ]
+
+def _top_terms(kind: str, limit: int = 10) -> List[Dict[str, Any]]:
+    """$facet branch returning the `limit` highest clinical_aggregates of a kind"""
+    return [
+        {'$match': {'kind': kind}},
+        {'$sort': {'count': -1, 'value': 1}},
+        {'$limit': limit}
+    ]
+
+async def apply_clinical_aggregates(before: Optional[Dict[str, Any]], parsed_data: Dict[str, Any]):
+    """Background-task form of update_clinical_aggregates.
+    
+    Runs after the response is sent, so it logs instead of raising and
+    drops the analytics cache again once the counters have moved.
+    """
+    try:
+        await update_clinical_aggregates(before, parsed_data)
+    except Exception as e:
+        logger.error(f"Error updating clinical aggregates: {e}")
+    invalidate_analytics()
+
+async def rebuild_clinical_aggregates():
+    """Recount clinical_aggregates from parsed_documents (startup backfill)"""
+    # Counted inside Mongo: only the per-term totals come back, not the documents
+    cursor = await db.parsed_documents.aggregate([
+        {'$match': {'workspace_id': DEMO_WORKSPACE_ID, 'status': {'$in': list(CLINICAL_COUNTED_STATUSES)}}},
+        {'$facet': {
+            'diagnoses': _count_terms('diagnoses', 'description'),
+            'medications': _count_terms('current_medications', 'name'),
+            'allergies': _count_terms('allergies'),
+        }}
+    ])
+    facets = (await cursor.to_list(1))[0]
+    
+    # Upsert the totals and drop only the terms that no longer occur, so two
+    # workers rebuilding at once converge on the same rows instead of racing
+    # a delete_many/insert_many against the unique (workspace_id, kind, value) index
+    ops = [
+        UpdateOne(
+            {'workspace_id': DEMO_WORKSPACE_ID, 'kind': kind, 'value': term['_id']},
+            {'$set': {'count': term['count']}},
+            upsert=True
+        )
+        for kind, terms in facets.items()
+        for term in terms
+    ]
+    ops += [
+        DeleteMany({'workspace_id': DEMO_WORKSPACE_ID, 'kind': kind, 'value': {'$nin': [term['_id'] for term in terms]}})
+        for kind, terms in facets.items()
+    ]
+    await db.clinical_aggregates.bulk_write(ops, ordered=False)
+    logger.info(f"Rebuilt clinical aggregates: {sum(len(terms) for terms in facets.values())} terms")
+
 @api_router.get("/analytics/summary")
+@analytics_cached('summary')
 async def get_analytics_summary():
     """Get comprehensive summary analytics for the workspace"""
     try:
-        # Get counts from Supabase
-        patients_result = supabase.table('patients').select('id', count='exact').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
-        encounters_result = supabase.table('encounters').select('id', count='exact').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
-        invoices_result = supabase.table('gp_invoices').select('total_amount').execute()
-        
-        total_revenue = sum(float(inv['total_amount']) for inv in invoices_result.data)
+        # Counts, invoices and recent encounters are independent - fetch concurrently.
+        # head=True: the counts come back in Content-Range, with no rows
+        patients_result, encounters_result, invoice_totals, recent_encounters = await asyncio.gather(
+            asupabase.table('patients').select('id', count='exact', head=True).eq('workspace_id', DEMO_WORKSPACE_ID).execute(),
+            asupabase.table('encounters').select('id', count='exact', head=True).eq('workspace_id', DEMO_WORKSPACE_ID).execute(),
+            asupabase.rpc('analytics_invoice_totals', {'p_workspace_id': DEMO_WORKSPACE_ID}).execute(),
+            asupabase.table('encounters').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).order('encounter_date', desc=True).limit(5).execute()
+        )
         
-        # Get recent encounters
-        recent_encounters = supabase.table('encounters').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).order('encounter_date', desc=True).limit(5).execute()
+        # Summed in Postgres (migration 037)
+        invoices = invoice_totals.data
         
         return {
             'total_patients': patients_result.count or 0,
             'total_encounters': encounters_result.count or 0,
-            'total_invoices': len(invoices_result.data),
-            'total_revenue': total_revenue,
+            'total_invoices': invoices['total_invoices'],
+            'total_revenue': float(invoices['total_revenue']),
             'recent_encounters': recent_encounters.data
         }
     except Exception as e:
@@ -2025,58 +2282,31 @@ async def get_analytics_summary():
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/analytics/operational")
+@analytics_cached('operational')
 async def get_operational_analytics():
     """Get operational metrics: patient volume, peak hours, throughput"""
     try:
-        # Patient volume trends (last 6 months)
-        six_months_ago = (datetime.now(timezone.utc) - timedelta(days=180)).isoformat()
-        
-        patients_over_time = supabase.table('patients').select('created_at').eq('workspace_id', DEMO_WORKSPACE_ID).gte('created_at', six_months_ago).execute()
-        encounters_over_time = supabase.table('encounters').select('encounter_date', count='exact').eq('workspace_id', DEMO_WORKSPACE_ID).gte('encounter_date', six_months_ago).execute()
-        
-        # Group by month
-        patient_monthly = {}
-        for p in patients_over_time.data:
-            month = p['created_at'][:7]  # YYYY-MM
-            patient_monthly[month] = patient_monthly.get(month, 0) + 1
-        
-        encounter_monthly = {}
-        for e in encounters_over_time.data:
-            month = e['encounter_date'][:7]
-            encounter_monthly[month] = encounter_monthly.get(month, 0) + 1
-        
-        # Peak hours analysis (encounters by hour)
-        all_encounters = supabase.table('encounters').select('encounter_date').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
-        hour_distribution = {}
-        for e in all_encounters.data:
-            hour = datetime.fromisoformat(e['encounter_date'].replace('Z', '+00:00')).hour
-            hour_distribution[hour] = hour_distribution.get(hour, 0) + 1
+        # Month / hour bucketing runs in Postgres (migration 035)
+        result = await asupabase.rpc('analytics_operational', {'p_workspace_id': DEMO_WORKSPACE_ID}).execute()
+        buckets = result.data
         
         # Average consultation duration (mock for now - will be real once we track workstation times)
         avg_consultation_duration = 15  # minutes
         
         return {
-            'patient_growth': [
-                {'month': month, 'count': count} 
-                for month, count in sorted(patient_monthly.items())
-            ],
-            'encounter_volume': [
-                {'month': month, 'count': count}
-                for month, count in sorted(encounter_monthly.items())
-            ],
-            'peak_hours': [
-                {'hour': hour, 'count': count}
-                for hour, count in sorted(hour_distribution.items())
-            ],
+            'patient_growth': buckets['patient_monthly'],
+            'encounter_volume': buckets['encounter_monthly'],
+            'peak_hours': buckets['hour_distribution'],
             'avg_consultation_duration': avg_consultation_duration,
-            'total_patients_6m': len(patients_over_time.data),
-            'total_encounters_6m': len(all_encounters.data)
+            'total_patients_6m': buckets['total_patients_6m'],
+            'total_encounters_6m': buckets['total_encounters']
         }
     except Exception as e:
         logger.error(f"Error getting operational analytics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/analytics/clinical")
+@analytics_cached('clinical', _clinical_analytics_cache)
 async def get_clinical_analytics(
     # Phase 2 capability gating proof-of-concept. Requires the practice to have
     # an active entitlement granting `analytics_cohorts` (Module 02 — Advanced
@@ -2086,50 +2316,40 @@ async def get_clinical_analytics(
 ):
     """Get clinical metrics: diagnoses, prescriptions, referrals"""
     try:
-        # Get all parsed documents to analyze medical data
-        parsed_docs = await db.parsed_documents.find({
-            'workspace_id': DEMO_WORKSPACE_ID,
-            'status': {'$in': ['approved', 'linked']}
-        }).to_list(1000)
-        
-        # Aggregate diagnoses
-        diagnosis_counts = {}
-        medication_counts = {}
-        allergy_counts = {}
-        
-        for doc in parsed_docs:
-            parsed_data = doc.get('parsed_data', {})
-            
-            # Count diagnoses
-            for diagnosis in parsed_data.get('diagnoses', []):
-                diag_desc = diagnosis.get('description', 'Unknown')
-                diagnosis_counts[diag_desc] = diagnosis_counts.get(diag_desc, 0) + 1
-            
-            # Count medications
-            for med in parsed_data.get('current_medications', []):
-                med_name = med.get('name', 'Unknown')
-                medication_counts[med_name] = medication_counts.get(med_name, 0) + 1
-            
-            # Count allergies
-            for allergy in parsed_data.get('allergies', []):
-                allergy_counts[allergy] = allergy_counts.get(allergy, 0) + 1
-        
-        # Get top 10 diagnoses
-        top_diagnoses = sorted(diagnosis_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_medications = sorted(medication_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        top_allergies = sorted(allergy_counts.items(), key=lambda x: x[1], reverse=True)[:10]
-        
-        # Get encounter statistics
-        all_encounters = supabase.table('encounters').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
+        # Clinical counters (Mongo), encounters and patient DOBs (Supabase)
+        # don't depend on each other - fetch concurrently
+        # Top 10 per kind and the distinct-term totals are computed in
+        # Mongo, so only ~30 small rows come back
+        clinical_cursor, encounters_result, all_patients = await asyncio.gather(
+            db.clinical_aggregates.aggregate([
+                {'$match': {'workspace_id': DEMO_WORKSPACE_ID, 'count': {'$gt': 0}}},
+                {'$facet': {
+                    'diagnoses': _top_terms('diagnoses'),
+                    'medications': _top_terms('medications'),
+                    'allergies': _top_terms('allergies'),
+                    'totals': [{'$group': {'_id': '$kind', 'n': {'$sum': 1}}}],
+                }}
+            ]),
+            asupabase.table('encounters').select('id', count='exact', head=True).eq('workspace_id', DEMO_WORKSPACE_ID).execute(),
+            asupabase.table('patients').select('dob').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
+        )
+        clinical = (await clinical_cursor.to_list(1))[0]
+        totals = {row['_id']: row['n'] for row in clinical['totals']}
+        top_diagnoses = [(row['value'], row['count']) for row in clinical['diagnoses']]
+        top_medications = [(row['value'], row['count']) for row in clinical['medications']]
+        top_allergies = [(row['value'], row['count']) for row in clinical['allergies']]
         
         # Patient age distribution
-        all_patients = supabase.table('patients').select('dob').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
         age_distribution = {'0-18': 0, '19-35': 0, '36-50': 0, '51-65': 0, '65+': 0}
         
+        # dob is 'YYYY-MM-DD' text: compare the year and the 'MM-DD' part
+        # directly instead of parsing a date per patient
+        today = datetime.now()
+        today_mmdd = today.strftime('%m-%d')
         for p in all_patients.data:
             try:
-                dob = datetime.strptime(p['dob'], '%Y-%m-%d')
-                age = (datetime.now() - dob).days // 365
+                dob = p['dob']
+                age = today.year - int(dob[:4]) - (today_mmdd < dob[5:10])
                 if age <= 18:
                     age_distribution['0-18'] += 1
                 elif age <= 35:
@@ -2148,45 +2368,45 @@ async def get_clinical_analytics(
             'top_medications': [{'medication': m, 'count': c} for m, c in top_medications],
             'top_allergies': [{'allergy': a, 'count': c} for a, c in top_allergies],
             'age_distribution': age_distribution,
-            'total_conditions_tracked': len(diagnosis_counts),
-            'total_unique_medications': len(medication_counts),
-            'encounter_count': len(all_encounters.data)
+            'total_conditions_tracked': totals.get('diagnoses', 0),
+            'total_unique_medications': totals.get('medications', 0),
+            'encounter_count': encounters_result.count or 0
         }
     except Exception as e:
         logger.error(f"Error getting clinical analytics: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/analytics/financial")
+@analytics_cached('financial')
 async def get_financial_analytics():
     """Get financial metrics: revenue, payment methods, outstanding"""
     try:
-        # Get all invoices
-        invoices = supabase.table('gp_invoices').select('*').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
-        
-        # Revenue over time (last 6 months)
+        # One fetch; the 6-month revenue window is derived from the same rows
+        invoices = await asupabase.table('gp_invoices').select('total_amount, status, payer_type, created_at').eq('workspace_id', DEMO_WORKSPACE_ID).execute()
         six_months_ago = (datetime.now(timezone.utc) - timedelta(days=180)).isoformat()
-        recent_invoices = supabase.table('gp_invoices').select('*').gte('created_at', six_months_ago).execute()
         
-        revenue_monthly = {}
-        for inv in recent_invoices.data:
-            month = inv['created_at'][:7]
-            revenue_monthly[month] = revenue_monthly.get(month, 0) + float(inv['total_amount'])
-        
-        # Payer type breakdown
-        payer_breakdown = {}
-        for inv in invoices.data:
-            payer = inv['payer_type']
-            payer_breakdown[payer] = payer_breakdown.get(payer, 0) + float(inv['total_amount'])
-        
-        # Invoice status
-        status_breakdown = {}
+        # Single pass: totals, payer/status breakdowns, revenue over time
+        total_revenue = pending_revenue = paid_revenue = 0
+        revenue_monthly = Counter()
+        payer_breakdown = Counter()
+        status_breakdown = Counter()
         for inv in invoices.data:
+            amount = float(inv['total_amount'])
             status = inv['status']
-            status_breakdown[status] = status_breakdown.get(status, 0) + 1
-        
-        total_revenue = sum(float(inv['total_amount']) for inv in invoices.data)
-        pending_revenue = sum(float(inv['total_amount']) for inv in invoices.data if inv['status'] == 'pending')
-        paid_revenue = sum(float(inv['total_amount']) for inv in invoices.data if inv['status'] == 'paid')
+            payer = inv['payer_type']
+            
+            total_revenue += amount
+            if status == 'pending':
+                pending_revenue += amount
+            elif status == 'paid':
+                paid_revenue += amount
+            payer_breakdown[payer] += amount
+            status_breakdown[status] += 1
+            
+            # ISO-8601 UTC timestamps compare correctly as strings
+            if inv['created_at'] >= six_months_ago:
+                month = inv['created_at'][:7]
+                revenue_monthly[month] += amount
         
         return {
             'total_revenue': total_revenue,
@@ -2200,7 +2420,7 @@ async def get_financial_analytics():
                 {'payer_type': payer, 'revenue': round(revenue, 2)}
                 for payer, revenue in payer_breakdown.items()
             ],
-            'invoice_status': status_breakdown,
+            'invoice_status': dict(status_breakdown),
             'total_invoices': len(invoices.data),
             'avg_invoice_value': round(total_revenue / len(invoices.data), 2) if invoices.data else 0
         }
@@ -2231,7 +2451,7 @@ async def proxy_gp_upload(
         storage_path = f"{DEMO_WORKSPACE_ID}/{document_id}/{file.filename}"
         
         try:
-            supabase.storage.from_('medical-records').upload(
+            await asupabase.storage.from_('medical-records').upload(
                 path=storage_path,
                 file=file_content,
                 file_options={
@@ -2264,11 +2484,11 @@ async def proxy_gp_upload(
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('digitised_documents').insert(digitised_doc_data).execute()
+        await asupabase.table('digitised_documents').insert(digitised_doc_data).execute()
         logger.info(f"Created digitised_documents record: {document_id}")
         
         # Update status to "parsing"
-        supabase.table('digitised_documents')\
+        await asupabase.table('digitised_documents')\
             .update({'status': 'parsing', 'updated_at': datetime.now(timezone.utc).isoformat()})\
             .eq('id', document_id)\
             .execute()
@@ -2310,7 +2530,7 @@ async def proxy_gp_upload(
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }
 
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update(update_data)\
                 .eq('id', document_id)\
                 .execute()
@@ -2325,7 +2545,7 @@ async def proxy_gp_upload(
         }
     except Exception as e:
         # Update status to "error"
-        supabase.table('digitised_documents')\
+        await asupabase.table('digitised_documents')\
             .update({
                 'status': 'error',
                 'error_message': str(e),
@@ -2341,13 +2561,12 @@ async def proxy_gp_upload(
 async def proxy_gp_validate(request_data: Dict[str, Any]):
     """Proxy GP validation to microservice"""
     try:
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(
-                f"{MICROSERVICE_URL}/api/v1/gp/validate-extraction",
-                json=request_data
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await microservice_http.post(
+            "/api/v1/gp/validate-extraction",
+            json=request_data
+        )
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"GP validation proxy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2356,10 +2575,9 @@ async def proxy_gp_validate(request_data: Dict[str, Any]):
 async def proxy_gp_patients():
     """Proxy get GP patients list to microservice"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{MICROSERVICE_URL}/api/v1/gp/patients")
-            response.raise_for_status()
-            return response.json()
+        response = await microservice_http.get("/api/v1/gp/patients", timeout=30.0)
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"GP patients list proxy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2368,12 +2586,12 @@ async def proxy_gp_patients():
 async def proxy_gp_chronic_summary(patient_id: str):
     """Proxy get chronic summary to microservice"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{MICROSERVICE_URL}/api/v1/gp/patient/{patient_id}/chronic-summary"
-            )
-            response.raise_for_status()
-            return response.json()
+        response = await microservice_http.get(
+            f"/api/v1/gp/patient/{patient_id}/chronic-summary",
+            timeout=30.0
+        )
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"GP chronic summary proxy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2398,10 +2616,9 @@ async def proxy_gp_chronic_summary(patient_id: str):
 async def proxy_gp_statistics():
     """Proxy get GP statistics to microservice"""
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{MICROSERVICE_URL}/api/v1/gp/statistics")
-            response.raise_for_status()
-            return response.json()
+        response = await microservice_http.get("/api/v1/gp/statistics", timeout=30.0)
+        response.raise_for_status()
+        return response.json()
     except Exception as e:
         logger.error(f"GP statistics proxy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -2414,7 +2631,7 @@ async def get_gp_document_view(document_id: str):
     """
     try:
         # Get document metadata from digitised_documents table
-        doc_result = supabase.table('digitised_documents')\
+        doc_result = await asupabase.table('digitised_documents')\
             .select('*')\
             .eq('id', document_id)\
             .execute()
@@ -2428,7 +2645,7 @@ async def get_gp_document_view(document_id: str):
         # Check if it's a Supabase Storage path or local path
         if storage_path.startswith(DEMO_WORKSPACE_ID):
             # It's in Supabase Storage - generate signed URL
-            signed_url_response = supabase.storage.from_('medical-records').create_signed_url(
+            signed_url_response = await asupabase.storage.from_('medical-records').create_signed_url(
                 path=storage_path,
                 expires_in=3600  # 1 hour
             )
@@ -2451,7 +2668,7 @@ async def get_gp_document_view(document_id: str):
                 content=file_content,
                 media_type="application/pdf",
                 headers={
-                    "Content-Disposition": f'inline; filename="{doc_metadata["filename"]}"',
+                    "Content-Disposition": inline_disposition(doc_metadata['filename']),
                     "Access-Control-Allow-Origin": "*",
                     "Access-Control-Allow-Methods": "GET, OPTIONS",
                     "Access-Control-Allow-Headers": "*",
@@ -2467,10 +2684,11 @@ async def get_gp_document_view(document_id: str):
 @api_router.post("/gp/validation/save")
 async def save_gp_validation(validation_data: GPValidationSaveRequest):
     """Save validated GP document data with modification tracking"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         # Connect to the microservice database
         microservice_db_name = os.environ.get('DATABASE_NAME', 'surgiscan_documents')
-        microservice_client = AsyncIOMotorClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
+        microservice_client = AsyncMongoClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
         microservice_db = microservice_client[microservice_db_name]
         
         document_id = validation_data.document_id
@@ -2478,7 +2696,7 @@ async def save_gp_validation(validation_data: GPValidationSaveRequest):
         # Get the original document
         doc = await microservice_db.gp_scanned_documents.find_one({"document_id": document_id})
         if not doc:
-            microservice_client.close()
+            await microservice_client.close()
             raise HTTPException(status_code=404, detail=f"Document not found: {document_id}")
         
         # Prepare validated data with modifications tracking
@@ -2490,7 +2708,7 @@ async def save_gp_validation(validation_data: GPValidationSaveRequest):
             "modification_count": len(validation_data.modifications),
             "status": validation_data.status,
             "validation_notes": validation_data.notes,
-            "validated_at": datetime.now(timezone.utc).isoformat(),
+            "validated_at": now,
             "validated_by": "user",  # Can be enhanced with auth
             "tenant_id": DEMO_TENANT_ID,
             "workspace_id": DEMO_WORKSPACE_ID
@@ -2505,24 +2723,24 @@ async def save_gp_validation(validation_data: GPValidationSaveRequest):
             {
                 "$set": {
                     "status": "validated",
-                    "validated_at": datetime.now(timezone.utc).isoformat(),
+                    "validated_at": now,
                     "validated_data": validation_data.parsed_data
                 }
             }
         )
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'gp_document_validated',
             'document_id': document_id,
             'modifications_count': len(validation_data.modifications),
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
-        microservice_client.close()
+        await microservice_client.close()
         
         logger.info(f"GP document {document_id} validated with {len(validation_data.modifications)} modifications")
         
@@ -2563,6 +2781,7 @@ async def match_patient_from_document(match_request: PatientMatchRequest):
 @api_router.post("/gp/validation/confirm-match")
 async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
     """Confirm patient match and create encounter from document"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         document_id = confirm_request.document_id
         patient_id = confirm_request.patient_id
@@ -2575,7 +2794,7 @@ async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
         
         # Connect to microservice database
         microservice_db_name = os.environ.get('DATABASE_NAME', 'surgiscan_documents')
-        microservice_client = AsyncIOMotorClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
+        microservice_client = AsyncMongoClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
         microservice_db = microservice_client[microservice_db_name]
         
         # Update document status to "linked"
@@ -2586,7 +2805,7 @@ async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
                     "status": "linked",
                     "patient_id": patient_id,
                     "encounter_id": encounter_id,
-                    "linked_at": datetime.now(timezone.utc).isoformat()
+                    "linked_at": now
                 }
             }
         )
@@ -2599,13 +2818,13 @@ async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
             'encounter_id': encounter_id,
             'match_method': 'manual_confirmation',
             'confirmed_by': 'user',
-            'confirmed_at': datetime.now(timezone.utc).isoformat(),
+            'confirmed_at': now,
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID
         })
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -2613,22 +2832,22 @@ async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
             'document_id': document_id,
             'patient_id': patient_id,
             'encounter_id': encounter_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
-        microservice_client.close()
+        await microservice_client.close()
         
         # Update digitised_documents status to 'approved' and link to patient/encounter
         try:
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update({
                     'status': 'approved',
                     'patient_id': patient_id,
                     'encounter_id': encounter_id,
                     'validated_by': 'user',
-                    'validated_at': datetime.now(timezone.utc).isoformat(),
-                    'approved_at': datetime.now(timezone.utc).isoformat(),
-                    'updated_at': datetime.now(timezone.utc).isoformat()
+                    'validated_at': now,
+                    'approved_at': now,
+                    'updated_at': now
                 })\
                 .eq('id', document_id)\
                 .execute()
@@ -2652,6 +2871,7 @@ async def confirm_patient_match(confirm_request: ConfirmMatchRequest):
 @api_router.post("/gp/validation/create-new-patient")
 async def create_new_patient_from_document(create_request: CreateNewPatientRequest):
     """Create new patient and encounter from document"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         document_id = create_request.document_id
         demographics = create_request.demographics
@@ -2703,7 +2923,8 @@ async def create_new_patient_from_document(create_request: CreateNewPatientReque
             except:
                 # If parsing fails, keep the normalized version
                 pass
-        id_number = demographics.get('id_number') or demographics.get('patient_id') or demographics.get('sa_id_number') or demographics.get('id') or 'Unknown'
+        id_number = demographics.get('id_number') or demographics.get('patient_id') or demographics.get('sa_id_number') or demographics.get('id')
+        id_number = normalize_id_number(str(id_number)) if id_number else 'Unknown'
         
         # Contact number - check multiple field variations
         contact_number = (
@@ -2757,19 +2978,21 @@ async def create_new_patient_from_document(create_request: CreateNewPatientReque
             'email': email,
             'address': address,
             'medical_aid': medical_aid,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         }
         
         logger.info(f"Normalized patient data: {patient_data}")
         
-        supabase.table('patients').insert(patient_data).execute()
+        await asupabase.table('patients').insert(patient_data).execute()
+        _patient_list_cache.clear()
+        invalidate_analytics()
         
         # Create encounter from document
         encounter_id = await create_encounter_from_document(patient_id, parsed_data, document_id)
         
         # Connect to microservice database
         microservice_db_name = os.environ.get('DATABASE_NAME', 'surgiscan_documents')
-        microservice_client = AsyncIOMotorClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
+        microservice_client = AsyncMongoClient(os.environ.get('MONGODB_URL', 'mongodb://localhost:27017'))
         microservice_db = microservice_client[microservice_db_name]
         
         # Update document status
@@ -2780,13 +3003,13 @@ async def create_new_patient_from_document(create_request: CreateNewPatientReque
                     "status": "linked",
                     "patient_id": patient_id,
                     "encounter_id": encounter_id,
-                    "linked_at": datetime.now(timezone.utc).isoformat()
+                    "linked_at": now
                 }
             }
         )
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -2794,22 +3017,22 @@ async def create_new_patient_from_document(create_request: CreateNewPatientReque
             'document_id': document_id,
             'patient_id': patient_id,
             'encounter_id': encounter_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
-        microservice_client.close()
+        await microservice_client.close()
         
         # Update digitised_documents status to 'approved' and link to patient/encounter
         try:
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update({
                     'status': 'approved',
                     'patient_id': patient_id,
                     'encounter_id': encounter_id,
                     'validated_by': 'user',
-                    'validated_at': datetime.now(timezone.utc).isoformat(),
-                    'approved_at': datetime.now(timezone.utc).isoformat(),
-                    'updated_at': datetime.now(timezone.utc).isoformat()
+                    'validated_at': now,
+                    'approved_at': now,
+                    'updated_at': now
                 })\
                 .eq('id', document_id)\
                 .execute()
@@ -2850,12 +3073,12 @@ async def get_watcher_status():
         statuses = ['uploaded', 'parsing', 'parsed', 'extracting', 'extracted', 'validated', 'approved', 'error']
         counts = {}
         for status in statuses:
-            result = supabase.table('digitised_documents') \
-                .select('id', count='exact') \
+            result = await asupabase.table('digitised_documents') \
+                .select('id', count='exact', head=True) \
                 .eq('workspace_id', DEMO_WORKSPACE_ID) \
                 .eq('status', status) \
                 .execute()
-            counts[status] = result.count if hasattr(result, 'count') and result.count is not None else len(result.data)
+            counts[status] = result.count or 0
 
         from app.services.document_watcher import _watcher_instance
         watcher_running = _watcher_instance is not None and _watcher_instance._running
@@ -2880,7 +3103,7 @@ async def reprocess_document(document_id: str):
     """Reset a document to 'uploaded' status so the watcher picks it up again"""
     try:
         # Verify document exists
-        doc = supabase.table('digitised_documents') \
+        doc = await asupabase.table('digitised_documents') \
             .select('id, filename, status') \
             .eq('id', document_id) \
             .execute()
@@ -2891,7 +3114,7 @@ async def reprocess_document(document_id: str):
         current_status = doc.data[0]['status']
 
         # Reset status to 'queued_for_processing' — watcher will pick it up
-        supabase.table('digitised_documents') \
+        await asupabase.table('digitised_documents') \
             .update({
                 'status': 'queued_for_processing',
                 'error_message': None,
@@ -2920,7 +3143,7 @@ async def queue_document_for_processing(document_id: str):
     Only documents with status 'uploaded' can be queued.
     This is the ONLY way to trigger credit-consuming processing."""
     try:
-        doc = supabase.table('digitised_documents') \
+        doc = await asupabase.table('digitised_documents') \
             .select('id, filename, status') \
             .eq('id', document_id) \
             .execute()
@@ -2937,7 +3160,7 @@ async def queue_document_for_processing(document_id: str):
                 'document_id': document_id
             }
 
-        supabase.table('digitised_documents') \
+        await asupabase.table('digitised_documents') \
             .update({
                 'status': 'queued_for_processing',
                 'error_message': None,
@@ -2966,7 +3189,7 @@ async def queue_all_uploaded_documents():
     Use with caution — each document consumes LandingAI credits."""
     try:
         # Get count first
-        uploaded = supabase.table('digitised_documents') \
+        uploaded = await asupabase.table('digitised_documents') \
             .select('id') \
             .eq('status', 'uploaded') \
             .eq('workspace_id', DEMO_WORKSPACE_ID) \
@@ -2978,7 +3201,7 @@ async def queue_all_uploaded_documents():
             return {'status': 'success', 'message': 'No uploaded documents to queue', 'count': 0}
 
         # Update all to queued
-        supabase.table('digitised_documents') \
+        await asupabase.table('digitised_documents') \
             .update({
                 'status': 'queued_for_processing',
                 'updated_at': datetime.now(timezone.utc).isoformat()
@@ -3019,7 +3242,7 @@ async def list_digitised_documents(
         logger.info(f"Fetching digitised documents with filters: status={status}, patient_id={patient_id}")
         
         # Build query
-        query = supabase.table('digitised_documents').select('*')
+        query = asupabase.table('digitised_documents').select('*')
         
         # Apply filters
         if status:
@@ -3042,7 +3265,7 @@ async def list_digitised_documents(
         # Apply pagination
         query = query.range(offset, offset + limit - 1)
         
-        result = query.execute()
+        result = await query.execute()
         
         # Enrich with patient names if patient_id exists
         documents = []
@@ -3050,7 +3273,7 @@ async def list_digitised_documents(
             doc_copy = doc.copy()
             if doc.get('patient_id'):
                 try:
-                    patient_res = supabase.table('patients').select('first_name, last_name').eq('id', doc['patient_id']).execute()
+                    patient_res = await asupabase.table('patients').select('first_name, last_name').eq('id', doc['patient_id']).execute()
                     if patient_res.data:
                         patient = patient_res.data[0]
                         doc_copy['patient_name'] = f"{patient['first_name']} {patient['last_name']}"
@@ -3073,7 +3296,7 @@ async def list_digitised_documents(
 async def get_digitised_document(document_id: str):
     """Get details of a specific digitised document"""
     try:
-        result = supabase.table('digitised_documents')\
+        result = await asupabase.table('digitised_documents')\
             .select('*')\
             .eq('id', document_id)\
             .execute()
@@ -3086,7 +3309,7 @@ async def get_digitised_document(document_id: str):
         # Enrich with patient name if linked
         if document.get('patient_id'):
             try:
-                patient_res = supabase.table('patients').select('first_name, last_name').eq('id', document['patient_id']).execute()
+                patient_res = await asupabase.table('patients').select('first_name, last_name').eq('id', document['patient_id']).execute()
                 if patient_res.data:
                     patient = patient_res.data[0]
                     document['patient_name'] = f"{patient['first_name']} {patient['last_name']}"
@@ -3110,10 +3333,10 @@ async def get_parsed_document_from_supabase(doc_id: str):
     """
     try:
         # Try by id first, then by document_id
-        result = supabase.table('gp_parsed_documents').select('*').eq('id', doc_id).execute()
+        result = await asupabase.table('gp_parsed_documents').select('*').eq('id', doc_id).execute()
 
         if not result.data:
-            result = supabase.table('gp_parsed_documents').select('*').eq('document_id', doc_id).execute()
+            result = await asupabase.table('gp_parsed_documents').select('*').eq('document_id', doc_id).execute()
 
         if not result.data:
             raise HTTPException(status_code=404, detail="Parsed document not found")
@@ -3153,7 +3376,7 @@ async def get_gp_validation_session(document_id: str):
     """
     try:
         # Get parsed document
-        parsed_result = supabase.table('gp_parsed_documents')\
+        parsed_result = await asupabase.table('gp_parsed_documents')\
             .select('*')\
             .eq('document_id', document_id)\
             .execute()
@@ -3161,7 +3384,7 @@ async def get_gp_validation_session(document_id: str):
         parsed_doc = parsed_result.data[0] if parsed_result.data else {}
 
         # Get validation session
-        session_result = supabase.table('gp_validation_sessions')\
+        session_result = await asupabase.table('gp_validation_sessions')\
             .select('*')\
             .eq('document_id', document_id)\
             .order('created_at', desc=True)\
@@ -3218,7 +3441,7 @@ async def view_document_pdf(document_id: str):
     """
     try:
         # Get document metadata from Supabase
-        doc_result = supabase.table('digitised_documents').select('*').eq('id', document_id).execute()
+        doc_result = await asupabase.table('digitised_documents').select('*').eq('id', document_id).execute()
         
         if not doc_result.data:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -3264,7 +3487,7 @@ async def update_document_status(document_id: str, update: DocumentStatusUpdate)
         if update.error_message:
             update_data['error_message'] = update.error_message
         
-        result = supabase.table('digitised_documents')\
+        result = await asupabase.table('digitised_documents')\
             .update(update_data)\
             .eq('id', document_id)\
             .execute()
@@ -3288,7 +3511,7 @@ async def delete_digitised_document(document_id: str):
     """Delete a digitised document and its associated files"""
     try:
         # Get document details
-        doc_result = supabase.table('digitised_documents')\
+        doc_result = await asupabase.table('digitised_documents')\
             .select('*')\
             .eq('id', document_id)\
             .execute()
@@ -3306,7 +3529,7 @@ async def delete_digitised_document(document_id: str):
                 logger.info(f"Deleted file: {file_path}")
         
         # Delete from database
-        supabase.table('digitised_documents').delete().eq('id', document_id).execute()
+        await asupabase.table('digitised_documents').delete().eq('id', document_id).execute()
         
         return {
             'status': 'success',
@@ -3328,7 +3551,7 @@ async def bulk_extract_documents(document_ids: List[str]):
         for doc_id in document_ids:
             try:
                 # Update status to 'extracting'
-                supabase.table('digitised_documents')\
+                await asupabase.table('digitised_documents')\
                     .update({'status': 'extracting', 'updated_at': datetime.now(timezone.utc).isoformat()})\
                     .eq('id', doc_id)\
                     .execute()
@@ -3412,7 +3635,7 @@ async def upload_gp_document_with_template(
             'updated_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('digitised_documents').insert(digitised_doc_data).execute()
+        await asupabase.table('digitised_documents').insert(digitised_doc_data).execute()
         logger.info(f"✅ Created digitised_documents record: {document_id}")
         
         # Process with template-driven extraction
@@ -3447,7 +3670,7 @@ async def upload_gp_document_with_template(
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }
             
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update(update_data)\
                 .eq('id', document_id)\
                 .execute()
@@ -3457,7 +3680,7 @@ async def upload_gp_document_with_template(
             logger.info(f"📊 Records created: {result.get('auto_population', {}).get('records_created', 0)}")
             logger.info(f"📊 Tables populated: {list(result.get('auto_population', {}).get('tables_populated', {}).keys())}")
         else:
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update({
                     'status': 'error',
                     'error_message': result.get('error', 'Unknown error'),
@@ -3483,7 +3706,7 @@ async def upload_gp_document_with_template(
         
         # Update status to error
         try:
-            supabase.table('digitised_documents')\
+            await asupabase.table('digitised_documents')\
                 .update({
                     'status': 'error',
                     'error_message': str(e),
@@ -3526,7 +3749,7 @@ async def extract_from_parsed_document(
         logger.info(f"🔍 Phase 2: Extracting from document {document_id}")
         
         # Get document record
-        doc_result = supabase.table('digitised_documents').select('*').eq('id', document_id).execute()
+        doc_result = await asupabase.table('digitised_documents').select('*').eq('id', document_id).execute()
         
         if not doc_result.data:
             raise HTTPException(status_code=404, detail="Document not found")
@@ -3545,7 +3768,7 @@ async def extract_from_parsed_document(
             raise HTTPException(status_code=400, detail="No parsed document ID found")
         
         # Update status to extracting
-        supabase.table('digitised_documents').update({
+        await asupabase.table('digitised_documents').update({
             'status': 'extracting',
             'updated_at': datetime.now(timezone.utc).isoformat()
         }).eq('id', document_id).execute()
@@ -3553,14 +3776,14 @@ async def extract_from_parsed_document(
         logger.info(f"Reading parsed document from Supabase: {parsed_doc_id}")
 
         # Get parsed document from Supabase
-        parsed_result = supabase.table('gp_parsed_documents')\
+        parsed_result = await asupabase.table('gp_parsed_documents')\
             .select('*')\
             .eq('id', parsed_doc_id)\
             .execute()
 
         if not parsed_result.data:
             # Fallback: try by document_id
-            parsed_result = supabase.table('gp_parsed_documents')\
+            parsed_result = await asupabase.table('gp_parsed_documents')\
                 .select('*')\
                 .eq('document_id', parsed_doc_id)\
                 .execute()
@@ -3600,7 +3823,7 @@ async def extract_from_parsed_document(
                 'updated_at': datetime.now(timezone.utc).isoformat()
             }
             
-            supabase.table('digitised_documents').update(update_data).eq('id', document_id).execute()
+            await asupabase.table('digitised_documents').update(update_data).eq('id', document_id).execute()
             
             logger.info(f"✅ Extraction complete: {document_id}")
             logger.info(f"📊 Records created: {extraction_result.get('auto_population', {}).get('records_created', 0)}")
@@ -3620,7 +3843,7 @@ async def extract_from_parsed_document(
             })
         else:
             # Update to extraction failed
-            supabase.table('digitised_documents').update({
+            await asupabase.table('digitised_documents').update({
                 'status': 'extraction_failed',
                 'error_message': extraction_result.get('error', 'Unknown error'),
                 'updated_at': datetime.now(timezone.utc).isoformat()
@@ -3635,7 +3858,7 @@ async def extract_from_parsed_document(
         
         # Update status to error
         try:
-            supabase.table('digitised_documents').update({
+            await asupabase.table('digitised_documents').update({
                 'status': 'extraction_failed',
                 'error_message': str(e),
                 'updated_at': datetime.now(timezone.utc).isoformat()
@@ -3832,7 +4055,7 @@ async def get_patient_documents(patient_id: str):
     try:
         logger.info(f"Fetching documents for patient {patient_id}")
 
-        result = supabase.table('digitised_documents')\
+        result = await asupabase.table('digitised_documents')\
             .select('id, filename, upload_date, status, patient_id, encounter_id, validated_at, file_size, created_at')\
             .eq('patient_id', patient_id)\
             .order('created_at', desc=True)\
@@ -3857,7 +4080,7 @@ async def get_document_details(document_id: str):
         logger.info(f"Fetching details for document {document_id}")
 
         # Get document from Supabase
-        doc_result = supabase.table('digitised_documents')\
+        doc_result = await asupabase.table('digitised_documents')\
             .select('*')\
             .eq('id', document_id)\
             .execute()
@@ -3868,7 +4091,7 @@ async def get_document_details(document_id: str):
         doc = doc_result.data[0]
 
         # Get validation session if exists
-        validation_result = supabase.table('gp_validation_sessions')\
+        validation_result = await asupabase.table('gp_validation_sessions')\
             .select('*')\
             .eq('document_id', document_id)\
             .order('created_at', desc=True)\
@@ -3895,7 +4118,7 @@ async def get_document_audit_trail(document_id: str):
         logger.info(f"Fetching audit trail for document {document_id}")
 
         # Get validation sessions as audit events
-        sessions_result = supabase.table('gp_validation_sessions')\
+        sessions_result = await asupabase.table('gp_validation_sessions')\
             .select('*')\
             .eq('document_id', document_id)\
             .order('created_at', desc=True)\
@@ -3969,7 +4192,7 @@ async def search_documents(
     try:
         logger.info(f"Searching documents with query: {query}")
 
-        search_query = supabase.table('digitised_documents')\
+        search_query = asupabase.table('digitised_documents')\
             .select('id, filename, upload_date, status, patient_id, encounter_id, created_at')
 
         if patient_id:
@@ -3986,7 +4209,7 @@ async def search_documents(
         if query:
             search_query = search_query.ilike('filename', f'%{query}%')
 
-        result = search_query.order('created_at', desc=True).limit(limit).execute()
+        result = await search_query.order('created_at', desc=True).limit(limit).execute()
 
         return {
             'status': 'success',
@@ -4007,7 +4230,7 @@ async def queue_check_in(check_in: QueueCheckIn):
         patient_id = check_in.patient_id
         
         # Get patient details
-        patient_result = supabase.table('patients').select('*').eq('id', patient_id).execute()
+        patient_result = await asupabase.table('patients').select('*').eq('id', patient_id).execute()
         if not patient_result.data:
             raise HTTPException(status_code=404, detail="Patient not found")
         
@@ -4018,8 +4241,9 @@ async def queue_check_in(check_in: QueueCheckIn):
         
         # Create queue entry
         queue_id = str(uuid.uuid4())
-        today = datetime.now(timezone.utc).date().isoformat()
-        now = datetime.now(timezone.utc).isoformat()
+        current_time = datetime.now(timezone.utc)
+        today = current_time.date().isoformat()
+        now = current_time.isoformat()
         
         queue_entry = {
             'id': queue_id,
@@ -4041,7 +4265,7 @@ async def queue_check_in(check_in: QueueCheckIn):
         await db.queue_entries.insert_one(queue_entry)
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -4071,7 +4295,8 @@ async def queue_check_in(check_in: QueueCheckIn):
 async def get_current_queue(station: Optional[str] = None):
     """Get current queue for today"""
     try:
-        today = datetime.now(timezone.utc).date().isoformat()
+        current_time = datetime.now(timezone.utc)
+        today = current_time.date().isoformat()
         
         # Build filter
         queue_filter = {
@@ -4093,7 +4318,7 @@ async def get_current_queue(station: Optional[str] = None):
             
             # Calculate wait time
             check_in_time = datetime.fromisoformat(entry['check_in_time'])
-            wait_time = (datetime.now(timezone.utc) - check_in_time).total_seconds() / 60
+            wait_time = (current_time - check_in_time).total_seconds() / 60
             entry['wait_time_minutes'] = int(wait_time)
         
         return {
@@ -4140,7 +4365,7 @@ async def call_next_patient(queue_id: str, station: str):
         )
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -4168,6 +4393,7 @@ async def call_next_patient(queue_id: str, station: str):
 @api_router.put("/queue/{queue_id}/update-status")
 async def update_queue_status(queue_id: str, update: QueueUpdate):
     """Update queue entry status"""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         queue_entry = await db.queue_entries.find_one({'id': queue_id})
         
@@ -4177,7 +4403,7 @@ async def update_queue_status(queue_id: str, update: QueueUpdate):
         # Update fields
         update_fields = {
             'status': update.status,
-            'updated_at': datetime.now(timezone.utc).isoformat()
+            'updated_at': now
         }
         
         if update.station:
@@ -4187,7 +4413,7 @@ async def update_queue_status(queue_id: str, update: QueueUpdate):
             update_fields['notes'] = update.notes
         
         if update.status == 'completed':
-            update_fields['completed_at'] = datetime.now(timezone.utc).isoformat()
+            update_fields['completed_at'] = now
         
         await db.queue_entries.update_one(
             {'id': queue_id},
@@ -4195,7 +4421,7 @@ async def update_queue_status(queue_id: str, update: QueueUpdate):
         )
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
@@ -4204,7 +4430,7 @@ async def update_queue_status(queue_id: str, update: QueueUpdate):
             'queue_id': queue_id,
             'old_status': queue_entry['status'],
             'new_status': update.status,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
         logger.info(f"Queue {queue_id} status updated to {update.status}")
@@ -4226,26 +4452,28 @@ async def get_queue_stats():
     try:
         today = datetime.now(timezone.utc).date().isoformat()
         
-        # Get all queue entries for today
-        cursor = db.queue_entries.find({'date': today})
-        all_entries = await cursor.to_list(length=None)
+        # Stream today's entries, projected to the fields the stats use,
+        # and tally in one pass instead of holding the whole day in memory
+        status_counts = Counter()
+        total_wait = 0
+        wait_samples = 0
+        async for e in db.queue_entries.find(
+            {'date': today},
+            {'_id': 0, 'status': 1, 'check_in_time': 1, 'completed_at': 1}
+        ):
+            status_counts[e['status']] += 1
+            # Average wait time for completed patients
+            if e.get('completed_at'):
+                total_wait += (datetime.fromisoformat(e['completed_at']) - datetime.fromisoformat(e['check_in_time'])).total_seconds() / 60
+                wait_samples += 1
         
         # Calculate statistics
-        total_checked_in = len(all_entries)
-        waiting = len([e for e in all_entries if e['status'] == 'waiting'])
-        in_progress = len([e for e in all_entries if e['status'] in ['in_vitals', 'in_consultation', 'in_dispensary']])
-        completed = len([e for e in all_entries if e['status'] == 'completed'])
-        cancelled = len([e for e in all_entries if e['status'] == 'cancelled'])
-        
-        # Calculate average wait time for completed patients
-        completed_entries = [e for e in all_entries if e.get('completed_at')]
-        avg_wait_time = 0
-        if completed_entries:
-            total_wait = sum([
-                (datetime.fromisoformat(e['completed_at']) - datetime.fromisoformat(e['check_in_time'])).total_seconds() / 60
-                for e in completed_entries
-            ])
-            avg_wait_time = int(total_wait / len(completed_entries))
+        total_checked_in = sum(status_counts.values())
+        waiting = status_counts['waiting']
+        in_progress = status_counts['in_vitals'] + status_counts['in_consultation'] + status_counts['in_dispensary']
+        completed = status_counts['completed']
+        cancelled = status_counts['cancelled']
+        avg_wait_time = int(total_wait / wait_samples) if wait_samples else 0
         
         return {
             'status': 'success',
@@ -4533,6 +4761,9 @@ def parse_soap_notes(soap_text: str) -> dict:
 @api_router.post("/ai-scribe/save-consultation")
 async def save_consultation_to_ehr(request: dict):
     """Save AI Scribe consultation to EHR - creates encounter, extracts diagnosis, links documents"""
+    current_time = datetime.now(timezone.utc)
+    today = current_time.date().isoformat()
+    now = current_time.isoformat()
     try:
         import openai
         import json
@@ -4579,14 +4810,15 @@ async def save_consultation_to_ehr(request: dict):
             'id': encounter_id,
             'patient_id': patient_id,
             'workspace_id': DEMO_WORKSPACE_ID,
-            'encounter_date': datetime.now(timezone.utc).isoformat(),
+            'encounter_date': now,
             'status': 'completed',
             'chief_complaint': extracted_info.get('chief_complaint', 'Consultation'),
             'gp_notes': soap_notes,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         }
         
-        supabase.table('encounters').insert(encounter_data).execute()
+        await asupabase.table('encounters').insert(encounter_data).execute()
+        invalidate_analytics()
         
         # Parse SOAP notes into structured format
         parsed_soap = parse_soap_notes(soap_notes)
@@ -4607,18 +4839,18 @@ async def save_consultation_to_ehr(request: dict):
             'author': doctor_name,
             'role': 'ai_scribe',
             'source': 'ai_scribe',
-            'note_datetime': datetime.now(timezone.utc).isoformat(),
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'note_datetime': now,
+            'created_at': now
         }
         
-        supabase.table('clinical_notes').insert(clinical_note_data).execute()
+        await asupabase.table('clinical_notes').insert(clinical_note_data).execute()
         logger.info(f"Structured clinical note created for encounter {encounter_id}")
         
         # Add diagnosis to patient's conditions (if not already present)
         diagnosis = extracted_info.get('diagnosis', '')
         if diagnosis:
             # Check if condition exists
-            existing = supabase.table('patient_conditions')\
+            existing = await asupabase.table('patient_conditions')\
                 .select('*')\
                 .eq('patient_id', patient_id)\
                 .ilike('condition_name', f'%{diagnosis}%')\
@@ -4631,12 +4863,12 @@ async def save_consultation_to_ehr(request: dict):
                     'patient_id': patient_id,
                     'condition_name': diagnosis,
                     'icd10_code': extracted_info.get('icd10_code', ''),
-                    'diagnosed_date': datetime.now(timezone.utc).date().isoformat(),
+                    'diagnosed_date': today,
                     'status': 'active',
-                    'notes': f'Diagnosed during consultation on {datetime.now(timezone.utc).date().isoformat()}',
-                    'created_at': datetime.now(timezone.utc).isoformat()
+                    'notes': f'Diagnosed during consultation on {today}',
+                    'created_at': now
                 }
-                supabase.table('patient_conditions').insert(condition_data).execute()
+                await asupabase.table('patient_conditions').insert(condition_data).execute()
         
         # Store transcription in MongoDB for reference
         await db.consultation_transcripts.insert_one({
@@ -4646,18 +4878,18 @@ async def save_consultation_to_ehr(request: dict):
             'transcription': transcription,
             'soap_notes': soap_notes,
             'doctor_name': doctor_name,
-            'created_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now
         })
         
         # Log audit event
-        await db.audit_events.insert_one({
+        audit_queue.put_nowait({
             'id': str(uuid.uuid4()),
             'tenant_id': DEMO_TENANT_ID,
             'workspace_id': DEMO_WORKSPACE_ID,
             'event_type': 'ai_scribe_consultation_saved',
             'patient_id': patient_id,
             'encounter_id': encounter_id,
-            'timestamp': datetime.now(timezone.utc).isoformat()
+            'timestamp': now
         })
         
         logger.info(f"AI Scribe consultation saved to EHR: encounter_id={encounter_id}")
@@ -4683,13 +4915,14 @@ async def create_prescription(prescription: PrescriptionCreate):
     """Create a new prescription. Server-side allergy interaction check enforced
     (Phase 2.5 patient safety). Returns 409 on conflict unless `allergy_override`
     is supplied with a clinical reason — overrides are logged for audit."""
+    now = datetime.now(timezone.utc).isoformat()
     try:
         # ---- Server-side allergy interaction check ----
         # Defence in depth: even if the client UI is bypassed or buggy, the server
         # blocks prescriptions that conflict with the patient's known allergies
         # unless the doctor explicitly overrides with a reason.
         allergies_result = (
-            supabase.table('allergies')
+            await asupabase.table('allergies')
             .select('substance, reaction, severity')
             .eq('patient_id', prescription.patient_id)
             .eq('status', 'active')
@@ -4755,11 +4988,11 @@ async def create_prescription(prescription: PrescriptionCreate):
             'prescription_date': prescription.prescription_date,
             'status': 'active',
             'notes': prescription.notes,
-            'created_at': datetime.now(timezone.utc).isoformat(),
-            'updated_at': datetime.now(timezone.utc).isoformat()
+            'created_at': now,
+            'updated_at': now
         }
 
-        supabase.table('prescriptions').insert(prescription_data).execute()
+        await asupabase.table('prescriptions').insert(prescription_data).execute()
         
         # Create prescription items
         items_data = []
@@ -4776,11 +5009,11 @@ async def create_prescription(prescription: PrescriptionCreate):
                 'duration': item.duration,
                 'quantity': item.quantity,
                 'instructions': item.instructions,
-                'created_at': datetime.now(timezone.utc).isoformat()
+                'created_at': now
             })
         
         if items_data:
-            supabase.table('prescription_items').insert(items_data).execute()
+            await asupabase.table('prescription_items').insert(items_data).execute()
         
         logger.info(f"Prescription created: {prescription_id}")
         
@@ -4801,7 +5034,7 @@ async def get_patient_prescriptions(patient_id: str):
     """Get all prescriptions for a patient"""
     try:
         # Get prescriptions
-        prescriptions = supabase.table('prescriptions')\
+        prescriptions = await asupabase.table('prescriptions')\
             .select('*')\
             .eq('patient_id', patient_id)\
             .order('prescription_date', desc=True)\
@@ -4810,7 +5043,7 @@ async def get_patient_prescriptions(patient_id: str):
         # Get items for each prescription
         result = []
         for prescription in prescriptions.data:
-            items = supabase.table('prescription_items')\
+            items = await asupabase.table('prescription_items')\
                 .select('*')\
                 .eq('prescription_id', prescription['id'])\
                 .execute()
@@ -4830,13 +5063,13 @@ async def get_patient_prescriptions(patient_id: str):
 async def get_prescription(prescription_id: str):
     """Get a specific prescription with items"""
     try:
-        prescription = supabase.table('prescriptions')\
+        prescription = await asupabase.table('prescriptions')\
             .select('*')\
             .eq('id', prescription_id)\
             .single()\
             .execute()
         
-        items = supabase.table('prescription_items')\
+        items = await asupabase.table('prescription_items')\
             .select('*')\
             .eq('prescription_id', prescription_id)\
             .execute()
@@ -4888,7 +5121,7 @@ async def create_sick_note(
             'created_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('sick_notes').insert(sick_note_data).execute()
+        await asupabase.table('sick_notes').insert(sick_note_data).execute()
         
         logger.info(f"Sick note created: {sick_note_id}")
         
@@ -4915,7 +5148,7 @@ async def get_patient_sick_notes(
     if not workspace_id:
         raise HTTPException(status_code=400, detail="No workspace context")
     try:
-        sick_notes = supabase.table('sick_notes')\
+        sick_notes = await asupabase.table('sick_notes')\
             .select('*')\
             .eq('patient_id', patient_id)\
             .eq('workspace_id', workspace_id)\
@@ -4956,7 +5189,7 @@ async def create_referral(referral: ReferralCreate):
             'created_at': datetime.now(timezone.utc).isoformat()
         }
         
-        supabase.table('referrals').insert(referral_data).execute()
+        await asupabase.table('referrals').insert(referral_data).execute()
         
         logger.info(f"Referral created: {referral_id}")
         
@@ -4973,7 +5206,7 @@ async def create_referral(referral: ReferralCreate):
 async def get_patient_referrals(patient_id: str):
     """Get all referrals for a patient"""
     try:
-        referrals = supabase.table('referrals')\
+        referrals = await asupabase.table('referrals')\
             .select('*')\
             .eq('patient_id', patient_id)\
             .order('referral_date', desc=True)\
@@ -4992,7 +5225,7 @@ async def search_medications(query: str = Query(..., min_length=2)):
     """Search medications by name"""
     try:
         # Search in Supabase medications table
-        medications = supabase.table('medications')\
+        medications = await asupabase.table('medications')\
             .select('id, name, generic_name, brand_names, category, common_dosages, common_frequencies, route')\
             .ilike('name', f'%{query}%')\
             .limit(20)\
@@ -5010,7 +5243,7 @@ async def search_medications(query: str = Query(..., min_length=2)):
 async def get_medication_details(medication_id: str):
     """Get detailed information about a medication"""
     try:
-        medication = supabase.table('medications')\
+        medication = await asupabase.table('medications')\
             .select('*')\
             .eq('id', medication_id)\
             .single()\
@@ -5085,7 +5318,7 @@ async def export_patient_fhir(
     """
     try:
         # Fetch patient row
-        patient_q = supabase.table('patients').select('*').eq('id', patient_id).execute()
+        patient_q = await asupabase.table('patients').select('*').eq('id', patient_id).execute()
         if not patient_q.data:
             raise HTTPException(status_code=404, detail=f"Patient {patient_id} not found")
         patient_row = patient_q.data[0]
@@ -5097,17 +5330,17 @@ async def export_patient_fhir(
                 raise HTTPException(status_code=403, detail="Patient is not in your workspace.")
 
         # Fetch related clinical data — defensively (table may be empty).
-        def _fetch(table: str, filt_col: str = 'patient_id'):
+        async def _fetch(table: str, filt_col: str = 'patient_id'):
             try:
-                return supabase.table(table).select('*').eq(filt_col, patient_id).execute().data or []
+                return (await asupabase.table(table).select('*').eq(filt_col, patient_id).execute()).data or []
             except Exception as e:
                 logger.warning(f"FHIR export: {table} fetch failed for {patient_id}: {e}")
                 return []
 
-        allergies   = [a for a in _fetch('allergies')           if a.get('status') == 'active']
-        diagnoses   = _fetch('diagnoses')
-        vitals      = _fetch('vitals')
-        encounters  = _fetch('encounters')
+        allergies   = [a for a in await _fetch('allergies')     if a.get('status') == 'active']
+        diagnoses   = await _fetch('diagnoses')
+        vitals      = await _fetch('vitals')
+        encounters  = await _fetch('encounters')
 
         # Patient medications live in prescription_items, joined via prescriptions.
         # (No `current_medications` or `patient_medications` table exists in this
@@ -5115,20 +5348,20 @@ async def export_patient_fhir(
         medications = []
         try:
             patient_rxs = (
-                supabase.table('prescriptions')
+                (await asupabase.table('prescriptions')
                 .select('id')
                 .eq('patient_id', patient_id)
                 .eq('status', 'active')
-                .execute()
+                .execute())
                 .data or []
             )
             rx_ids = [r['id'] for r in patient_rxs]
             if rx_ids:
                 medications = (
-                    supabase.table('prescription_items')
+                    (await asupabase.table('prescription_items')
                     .select('id, prescription_id, medication_name, generic_name, nappi_code, dosage, frequency, duration, quantity')
                     .in_('prescription_id', rx_ids)
-                    .execute()
+                    .execute())
                     .data or []
                 )
                 # Add a 'status' field MedicationStatement requires (default to 'active' since the parent prescription is active).
@@ -5187,11 +5420,11 @@ async def get_medications_analytics(
     cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).date().isoformat()
 
     rxs = (
-        supabase.table('prescriptions')
+        (await asupabase.table('prescriptions')
         .select('id, prescription_date')
         .eq('workspace_id', workspace_id)
         .gte('prescription_date', cutoff)
-        .execute()
+        .execute())
         .data or []
     )
     rx_ids = [r['id'] for r in rxs]
@@ -5213,10 +5446,10 @@ async def get_medications_analytics(
         }
 
     items = (
-        supabase.table('prescription_items')
+        (await asupabase.table('prescription_items')
         .select('medication_name, generic_name, nappi_code, prescription_id')
         .in_('prescription_id', rx_ids)
-        .execute()
+        .execute())
         .data or []
     )
 
@@ -5252,10 +5485,10 @@ async def get_medications_analytics(
     atc_coverage_pct = 0.0
     if nappi_used:
         nappi_lookup = (
-            supabase.table('nappi_codes')
+            (await asupabase.table('nappi_codes')
             .select('nappi_code, schedule, atc_code, atc_class_desc')
             .in_('nappi_code', list(set(nappi_used)))
-            .execute()
+            .execute())
             .data or []
         )
         sched_map = {n['nappi_code']: n.get('schedule') or 'Unknown' for n in nappi_lookup}
@@ -5365,6 +5598,12 @@ app.include_router(clinical_actions_router)
 from app.api.query import router as query_router  # noqa: E402
 app.include_router(query_router)
 
+# Weak ETag / 304 revalidation for the SPA's polled GETs. Added before the
+# auth floor so it sits inside it: a 304 is only ever sent to a caller
+# the floor has already authenticated.
+from app.core.etag import ETagMiddleware  # noqa: E402
+app.add_middleware(ETagMiddleware)
+
 # Deny-by-default authentication floor (ZERO). Added BEFORE CORS so CORS
 # stays outermost: CORS handles preflight OPTIONS and wraps the floor's
 # 401 with the proper CORS headers. The floor also bypasses OPTIONS itself.
@@ -5389,12 +5628,125 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Async Supabase client for the route handlers above, so their PostgREST
+# round trips are awaited instead of blocking the event loop. Built in
+# startup_event because it must bind to the server's loop; it is the
+# shared client from app.core.supabase_client, the one the workspaces and
+# users routers use, on one pooled HTTP/2 session. The sync `supabase`
+# client stays for the services and api/ modules that share it.
+asupabase: Optional[AsyncClient] = None
+# Pooled keep-alive connections to the document microservice, shared by
+# every proxy/parse call instead of a new AsyncClient per request. HTTP/2
+# is negotiated over TLS only; a plain http:// URL stays on HTTP/1.1.
+microservice_http: Optional[httpx.AsyncClient] = None
+
+# Audit events are queued by the handlers (put_nowait, no Mongo round
+# trip in the request) and written by _audit_flusher in insert_many
+# batches. Shutdown enqueues a None sentinel; the flusher writes
+# everything ahead of it and exits.
+AUDIT_BATCH_SIZE = 100
+AUDIT_FLUSH_INTERVAL = 0.1
+audit_queue: asyncio.Queue = asyncio.Queue()
+audit_flusher_task: Optional[asyncio.Task] = None
+
+async def _audit_flusher():
+    """Drain audit_queue into db.audit_events until the None sentinel"""
+    while True:
+        batch = [await audit_queue.get()]
+        while len(batch) < AUDIT_BATCH_SIZE and not audit_queue.empty():
+            batch.append(audit_queue.get_nowait())
+        
+        events = [event for event in batch if event is not None]
+        if events:
+            try:
+                await db.audit_events.insert_many(events, ordered=False)
+            except Exception as e:
+                logger.error(f"Failed to write {len(events)} audit events: {e}")
+        if len(events) != len(batch):
+            return
+        await asyncio.sleep(AUDIT_FLUSH_INTERVAL)
+
+# Event-loop stall detection. With DEBUG=true, asyncio debug mode logs
+# every callback that holds the loop for over 50 ms, naming its source.
+# In every mode _loop_lag_monitor wakes each LOOP_MONITOR_INTERVAL seconds
+# and warns when it woke more than LOOP_LAG_WARN_SECONDS late - something
+# blocked the loop (a sync client call, a big json.loads) in that window.
+DEBUG = os.environ.get('DEBUG', 'false').lower() == 'true'
+LOOP_MONITOR_INTERVAL = float(os.environ.get('LOOP_MONITOR_INTERVAL', '1.0'))
+LOOP_LAG_WARN_SECONDS = 0.1
+loop_monitor_task: Optional[asyncio.Task] = None
+
+async def _loop_lag_monitor():
+    """Warn when the event loop wakes this task late"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(LOOP_MONITOR_INTERVAL)
+        lag = loop.time() - started - LOOP_MONITOR_INTERVAL
+        if lag > LOOP_LAG_WARN_SECONDS:
+            logger.warning(
+                f"Event loop blocked for ~{lag * 1000:.0f} ms "
+                f"({len(asyncio.all_tasks(loop))} tasks pending)"
+            )
+
+async def create_mongo_indexes():
+    """Index the Mongo lookups the routes run on every request"""
+    indexes = [
+        # find_one({'id': ...}) - link, encounter documents, original file
+        (db.parsed_documents, [("id", ASCENDING)], {'unique': True}),
+        (db.scanned_documents, [("id", ASCENDING)], {'unique': True}),
+        # Pending-match queue and clinical summaries
+        (db.parsed_documents, [("workspace_id", ASCENDING), ("status", ASCENDING)], {}),
+        (db.validation_sessions, [("encounter_id", ASCENDING)], {}),
+        # approve_validation's session status update
+        (db.validation_sessions, [("document_id", ASCENDING)], {}),
+        # Today's queue in queue-number order, next number, stats; id lookups
+        (db.queue_entries, [("date", ASCENDING), ("queue_number", ASCENDING)], {}),
+        (db.queue_entries, [("id", ASCENDING)], {'unique': True}),
+        (db.audit_events, [("tenant_id", ASCENDING), ("timestamp", DESCENDING)], {}),
+        # update_clinical_aggregates upserts on this key
+        (db.clinical_aggregates, [("workspace_id", ASCENDING), ("kind", ASCENDING), ("value", ASCENDING)], {'unique': True}),
+    ]
+    
+    async def _create(collection, keys, options):
+        try:
+            await collection.create_index(keys, **options)
+        except Exception as e:
+            # Existing identical indexes are a no-op, so this is a real
+            # problem (e.g. duplicate ids blocking a unique index)
+            logger.warning(f"Index creation failed on {collection.name} {keys}: {e}")
+    
+    await asyncio.gather(*(_create(*index) for index in indexes))
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup"""
+    global asupabase, microservice_http, audit_flusher_task, loop_monitor_task
     logger.info("Starting SurgiScan API...")
-    await init_demo_tenant()
+    if DEBUG:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = 0.05
+    loop_monitor_task = asyncio.create_task(_loop_lag_monitor())
+    configure_threadpool()
+    asupabase = await init_async_supabase(supabase_url, supabase_key)
+    microservice_http = httpx.AsyncClient(
+        base_url=MICROSERVICE_URL,
+        http2=True,
+        timeout=httpx.Timeout(60.0, connect=5.0),
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=50, keepalive_expiry=30.0)
+    )
+    audit_flusher_task = asyncio.create_task(_audit_flusher())
+    await asyncio.gather(init_demo_tenant(), create_mongo_indexes())
     logger.info("Demo tenant initialized")
+    
+    # First start with clinical_aggregates: count the existing documents once
+    # (logged rather than raised: the dashboard counters shouldn't stop the app booting)
+    try:
+        if not await db.clinical_aggregates.find_one({'workspace_id': DEMO_WORKSPACE_ID}):
+            await rebuild_clinical_aggregates()
+    except Exception as e:
+        logger.error(f"Failed to rebuild clinical aggregates: {e}")
 
     # Start the document watcher (auto-detect and process new files)
     try:
@@ -5435,5 +5787,30 @@ async def shutdown_event():
     except Exception:
         pass
 
-    mongo_client.close()
-    logger.info("Connections closed")
\ No newline at end of file
+    if loop_monitor_task is not None:
+        loop_monitor_task.cancel()
+
+    # Write out queued audit events before the Mongo client closes
+    if audit_flusher_task is not None:
+        audit_queue.put_nowait(None)
+        await audit_flusher_task
+
+    if microservice_http is not None:
+        await microservice_http.aclose()
+    await close_async_supabase()
+    await mongo_client.close()
+    logger.info("Connections closed")
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # uvloop event loop + httptools parser, both shipped by uvicorn[standard];
+    # the same pinning main.py uses for the microservice. When started with
+    # the uvicorn CLI instead, pass --loop uvloop --http httptools.
+    uvicorn.run(
+        "server:app",
+        host=os.environ.get('HOST', '0.0.0.0'),
+        port=int(os.environ.get('PORT', '8002')),
+        loop="uvloop",
+        http="httptools"
+    )
@@ -0,0 +1,76 @@
+"""
+ETag / If-None-Match middleware (app.core.etag).
+
+DB-free: exercised on a throwaway FastAPI app, so no Supabase or Mongo
+is needed. Covers the 200 -> 304 round trip, that a changed body gets a
+new ETag, and that routes outside ETAG_PATHS are left untouched.
+"""
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.core.etag import ETAG_PATHS, ETagMiddleware, compute_etag, etag_matches
+
+_state = {"name": "Jane"}
+
+
+def _client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(ETagMiddleware)
+
+    @app.get("/api/patients/{patient_id}")
+    async def get_patient(patient_id: str):
+        return {"id": patient_id, "name": _state["name"]}
+
+    @app.get("/api/patients")
+    async def list_patients():
+        return [{"id": "1"}]
+
+    return TestClient(app)
+
+
+def test_matching_if_none_match_returns_304():
+    client = _client()
+    first = client.get("/api/patients/1")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag == compute_etag(first.content)
+
+    second = client.get("/api/patients/1", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+
+
+def test_changed_body_gets_new_etag():
+    client = _client()
+    etag = client.get("/api/patients/1").headers["etag"]
+    _state["name"] = "John"
+    try:
+        again = client.get("/api/patients/1", headers={"If-None-Match": etag})
+    finally:
+        _state["name"] = "Jane"
+    assert again.status_code == 200
+    assert again.headers["etag"] != etag
+    assert again.json()["name"] == "John"
+
+
+def test_untracked_route_has_no_etag():
+    resp = _client().get("/api/patients")
+    assert resp.status_code == 200
+    assert "etag" not in resp.headers
+
+
+def test_list_routes_are_tracked():
+    tracked = ("/api/dispense/encounter/e1", "/api/invoices", "/api/invoices/patient/p1")
+    for path in tracked:
+        assert any(p.match(path) for p in ETAG_PATHS), path
+    assert not any(p.match("/api/invoices/inv-1/payments") for p in ETAG_PATHS)
+
+
+def test_weak_comparison_and_lists():
+    etag = 'W/"abc"'
+    assert etag_matches('"abc"', etag)
+    assert etag_matches('W/"x", W/"abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+    assert not etag_matches('W/"abd"', etag)